@@ -0,0 +1,52 @@
+"""
+Compares the time taken by the Jekyll documentation writer with and without memoisation of the datatype and field
+dictionaries.
+
+    PYTHONPATH=. python benchmarks/jekyll_memoisation.py [records] [fields_per_record] [datatypes]
+"""
+
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from schema_generator import generate_schema
+
+from sfdata_schema.docgen.jekyll import JekyllDocumentationWriter
+from sfdata_schema.spec import TabularSchema
+
+
+def build_dicts(schema: TabularSchema, memoise: bool) -> float:
+    """Builds the dictionaries for the same items as a full run, without writing them."""
+    writer = JekyllDocumentationWriter(Path("."), memoise=memoise)
+    start = time.perf_counter()
+    for _ in range(2):
+        [writer.record_to_dict(r) for r in schema.records]
+        [writer.field_to_dict(f) for f in schema.all_fields]
+        [writer.datatype_to_dict(d) for d in schema.used_datatypes]
+    return time.perf_counter() - start
+
+
+def write_all(schema: TabularSchema, memoise: bool) -> float:
+    with TemporaryDirectory() as tmpdir:
+        writer = JekyllDocumentationWriter(Path(tmpdir), memoise=memoise)
+        start = time.perf_counter()
+        writer.write_all_collections(schema)
+        writer.write_all_data(schema)
+        return time.perf_counter() - start
+
+
+def main(n_records: int = 50, n_fields: int = 40, n_datatypes: int = 30):
+    schema = generate_schema(n_records, n_fields, n_datatypes)
+    print(f"{n_records} records x {n_fields} fields, {n_datatypes} datatypes")
+
+    for name, bench in (("building dicts", build_dicts), ("full run", write_all)):
+        baseline = bench(schema, memoise=False)
+        memoised = bench(schema, memoise=True)
+        print(f"  {name}")
+        print(f"    without memoisation: {baseline:.3f}s")
+        print(f"    with memoisation:    {memoised:.3f}s ({baseline / memoised:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,86 @@
+"""
+Generates synthetic schemas of a configurable size for the benchmarks.
+
+The shape of a schema is set by the number of records, fields per record and custom datatypes, and by the foreign
+key density - the fraction of non key fields that refer to the primary key of another record. Schemas are generated
+as plain documents, which can be written as YAML or JSON5 or parsed directly, so the same schema can be used to
+benchmark every stage from parsing to documentation. The output is deterministic for a given seed.
+"""
+
+import json
+import random
+from typing import Any, Dict
+
+from sfdata_schema.parser import parse_schema
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import STANDARD_TYPES
+
+_FACETS = (
+    {"max_length": 10},
+    {"pattern": "[A-Z][0-9]+"},
+    {"enumeration": ["a", "b", "c"]},
+    {"min_inclusive": 0, "max_inclusive": 100},
+)
+
+
+def generate_document(
+    n_records: int = 50,
+    n_fields: int = 20,
+    n_datatypes: int = 10,
+    fk_density: float = 0.1,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Returns a schema document. Each custom datatype extends a standard type or the previous custom type, with a
+    restriction. The first field of each record is its primary key, and every tenth field has options.
+    """
+    rng = random.Random(seed)
+
+    datatypes = {}
+    for i in range(n_datatypes):
+        parent = f"type{i - 1}" if i % 3 else "string"
+        datatypes[f"type{i}"] = {
+            "description": f"Custom datatype {i}",
+            "extends": parent,
+            "restriction": dict(_FACETS[i % len(_FACETS)]),
+        }
+    datatype_ids = [dt.id for dt in STANDARD_TYPES] + list(datatypes)
+
+    records = {}
+    for r in range(n_records):
+        fields = {"field0": {"primary_key": True}}
+        for f in range(1, n_fields):
+            field = {"datatype": rng.choice(datatype_ids)}
+            if r and rng.random() < fk_density:
+                field["foreign_keys"] = [f"record{rng.randrange(r)}.field0"]
+            if f % 10 == 0:
+                field["options"] = {"sensitive": True}
+            fields[f"field{f}"] = field
+        records[f"record{r}"] = {
+            "label": f"Record {r}",
+            "description": f"Synthetic record {r}",
+            "fields": fields,
+        }
+
+    return {
+        "id": "benchmark",
+        "version": "1.0.0",
+        "datatypes": datatypes,
+        "records": records,
+    }
+
+
+def to_yaml(document: Dict[str, Any]) -> str:
+    import yaml
+
+    return yaml.safe_dump(document, sort_keys=False)
+
+
+def to_json5(document: Dict[str, Any]) -> str:
+    """JSON is valid JSON5. A comment is added so the document is not also valid JSON."""
+    return "// Synthetic benchmark schema\n" + json.dumps(document, indent=2)
+
+
+def generate_schema(*args, **kwargs) -> TabularSchema:
+    """Generates a document with :func:`generate_document` and parses it into a schema."""
+    return parse_schema(generate_document(*args, **kwargs))
@@ -0,0 +1,105 @@
+"""
+Reports the memory held by parsed schemas, in bytes per field. Several versions of the same schema are parsed and
+kept alive together, as a long-running service would.
+
+    PYTHONPATH=. python benchmarks/schema_memory.py [records] [fields_per_record] [versions] [--baseline REV]
+
+With --baseline, the same measurement is repeated in a subprocess against the sfdata_schema package as it was at a
+git revision, and the two are compared. For example, to compare against the schema classes before they had
+__slots__ and interned names, pass the revision before that change. Without it, the current figure is compared
+with a reference measured before that change at the default sizes.
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tarfile
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from schema_generator import generate_document
+
+from sfdata_schema.parser import parse_schema
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+# Bytes per field for 5 versions of 200 records x 50 fields, measured before schema items had __slots__, shared
+# empty options and interned names
+REFERENCE_SIZES = (200, 50, 5)
+REFERENCE_BYTES_PER_FIELD = 374
+
+
+def measure(n_records: int, n_fields: int, n_versions: int) -> float:
+    document = json.dumps(generate_document(n_records, n_fields, n_datatypes=5))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Each version is parsed from its own copy of the document, so no strings are shared by accident
+    schemas = [parse_schema(json.loads(document)) for _ in range(n_versions)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / (n_records * n_fields * len(schemas))
+
+
+def measure_revision(
+    revision: str, n_records: int, n_fields: int, n_versions: int
+) -> float:
+    """Measures the sfdata_schema package as it was at a git revision, exported to a temporary directory."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision, "sfdata_schema"],
+        cwd=BENCHMARK_DIR.parent,
+        check=True,
+        capture_output=True,
+    ).stdout
+    with TemporaryDirectory() as tmpdir:
+        with tarfile.open(fileobj=BytesIO(archive)) as tar:
+            tar.extractall(tmpdir)
+        # Run from the export, so the package is imported from there rather than the working tree
+        script = (
+            f"import sys; sys.path[:0] = [{tmpdir!r}, {str(BENCHMARK_DIR)!r}]; "
+            f"from schema_memory import measure; print(measure({n_records}, {n_fields}, {n_versions}))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=tmpdir,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    return float(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("records", type=int, nargs="?", default=REFERENCE_SIZES[0])
+    parser.add_argument("fields", type=int, nargs="?", default=REFERENCE_SIZES[1])
+    parser.add_argument("versions", type=int, nargs="?", default=REFERENCE_SIZES[2])
+    parser.add_argument(
+        "--baseline", metavar="REV", help="git revision to compare against"
+    )
+    args = parser.parse_args()
+    sizes = (args.records, args.fields, args.versions)
+
+    per_field = measure(*sizes)
+    print(f"{args.versions} versions of {args.records} records x {args.fields} fields")
+    print(f"  current:   {per_field:.0f} bytes per field")
+
+    if args.baseline is not None:
+        baseline, name = measure_revision(args.baseline, *sizes), args.baseline
+    elif sizes == REFERENCE_SIZES:
+        baseline, name = REFERENCE_BYTES_PER_FIELD, "reference"
+    else:
+        print("  pass --baseline REV to compare with another revision")
+        return
+    change = (per_field - baseline) / baseline
+    print(f"  baseline:  {baseline:.0f} bytes per field ({name})")
+    print(f"  change:    {change:+.0%}")
+
+
+if __name__ == "__main__":
+    main()
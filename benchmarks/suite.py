@@ -0,0 +1,181 @@
+"""
+Runs the benchmark suite against a synthetic schema and reports the timings and peak memory of each benchmark as
+JSON, so results can be compared across versions.
+
+    PYTHONPATH=. python benchmarks/suite.py [--records N] [--fields N] [--datatypes N] [--fk-density F]
+        [--repeat N] [--only NAME ...] [--output results.json]
+
+Each benchmark is timed over several runs, after one untimed warm-up run. Peak memory is measured with tracemalloc
+in a separate run, as tracing slows the code down.
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict
+
+from schema_generator import generate_document, to_json5, to_yaml
+
+from sfdata_schema.parser import parse_schema
+
+
+def bench_parse_yaml(document, schema):
+    content = to_yaml(document)
+    return lambda: parse_schema(io.StringIO(content), format="yaml")
+
+
+def bench_parse_json5(document, schema):
+    content = to_json5(document)
+    return lambda: parse_schema(io.StringIO(content), format="json5")
+
+
+def bench_lookups(document, schema):
+    record_ids = [r.id for r in schema.records]
+    field_ids = [f.qname for f in schema.all_fields]
+    datatype_ids = [dt.id for dt in schema.datatypes]
+
+    def run():
+        for id in record_ids:
+            schema.get_record(id)
+        for id in field_ids:
+            schema.get_field(id)
+        for id in datatype_ids:
+            schema.get_datatype(id)
+
+    return run
+
+
+def bench_erd_context(document, schema):
+    from sfdata_schema.docgen.erd import get_erd_context
+
+    return lambda: get_erd_context(schema)
+
+
+def bench_render_erd(document, schema):
+    from sfdata_schema.docgen.erd import render_erd
+
+    return lambda: render_erd(schema)
+
+
+def bench_jekyll(document, schema):
+    from sfdata_schema.docgen.jekyll import JekyllDocumentationWriter
+
+    def run():
+        with TemporaryDirectory() as tmpdir:
+            writer = JekyllDocumentationWriter(Path(tmpdir))
+            writer.write_all_collections(schema)
+            writer.write_all_data(schema)
+
+    return run
+
+
+def bench_coerce(document, schema):
+    from sfdata_schema.spec.datatypes import DT_DATE, Datatype
+    from sfdata_schema.validation.coerce import coerce_batch, get_coercer
+
+    uk_date = Datatype("uk_date", extends=DT_DATE, options={"format": "%d/%m/%Y"})
+    # A few hundred distinct dates repeated down a column, as in a typical extract
+    values = [f"{1 + i % 28:02d}/{1 + i % 12:02d}/2020" for i in range(100_000)]
+
+    def run():
+        coerce_batch(get_coercer(uk_date), values)
+
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any], Any], Callable[[], Any]]] = {
+    "parse_yaml": bench_parse_yaml,
+    "parse_json5": bench_parse_json5,
+    "lookups": bench_lookups,
+    "erd_context": bench_erd_context,
+    "render_erd": bench_render_erd,
+    "jekyll": bench_jekyll,
+    "coerce": bench_coerce,
+}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    run()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.mean(timings),
+        "peak_bytes": peak,
+    }
+
+
+def library_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("sfdata-schema")
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--fields", type=int, default=30)
+    parser.add_argument("--datatypes", type=int, default=20)
+    parser.add_argument("--fk-density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    params = dict(
+        n_records=args.records,
+        n_fields=args.fields,
+        n_datatypes=args.datatypes,
+        fk_density=args.fk_density,
+        seed=args.seed,
+    )
+    schema = parse_schema(generate_document(**params))
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        # Benchmarks are given their own copy of the document, as parsing consumes it
+        run = BENCHMARKS[name](generate_document(**params), schema)
+        results[name] = measure(run, args.repeat)
+        print(f"{name}: {results[name]['median_s']:.4f}s", file=sys.stderr)
+
+    report = {
+        "version": library_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,60 @@ from pathlib import Path
 
 import click
 
+from sfdata_schema.instrumentation import SpanRecorder
 from sfdata_schema.parser import parse_schema
 
-from .jekyll import JekyllDocumentationWriter
-
 
 @click.group()
-def docgen():
-    pass
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    envvar="SFDATA_SCHEMA_CACHE_DIR",
+    help="Cache parsed schemas and rendered diagrams in this directory",
+)
+@click.option(
+    "--profile", is_flag=True, help="Print the time taken by each stage of the run"
+)
+@click.option(
+    "--profile-trace",
+    type=click.Path(dir_okay=False),
+    help="Write the timed stages to this file in Chrome trace JSON format",
+)
+@click.option(
+    "--profile-cprofile",
+    type=click.Path(dir_okay=False),
+    help="Profile the run with cProfile and write the statistics to this file",
+)
+@click.pass_context
+def docgen(ctx, cache_dir, profile, profile_trace, profile_cprofile):
+    ctx.obj = dict(cache_dir=cache_dir)
+
+    if profile or profile_trace:
+        recorder = ctx.with_resource(SpanRecorder())
+
+        def report():
+            if profile:
+                click.echo(recorder.format_tree(), err=True)
+            if profile_trace:
+                recorder.write_trace(profile_trace)
+
+        ctx.call_on_close(report)
+
+    if profile_cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump_stats():
+            profiler.disable()
+            profiler.dump_stats(profile_cprofile)
+
+        ctx.call_on_close(dump_stats)
+
+
+def _erd_cache_dir(obj):
+    return Path(obj["cache_dir"]) / "erd" if obj["cache_dir"] else None
 
 
 @docgen.command()
@@ -17,7 +63,8 @@ def docgen():
 @click.argument(
     "output_file", type=click.Path(file_okay=True, dir_okay=False), metavar="OUTPUT"
 )
-def graphviz(schema, output_file):
+@click.pass_obj
+def graphviz(obj, schema, output_file):
     """Generate an entity relationship diagram using graphviz."""
     from .erd import graphviz_render_erd
 
@@ -26,26 +73,102 @@ def graphviz(schema, output_file):
 
     print(f"Generating ERD diagram for {schema} and writing to {output_file}")
 
-    spec = parse_schema(schema)
+    spec = parse_schema(schema, cache_dir=obj["cache_dir"])
 
     image_format = output_file.suffix[1:].lower()
-    graphviz_render_erd(spec, image_format, output_file)
+    graphviz_render_erd(spec, image_format, output_file, cache_dir=_erd_cache_dir(obj))
+
+
+@docgen.command("graphviz-partitions")
+@click.argument("schema", type=click.Path(exists=True))
+@click.argument("output_dir", type=click.Path(file_okay=False), metavar="OUTPUT")
+@click.option(
+    "--mode",
+    type=click.Choice(["components", "neighbourhood", "groups"]),
+    default="components",
+    show_default=True,
+    help="How records are split between diagrams",
+)
+@click.option(
+    "--hops",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Foreign key hops included in neighbourhood mode",
+)
+@click.option("--format", "image_format", default="svg", show_default=True)
+@click.option(
+    "--engine", default="dot", show_default=True, help="Graphviz layout engine"
+)
+@click.option("--workers", type=int, help="Number of diagrams laid out in parallel")
+@click.pass_obj
+def graphviz_partitions(
+    obj, schema, output_dir, mode, hops, image_format, engine, workers
+):
+    """Generate one entity relationship diagram per partition of the schema, and an overview diagram."""
+    from .erd.partition import graphviz_render_partitions, partition_erd
+
+    schema = Path(schema)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(
+        f"Generating partitioned ERD diagrams for {schema} and writing to {output_dir}"
+    )
+
+    spec = parse_schema(schema, cache_dir=obj["cache_dir"])
+
+    partitions = partition_erd(spec, mode, hops=hops)
+    rendered = graphviz_render_partitions(
+        spec,
+        partitions,
+        image_format,
+        engine=engine,
+        max_workers=workers,
+        cache_dir=_erd_cache_dir(obj),
+        # Neighbourhoods overlap, so there is no meaningful overview of them
+        overview=mode != "neighbourhood",
+    )
+    for name, data in rendered.items():
+        (output_dir / f"{name}.{image_format}").write_bytes(data)
+
+    print(f"Generated {len(rendered)} diagrams")
 
 
 @docgen.command()
 @click.argument("schema", type=click.Path(exists=True))
 @click.argument("output_dir", type=click.Path(file_okay=False), metavar="OUTPUT")
 @click.option("--erd", is_flag=True, help="Also generate an ERD diagram")
-def jekyll(schema, output_dir, erd):
+@click.option(
+    "--record-erds",
+    is_flag=True,
+    help="Also generate a local ERD diagram for each record",
+)
+@click.option(
+    "--erd-hops",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Foreign key hops shown in record ERD diagrams",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only write files that have changed and remove stale ones",
+)
+@click.pass_obj
+def jekyll(obj, schema, output_dir, erd, record_erds, erd_hops, incremental):
     """Generate Jekyll documentation."""
+    from .jekyll import JekyllDocumentationWriter
+
     schema = Path(schema)
     output_dir = Path(output_dir)
 
     print(f"Generating Jekyll documentation for {schema} and writing to {output_dir}")
 
-    spec = parse_schema(schema)
+    spec = parse_schema(schema, cache_dir=obj["cache_dir"])
 
-    writer = JekyllDocumentationWriter(output_dir)
+    writer = JekyllDocumentationWriter(output_dir, incremental=incremental)
     writer.copy_templates()
     writer.write_all_collections(spec)
     writer.write_all_data(spec)
@@ -55,10 +178,23 @@ def jekyll(schema, output_dir, erd):
         include_dir.mkdir(parents=True, exist_ok=True)
         erd_file = include_dir / "erd.svg"
 
-        svg_content = writer.generate_embeddable_erd(spec)
-        erd_file.write_bytes(svg_content)
+        writer.generate_embeddable_erd(
+            spec, cache_dir=_erd_cache_dir(obj), target=erd_file
+        )
 
         print(f"Generated ERD diagram in {erd_file}")
         print(
             " To include the ERD diagram in your Jekyll site, you will have to manually update 'erd_include: true' to _config.yml"
         )
+
+    if record_erds:
+        erd_dir = writer.write_record_erds(
+            spec, hops=erd_hops, cache_dir=_erd_cache_dir(obj)
+        )
+
+        print(f"Generated record ERD diagrams in {erd_dir}")
+        print(
+            " To include them on the record pages, you will have to manually update 'record_erd_include: true' to _config.yml"
+        )
+
+    print(writer.summary())
@@ -1,68 +1,148 @@
-from collections import namedtuple
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any, Mapping, Optional, Union
+from typing import Any, Iterable, Mapping, Optional, Union
 
+from sfdata_schema.instrumentation import instrumented, span
 from sfdata_schema.spec import TabularSchema
 
 Relationship = namedtuple("Relationship", "lh rh lh_c rh_c")
 
+DEFAULT_TEMPLATE_PATH = Path(__file__).parent / "templates"
+
+# Rendered diagrams keyed by a hash of the DOT source, layout engine and format
+_render_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_RENDER_CACHE_SIZE = 32
+_render_cache_lock = threading.Lock()
 
-def get_erd_context(schema: TabularSchema) -> Mapping[str, Any]:
-    relationships = []
 
-    for r in schema.records:
+def get_erd_context(
+    schema: TabularSchema, records: Iterable[str] = None
+) -> Mapping[str, Any]:
+    """
+    Returns the template context for an ERD. If record ids are given, the diagram only includes those records and
+    the relationships between them.
+    """
+    if records is None:
+        records = schema.records
+    else:
+        records = [schema.get_record(id) for id in records]
+    included = set(r.id for r in records)
+
+    relationships = []
+    for r in records:
         pk = [p.id for p in r.primary_keys]
         for f in r.fields:
             if f.foreign_keys:
                 for fk in f.foreign_keys:
+                    if fk.record.id not in included:
+                        continue
                     lh_c = "0,1" if pk == [f.id] else "0..N"
                     relationships.append(
                         Relationship(lh=r.id, rh=fk.record.id, lh_c=lh_c, rh_c=1)
                     )
 
-    return dict(schema=schema, relationships=relationships)
+    return dict(schema=schema, records=records, relationships=relationships)
 
 
-def render_erd(
-    schema: TabularSchema,
-    template_name: str = "erd.dot",
-    template_path: Union[str, Path] = None,
-) -> str:
+@lru_cache(maxsize=None)
+def _get_environment(template_path: str):
+    """Environments are shared between calls, so each template is only loaded and compiled once."""
     try:
         from jinja2 import Environment, FileSystemLoader, select_autoescape
     except ImportError:
         raise ImportError("This function requires the jinja2 package")
 
-    if template_path is None:
-        template_path = Path(__file__).parent / "templates"
-
-    env = Environment(
+    return Environment(
         loader=FileSystemLoader(template_path), autoescape=select_autoescape()
     )
 
-    context = get_erd_context(schema)
+
+def render_template(
+    template_name: str,
+    context: Mapping[str, Any],
+    template_path: Union[str, Path] = None,
+) -> str:
+    if template_path is None:
+        template_path = DEFAULT_TEMPLATE_PATH
+
+    env = _get_environment(str(template_path))
     template = env.get_template(template_name)
     return template.render(context)
 
 
-def graphviz_render_erd(
-    schema: TabularSchema, format: str = "png", target_path: Path = None, **kwargs
-) -> Optional[bytes]:
+@instrumented("erd.render")
+def render_erd(
+    schema: TabularSchema,
+    template_name: str = "erd.dot",
+    template_path: Union[str, Path] = None,
+    records: Iterable[str] = None,
+) -> str:
+    context = get_erd_context(schema, records)
+    return render_template(template_name, context, template_path)
+
+
+def _render_key(dot: str, engine: str, format: str) -> str:
+    digest = hashlib.sha256()
+    for part in (engine, format, dot):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def graphviz_pipe(
+    dot: str,
+    format: str = "png",
+    engine: str = "circo",
+    cache_dir: Union[str, Path] = None,
+) -> bytes:
+    """
+    Lays out and renders DOT source with graphviz, piping the source and output through the process's stdin and
+    stdout. Results are cached in memory, and in cache_dir if given, keyed by a hash of the source, engine and
+    format, so unchanged diagrams are not rendered again.
+    """
     import graphviz
 
-    with TemporaryDirectory() as tmpdir:
-        dot_path = Path(tmpdir) / "graph.dot"
-        with dot_path.open("wt") as file:
-            file.write(render_erd(schema, **kwargs))
+    key = _render_key(dot, engine, format)
+    with _render_cache_lock:
+        data = _render_cache.get(key)
+        if data is not None:
+            _render_cache.move_to_end(key)
+            return data
+
+    cache_file = Path(cache_dir) / f"{key}.{format}" if cache_dir else None
+    if cache_file is not None and cache_file.exists():
+        data = cache_file.read_bytes()
+    else:
+        with span("graphviz.pipe", engine=engine, format=format):
+            data = graphviz.pipe(engine, format, dot.encode("utf-8"))
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_bytes(data)
+            tmp_file.replace(cache_file)
+
+    with _render_cache_lock:
+        _render_cache[key] = data
+        while len(_render_cache) > _RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return data
 
-        output_path = graphviz.render("circo", format, dot_path)
-        output_path = Path(output_path)
 
-        if target_path:
-            output_path.replace(target_path)
-            data = None
-        else:
-            data = output_path.read_bytes()
+def graphviz_render_erd(
+    schema: TabularSchema,
+    format: str = "png",
+    target_path: Path = None,
+    engine: str = "circo",
+    cache_dir: Union[str, Path] = None,
+    **kwargs,
+) -> Optional[bytes]:
+    data = graphviz_pipe(render_erd(schema, **kwargs), format, engine, cache_dir)
 
+    if target_path:
+        Path(target_path).write_bytes(data)
+        return None
     return data
@@ -0,0 +1,148 @@
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Literal, Set, Union
+
+from sfdata_schema.spec import TabularSchema
+
+from . import graphviz_pipe, render_erd, render_template
+
+ErdPartition = namedtuple("ErdPartition", "name records")
+PartitionLink = namedtuple("PartitionLink", "lh rh count")
+
+PartitionMode = Literal["components", "neighbourhood", "groups"]
+
+
+def get_record_graph(schema: TabularSchema) -> Dict[str, Set[str]]:
+    """Returns the undirected graph of records connected by foreign keys, as a mapping of record id to neighbours."""
+    graph = {r.id: set() for r in schema.records}
+    for r in schema.records:
+        for f in r.fields:
+            for fk in f.foreign_keys:
+                if fk.record.id != r.id:
+                    graph[r.id].add(fk.record.id)
+                    graph[fk.record.id].add(r.id)
+    return graph
+
+
+def _neighbourhood(graph: Dict[str, Set[str]], start: str, hops: int) -> Set[str]:
+    seen = {start}
+    frontier = [start]
+    for _ in range(hops):
+        frontier = [n for id in frontier for n in graph[id] if n not in seen]
+        seen.update(frontier)
+    return seen
+
+
+def partition_erd(
+    schema: TabularSchema,
+    mode: PartitionMode = "components",
+    hops: int = 1,
+    group_option: str = "group",
+) -> List[ErdPartition]:
+    """
+    Splits the records of a schema into partitions that can be drawn as separate diagrams.
+
+    * components - one partition for each set of records connected by foreign keys, named after its first record
+    * neighbourhood - one partition for each record, holding the records within the given number of foreign key
+      hops, named after the record. These partitions overlap.
+    * groups - one partition for each value of the record option named by group_option. Records without the
+      option are put in a partition named 'ungrouped'.
+
+    Records keep their schema order within each partition.
+    """
+    graph = get_record_graph(schema)
+    order = [r.id for r in schema.records]
+
+    if mode == "components":
+        partitions = []
+        assigned = set()
+        for id in order:
+            if id in assigned:
+                continue
+            component = _neighbourhood(graph, id, len(order))
+            assigned.update(component)
+            partitions.append(
+                ErdPartition(id, tuple(r for r in order if r in component))
+            )
+        return partitions
+
+    if mode == "neighbourhood":
+        partitions = []
+        for id in order:
+            neighbourhood = _neighbourhood(graph, id, hops)
+            partitions.append(
+                ErdPartition(id, tuple(r for r in order if r in neighbourhood))
+            )
+        return partitions
+
+    if mode == "groups":
+        groups: Dict[str, List[str]] = {}
+        for r in schema.records:
+            groups.setdefault(r.options.get(group_option) or "ungrouped", []).append(
+                r.id
+            )
+        return [ErdPartition(name, tuple(ids)) for name, ids in groups.items()]
+
+    raise ValueError(f"Unknown partition mode '{mode}'")
+
+
+def render_overview_erd(
+    schema: TabularSchema,
+    partitions: List[ErdPartition],
+    template_name: str = "overview.dot",
+    template_path: Union[str, Path] = None,
+) -> str:
+    """
+    Renders a DOT diagram with one node per partition, linked where foreign keys cross between partitions. Records
+    that appear in several partitions are counted in the first one.
+    """
+    owner = {}
+    for partition in partitions:
+        for id in partition.records:
+            owner.setdefault(id, partition.name)
+
+    counts = Counter()
+    for r in schema.records:
+        for f in r.fields:
+            for fk in f.foreign_keys:
+                lh, rh = owner.get(r.id), owner.get(fk.record.id)
+                if lh and rh and lh != rh:
+                    counts[(lh, rh)] += 1
+
+    links = [PartitionLink(lh, rh, count) for (lh, rh), count in counts.items()]
+    context = dict(schema=schema, partitions=partitions, links=links)
+    return render_template(template_name, context, template_path)
+
+
+def graphviz_render_partitions(
+    schema: TabularSchema,
+    partitions: List[ErdPartition],
+    format: str = "svg",
+    engine: str = "dot",
+    max_workers: int = None,
+    cache_dir: Union[str, Path] = None,
+    overview: bool = True,
+) -> Dict[str, bytes]:
+    """
+    Renders a diagram for each partition, and an overview diagram named 'overview' unless disabled. Returns the
+    rendered output keyed by partition name. Raises ValueError if the overview would replace a partition of the
+    same name.
+
+    The DOT sources are generated up front and laid out by concurrent graphviz processes. Each layout already runs
+    in its own process, so a thread pool is enough to keep all cores busy.
+    """
+    sources = {p.name: render_erd(schema, records=p.records) for p in partitions}
+    if overview:
+        if "overview" in sources:
+            raise ValueError(
+                "A partition is named 'overview', which is reserved for the overview diagram"
+            )
+        sources["overview"] = render_overview_erd(schema, partitions)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(graphviz_pipe, dot, format, engine, cache_dir)
+            for name, dot in sources.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
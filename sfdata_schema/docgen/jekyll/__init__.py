@@ -1,37 +1,163 @@
-import xml.etree.ElementTree as ET
+import hashlib
+import io
+import json
+from collections import Counter
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Dict
+from typing import IO, Any, Dict, Iterable, Optional, Tuple, Union
 
 import yaml
 
+from sfdata_schema.instrumentation import instrumented, span
 from sfdata_schema.spec import Field, Record
 from sfdata_schema.spec import TabularSchema as Specification
 from sfdata_schema.spec.datatypes import Datatype
 
+from .svg import write_embeddable_svg
+
 
 def _remove_nulls(d: dict) -> dict:
     return {k: v for k, v in d.items() if v is not None}
 
 
+class _Dumper(getattr(yaml, "CDumper", yaml.Dumper)):
+    """
+    Uses the libyaml emitter if PyYAML was built with it. Dictionaries shared between entries, such as memoised
+    datatypes, are written in full rather than as aliases, and dictionary subclasses such as the shared empty
+    options are written as plain mappings.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
+
+_Dumper.add_multi_representer(dict, _Dumper.represent_dict)
+
+
+@instrumented("yaml.dump")
+def _dump(data: Any) -> str:
+    return yaml.dump(data, Dumper=_Dumper, sort_keys=False)
+
+
 def _write__with_frontmatter(content: str, **frontmatter) -> str:
-    fm = yaml.dump(frontmatter, sort_keys=False)
+    fm = _dump(frontmatter)
     return f"---\n{fm}---\n{content}"
 
 
+def _make_embeddable(svg_content: bytes, link_pattern: str) -> bytes:
+    """Removes the background of a graphviz SVG and wraps each node in a link to its record page."""
+    target = io.BytesIO()
+    write_embeddable_svg(io.BytesIO(svg_content), target, link_pattern)
+    return target.getvalue()
+
+
 class JekyllDocumentationWriter:
+    """
+    Writes the data files and collections for a Jekyll site documenting a schema.
+
+    The dictionaries built for datatypes and fields are memoised, as the same datatype is usually shared by many
+    fields and every field is written several times. The memoised values are discarded when the writer is used
+    with a different schema, and must not be modified by callers.
+
+    In incremental mode, a hash of every file written is kept in a file in the Jekyll directory. Files whose
+    content has not changed since the last run are not rewritten, so Jekyll does not see them as modified, and
+    collection files written for records and fields that no longer exist are removed. Files the writer did not
+    write are never removed.
+    """
+
+    hash_file = ".docgen-hashes.json"
 
     def __init__(
         self,
         jekyll_dir: Path,
         data_prefix: str = "_data",
         collection_prefix: str = "",
+        incremental: bool = False,
+        memoise: bool = True,
     ):
         self.jekyll_dir = jekyll_dir
         self.collection_prefix = collection_prefix
         self.data_prefix = data_prefix
+        self.incremental = incremental
+        self.memoise = memoise
+        self._spec = None
+        self._datatype_cache: Dict[int, Tuple[Datatype, Dict[str, Any]]] = {}
+        self._field_cache: Dict[int, Tuple[Field, Dict[str, Any]]] = {}
+        self.stats = Counter(written=0, skipped=0, removed=0)
+        self._hashes = None
+
+    def _load_hashes(self) -> Dict[str, str]:
+        if self._hashes is None:
+            hash_file = self.jekyll_dir / self.hash_file
+            try:
+                self._hashes = json.loads(hash_file.read_text())
+            except (FileNotFoundError, ValueError):
+                self._hashes = {}
+        return self._hashes
+
+    def _save_hashes(self) -> None:
+        if self.incremental and self._hashes is not None:
+            self.jekyll_dir.mkdir(parents=True, exist_ok=True)
+            hash_file = self.jekyll_dir / self.hash_file
+            hash_file.write_text(json.dumps(self._hashes, sort_keys=True, indent=0))
+
+    def _write_output(self, path: Path, content: str) -> bool:
+        """Writes a file, unless in incremental mode and the content is unchanged. Returns True if written."""
+        with span("jekyll.write_file"):
+            return self._write_file(path, content)
+
+    def _write_file(self, path: Path, content: str) -> bool:
+        if self.incremental:
+            hashes = self._load_hashes()
+            key = path.relative_to(self.jekyll_dir).as_posix()
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if hashes.get(key) == digest and path.exists():
+                self.stats["skipped"] += 1
+                return False
+            hashes[key] = digest
+
+        path.write_text(content)
+        self.stats["written"] += 1
+        return True
+
+    def _remove_stale(self, dir: Path, current: Iterable[Path]) -> None:
+        """
+        In incremental mode, removes the collection files in dir that an earlier run wrote and this run did not.
+        Files the writer has never written are left alone.
+        """
+        if not self.incremental:
+            return
+        hashes = self._load_hashes()
+        current = {p.relative_to(self.jekyll_dir).as_posix() for p in current}
+        for key in list(hashes):
+            path = self.jekyll_dir / key
+            if key in current or path.parent != dir or path.suffix != ".md":
+                continue
+            del hashes[key]
+            if path.exists():
+                path.unlink()
+                self.stats["removed"] += 1
+
+    def summary(self) -> str:
+        return (
+            f"Wrote {self.stats['written']} files, skipped {self.stats['skipped']} unchanged files, "
+            f"removed {self.stats['removed']} stale files"
+        )
+
+    def _use_spec(self, spec: Specification) -> None:
+        """Discards the memoised dictionaries if they were built for a different schema."""
+        if spec is not self._spec:
+            self._spec = spec
+            self._datatype_cache.clear()
+            self._field_cache.clear()
 
     def datatype_to_dict(self, datatype: Datatype) -> Dict[str, Any]:
+        # Keyed by identity, as datatypes compare equal on id alone. The cache holds a reference to the datatype
+        # so the key cannot be reused by another object.
+        cached = self._datatype_cache.get(id(datatype))
+        if cached is not None:
+            return cached[1]
+
         data = {
             "id": datatype.id,
             "description": datatype.description,
@@ -45,9 +171,16 @@ class JekyllDocumentationWriter:
                 else None
             ),
         }
-        return _remove_nulls(data)
+        data = _remove_nulls(data)
+        if self.memoise:
+            self._datatype_cache[id(datatype)] = (datatype, data)
+        return data
 
     def field_to_dict(self, field: Field) -> Dict[str, Any]:
+        cached = self._field_cache.get(id(field))
+        if cached is not None:
+            return cached[1]
+
         data = {
             "id": field.id,
             "qname": field.qname,
@@ -59,7 +192,10 @@ class JekyllDocumentationWriter:
             "foreign_keys": [f.qname for f in field.foreign_keys],
             "options": field.options,
         }
-        return _remove_nulls(data)
+        data = _remove_nulls(data)
+        if self.memoise:
+            self._field_cache[id(field)] = (field, data)
+        return data
 
     def record_to_dict(self, record: Record) -> Dict[str, Any]:
         return {
@@ -70,61 +206,78 @@ class JekyllDocumentationWriter:
             "fields": [self.field_to_dict(f) for f in record.fields],
         }
 
+    @instrumented("jekyll.write_record_data")
     def write_record_data(self, spec: Specification) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.data_prefix
         dir.mkdir(parents=True, exist_ok=True)
         data_file = dir / "records.yml"
 
-        with open(data_file, "wt") as file:
-            record_data = [self.record_to_dict(r) for r in spec.records]
-            yaml.dump(record_data, file, sort_keys=False)
+        record_data = [self.record_to_dict(r) for r in spec.records]
+        self._write_output(data_file, _dump(record_data))
+        self._save_hashes()
 
         return data_file
 
+    @instrumented("jekyll.write_field_data")
     def write_field_data(self, spec: Specification) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.data_prefix
         dir.mkdir(parents=True, exist_ok=True)
         data_file = dir / "fields.yml"
 
-        with open(data_file, "wt") as file:
-            field_data = [self.field_to_dict(f) for f in spec.all_fields]
-            yaml.dump(field_data, file, sort_keys=False)
+        field_data = [self.field_to_dict(f) for f in spec.all_fields]
+        self._write_output(data_file, _dump(field_data))
+        self._save_hashes()
 
         return data_file
 
+    @instrumented("jekyll.write_datatypes_data")
     def write_datatypes_data(self, spec: Specification, only_used=True) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.data_prefix
         dir.mkdir(parents=True, exist_ok=True)
         data_file = dir / "datatypes.yml"
 
-        with open(data_file, "wt") as file:
-            datatypes = spec.used_datatypes if only_used else spec.datatypes
-            datatype_data = [self.datatype_to_dict(d) for d in datatypes]
-            yaml.dump(datatype_data, file, sort_keys=False)
+        datatypes = spec.used_datatypes if only_used else spec.datatypes
+        datatype_data = [self.datatype_to_dict(d) for d in datatypes]
+        self._write_output(data_file, _dump(datatype_data))
+        self._save_hashes()
 
         return data_file
 
+    @instrumented("jekyll.write_record_collection")
     def write_record_collection(self, spec: Specification) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.collection_prefix / "_records"
         dir.mkdir(parents=True, exist_ok=True)
 
+        written = []
         for r in spec.records:
             data_file = dir / f"{r.id}.md"
-            data_file.write_text(
+            self._write_output(
+                data_file,
                 _write__with_frontmatter(
                     "", layout="record", record_id=r.id, spec=self.record_to_dict(r)
-                )
+                ),
             )
+            written.append(data_file)
 
+        self._remove_stale(dir, written)
+        self._save_hashes()
         return dir
 
+    @instrumented("jekyll.write_field_collection")
     def write_field_collection(self, spec: Specification) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.collection_prefix / "_fields"
         dir.mkdir(parents=True, exist_ok=True)
 
+        written = []
         for f in spec.all_fields:
             data_file = dir / f"{f.qname}.md"
-            data_file.write_text(
+            self._write_output(
+                data_file,
                 _write__with_frontmatter(
                     "",
                     layout="field",
@@ -132,40 +285,55 @@ class JekyllDocumentationWriter:
                     record_id=f.record.id,
                     field_qname=f.qname,
                     spec=self.field_to_dict(f),
-                )
+                ),
             )
+            written.append(data_file)
 
+        self._remove_stale(dir, written)
+        self._save_hashes()
         return dir
 
+    @instrumented("jekyll.write_datatype_collection")
     def write_datatype_collection(self, spec: Specification, only_used=True) -> Path:
+        self._use_spec(spec)
         dir = self.jekyll_dir / self.collection_prefix / "_datatypes"
         dir.mkdir(parents=True, exist_ok=True)
 
         datatypes = spec.used_datatypes if only_used else spec.datatypes
 
+        written = []
         for d in datatypes:
             data_file = dir / f"{d.id}.md"
-            data_file.write_text(
+            self._write_output(
+                data_file,
                 _write__with_frontmatter(
                     "",
                     layout="datatype",
                     datatype_id=d.id,
                     spec=self.datatype_to_dict(d),
-                )
+                ),
             )
+            written.append(data_file)
 
+        self._remove_stale(dir, written)
+        self._save_hashes()
         return dir
 
+    @instrumented("jekyll.write_all_collections")
     def write_all_collections(self, spec: Specification) -> None:
+        self._use_spec(spec)
         self.write_record_collection(spec)
         self.write_field_collection(spec)
         self.write_datatype_collection(spec)
 
+    @instrumented("jekyll.write_all_data")
     def write_all_data(self, spec: Specification) -> None:
+        self._use_spec(spec)
         self.write_record_data(spec)
         self.write_field_data(spec)
         self.write_datatypes_data(spec)
 
+    @instrumented("jekyll.copy_templates")
     def copy_templates(self, template_dir: Path = None) -> None:
         if template_dir is None:
             template_dir = Path(__file__).parent / "templates/jekyll"
@@ -182,43 +350,75 @@ class JekyllDocumentationWriter:
                 else:
                     print(f"Skipping {dest} because it already exists")
 
+    @instrumented("jekyll.generate_embeddable_erd")
     def generate_embeddable_erd(
-        self, spec: Specification, link_pattern="/records/{record_id}.html"
-    ):
+        self,
+        spec: Specification,
+        link_pattern="/records/{record_id}.html",
+        cache_dir: Path = None,
+        target: Union[Path, IO[bytes]] = None,
+    ) -> Optional[bytes]:
         """
-        This function generates an embeddable ERD diagram for the Jekyll site. It's a bit of a hack and is quite dependent on graphviz creating
-        the same SVG structure every time. It's also not very efficient, as it reads the SVG file into memory and then writes it out again.
+        Generates an embeddable ERD diagram for the Jekyll site. This depends on graphviz creating the same SVG
+        structure every time: the background polygon is removed and each node is wrapped in a link to the record
+        page.
 
-        However, it's a start and it works for now.
+        The SVG is rewritten in a single streaming pass. If a target file or stream is given the output is
+        written there directly and None is returned, otherwise the output is returned.
         """
         from sfdata_schema.docgen.erd import graphviz_render_erd
 
-        namespaces = {"svg": "http://www.w3.org/2000/svg"}
-        ET.register_namespace("", "http://www.w3.org/2000/svg")
-
-        svg_content = graphviz_render_erd(spec, "svg")
+        svg_content = graphviz_render_erd(spec, "svg", cache_dir=cache_dir)
+        if target is None:
+            return _make_embeddable(svg_content, link_pattern)
 
-        root = ET.fromstring(svg_content)
-        root.attrib["width"] = "auto"
-        root.attrib["height"] = "auto"
+        source = io.BytesIO(svg_content)
+        if isinstance(target, (str, Path)):
+            with open(target, "wb") as file:
+                write_embeddable_svg(source, file, link_pattern)
+        else:
+            write_embeddable_svg(source, target, link_pattern)
+        return None
 
-        root_graph = root.find("svg:g", namespaces)
-        background = root_graph.find("svg:polygon", namespaces)
-        root_graph.remove(background)
-
-        sub_graphs = root_graph.findall("svg:g", namespaces)
-        for sg in sub_graphs:
-            if sg.attrib["class"] != "node":
-                continue
-            root_graph.remove(sg)
+    @instrumented("jekyll.write_record_erds")
+    def write_record_erds(
+        self,
+        spec: Specification,
+        hops: int = 1,
+        link_pattern="/records/{record_id}.html",
+        engine: str = "dot",
+        max_workers: int = None,
+        cache_dir: Path = None,
+    ) -> Path:
+        """
+        Writes a local ERD for each record to _includes/erd/<record_id>.svg, showing the records within the given
+        number of foreign key hops. The diagrams are laid out in parallel.
+        """
+        from sfdata_schema.docgen.erd.partition import (
+            graphviz_render_partitions,
+            partition_erd,
+        )
 
-            filename = link_pattern.format(record_id=sg.attrib["id"])
-            link = ET.Element("a")
-            link.attrib["href"] = "{{ '" + filename + "' | relative_url }}"
-            root_graph.append(link)
-            link.append(sg)
+        dir = self.jekyll_dir / "_includes" / "erd"
+        dir.mkdir(parents=True, exist_ok=True)
 
-        return ET.tostring(root, encoding="utf-8")
+        partitions = partition_erd(spec, "neighbourhood", hops=hops)
+        rendered = graphviz_render_partitions(
+            spec,
+            partitions,
+            "svg",
+            engine=engine,
+            max_workers=max_workers,
+            cache_dir=cache_dir,
+            overview=False,
+        )
+
+        for record_id, svg_content in rendered.items():
+            content = _make_embeddable(svg_content, link_pattern)
+            self._write_output(dir / f"{record_id}.svg", content.decode("utf-8"))
+
+        self._save_hashes()
+        return dir
 
     # def write_gitinfo():
     #     dir = jekyll_dir / "_data"
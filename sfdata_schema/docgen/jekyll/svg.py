@@ -0,0 +1,107 @@
+import shutil
+import xml.sax
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional
+from xml.sax.handler import ContentHandler
+from xml.sax.saxutils import escape, quoteattr
+
+from sfdata_schema.instrumentation import instrumented
+
+# Node groups are held in a temporary file until the end of the graph, spilling to disk beyond this size
+_SPOOL_SIZE = 1024 * 1024
+
+
+class EmbeddableSvgWriter(ContentHandler):
+    """
+    Rewrites a graphviz SVG for embedding in a Jekyll page, in a single streaming pass:
+
+    * the width and height of the root element are set to 'auto'
+    * the background polygon of the graph is removed
+    * each node group is wrapped in a link to its record page, and moved after the other elements of the graph
+      so nodes are drawn on top of edges
+
+    The moved node groups are buffered in a temporary file that spills to disk, so memory use stays bounded
+    regardless of the size of the diagram. Namespace processing is disabled, so prefixes and xmlns attributes are
+    copied unchanged.
+    """
+
+    def __init__(self, out: IO[bytes], link_pattern: str):
+        super().__init__()
+        self._out = out
+        self._link_pattern = link_pattern
+        self._nodes = SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+        self._depth = 0
+        self._skip_depth: Optional[int] = None
+        self._node_depth: Optional[int] = None
+        self._in_graph = False
+        self._graph_seen = False
+        self._background_removed = False
+
+    def _write(self, text: str) -> None:
+        target = self._out if self._node_depth is None else self._nodes
+        target.write(text.encode("utf-8"))
+
+    def startDocument(self):
+        self._out.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+
+    def startElement(self, name, attrs):
+        self._depth += 1
+        if self._skip_depth is not None:
+            return
+
+        attrs = dict(attrs)
+        depth = self._depth
+        if depth == 1:
+            attrs["width"] = "auto"
+            attrs["height"] = "auto"
+        elif depth == 2 and name == "g" and not self._graph_seen:
+            self._in_graph = self._graph_seen = True
+        elif depth == 3 and self._in_graph:
+            if name == "polygon" and not self._background_removed:
+                self._background_removed = True
+                self._skip_depth = depth
+                return
+            if name == "g" and attrs.get("class") == "node":
+                self._node_depth = depth
+                filename = self._link_pattern.format(record_id=attrs.get("id"))
+                href = "{{ '" + filename + "' | relative_url }}"
+                self._write(f"<a href={quoteattr(href)}>")
+
+        attributes = "".join(f" {k}={quoteattr(v)}" for k, v in attrs.items())
+        self._write(f"<{name}{attributes}>")
+
+    def endElement(self, name):
+        depth = self._depth
+        self._depth -= 1
+        if self._skip_depth is not None:
+            if depth == self._skip_depth:
+                self._skip_depth = None
+            return
+
+        if depth == 2 and self._in_graph:
+            self._in_graph = False
+            self._nodes.seek(0)
+            shutil.copyfileobj(self._nodes, self._out)
+            self._nodes.close()
+
+        self._write(f"</{name}>")
+        if depth == self._node_depth:
+            self._write("</a>")
+            self._node_depth = None
+
+    def characters(self, content):
+        if self._skip_depth is None:
+            self._write(escape(content))
+
+    def ignorableWhitespace(self, whitespace):
+        self.characters(whitespace)
+
+
+@instrumented("svg.rewrite")
+def write_embeddable_svg(source: IO[bytes], target: IO[bytes], link_pattern: str):
+    """Streams a graphviz SVG from source to target, rewriting it with :class:`EmbeddableSvgWriter`."""
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, False)
+    parser.setFeature(xml.sax.handler.feature_external_ges, False)
+    parser.setContentHandler(EmbeddableSvgWriter(target, link_pattern))
+    parser.parse(source)
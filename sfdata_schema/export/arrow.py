@@ -0,0 +1,87 @@
+from typing import Any, Callable, Dict, Mapping
+
+from sfdata_schema.spec import Field, Record, TabularSchema
+from sfdata_schema.spec.datatypes import (
+    Datatype,
+    base_datatype,
+    effective_restriction,
+)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow export requires the pyarrow package")
+    return pyarrow
+
+
+ARROW_TYPES: Mapping[str, Callable[[Any], Any]] = {
+    "string": lambda pa: pa.string(),
+    "integer": lambda pa: pa.int64(),
+    "number": lambda pa: pa.float64(),
+    "boolean": lambda pa: pa.bool_(),
+    "date": lambda pa: pa.date32(),
+    "time": lambda pa: pa.time64("us"),
+    "datetime": lambda pa: pa.timestamp("us"),
+    "year": lambda pa: pa.int32(),
+    "yearmonth": lambda pa: pa.string(),
+    "monthday": lambda pa: pa.string(),
+}
+
+
+def arrow_type(datatype: Datatype):
+    """
+    Returns the Arrow type for a datatype, based on the standard type it extends. Datatypes that do not extend a
+    standard type are strings. Numbers restricted by both total and fraction digits are decimals, and datatypes
+    restricted to an enumeration are dictionary encoded.
+    """
+    pa = _import_pyarrow()
+    base_id = base_datatype(datatype).id
+    value_type = ARROW_TYPES.get(base_id, ARROW_TYPES["string"])(pa)
+
+    restriction = effective_restriction(datatype)
+    if restriction is None:
+        return value_type
+    if (
+        base_id == "number"
+        and restriction.total_digits is not None
+        and restriction.fraction_digits is not None
+    ):
+        value_type = pa.decimal128(
+            restriction.total_digits, restriction.fraction_digits
+        )
+    if restriction.enumeration is not None:
+        return pa.dictionary(pa.int32(), value_type)
+    return value_type
+
+
+def arrow_field(field: Field):
+    """
+    Returns the Arrow field for a schema field. The column is named after the field label, and only primary key
+    columns are declared as not nullable. The field id and datatype are kept in the field metadata.
+    """
+    pa = _import_pyarrow()
+    metadata = {"sfdata.id": field.id, "sfdata.datatype": field.datatype.id}
+    if field.description:
+        metadata["description"] = field.description
+    return pa.field(
+        field.label,
+        arrow_type(field.datatype),
+        nullable=not field.primary_key,
+        metadata=metadata,
+    )
+
+
+def record_to_arrow_schema(record: Record):
+    """Returns the Arrow schema for a record, with a column for each field in order."""
+    pa = _import_pyarrow()
+    metadata = {"sfdata.id": record.id}
+    if record.description:
+        metadata["description"] = record.description
+    return pa.schema([arrow_field(f) for f in record.fields], metadata=metadata)
+
+
+def schema_to_arrow(schema: TabularSchema) -> Dict[str, Any]:
+    """Returns the Arrow schema of each record, keyed by record id."""
+    return {r.id: record_to_arrow_schema(r) for r in schema.records}
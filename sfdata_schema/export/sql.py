@@ -0,0 +1,164 @@
+import math
+from datetime import date, datetime, time
+from typing import Any, List, Mapping, Tuple
+
+from sfdata_schema.spec import Field, Record, TabularSchema, foreign_key_scan_order
+from sfdata_schema.spec.datatypes import (
+    Datatype,
+    base_datatype,
+    effective_restriction,
+)
+
+SQL_TYPES: Mapping[str, str] = {
+    "string": "TEXT",
+    "integer": "INTEGER",
+    "number": "REAL",
+    "boolean": "BOOLEAN",
+    "date": "DATE",
+    "time": "TIME",
+    "datetime": "TIMESTAMP",
+    "year": "INTEGER",
+    "yearmonth": "TEXT",
+    "monthday": "TEXT",
+}
+
+_BOUND_OPERATORS = (
+    ("min_inclusive", ">="),
+    ("min_exclusive", ">"),
+    ("max_inclusive", "<="),
+    ("max_exclusive", "<"),
+)
+
+_LENGTH_OPERATORS = (
+    ("length", "="),
+    ("min_length", ">="),
+    ("max_length", "<="),
+)
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value: Any) -> str:
+    """
+    Returns a value as an SQL literal. Booleans are 1 and 0, and dates and times are ISO 8601 strings. Infinities
+    and NaN have no SQL literal, and raise ValueError.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"{value!r} cannot be written as an SQL literal")
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (date, datetime, time)):
+        value = value.isoformat()
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_type(datatype: Datatype) -> str:
+    """
+    Returns the SQL column type for a datatype, based on the standard type it extends. Datatypes that do not extend
+    a standard type are text, and numbers restricted by both total and fraction digits are NUMERIC(p, s).
+    """
+    base_id = base_datatype(datatype).id
+    restriction = effective_restriction(datatype)
+    if (
+        base_id == "number"
+        and restriction is not None
+        and restriction.total_digits is not None
+        and restriction.fraction_digits is not None
+    ):
+        return f"NUMERIC({restriction.total_digits}, {restriction.fraction_digits})"
+    return SQL_TYPES.get(base_id, SQL_TYPES["string"])
+
+
+def _bound_value(value: Any, datatype: Datatype) -> Any:
+    # Imported here so that exporting DDL does not import the validators
+    from sfdata_schema.validation.coerce import get_coercer
+
+    if not isinstance(value, str):
+        return value
+    try:
+        return get_coercer(datatype, cache_size=0, use_options=False)(value)
+    except ValueError:
+        return value
+
+
+def field_checks(field: Field) -> List[Tuple[str, str]]:
+    """
+    Returns the restriction facets of a field's datatype that can be expressed in SQL, as pairs of facet name and
+    a boolean SQL expression over the column. Enumerations, bounds and lengths are included. Patterns and digit
+    counts have no portable SQL form and are left out.
+    """
+    restriction = effective_restriction(field.datatype)
+    if restriction is None:
+        return []
+
+    column = quote_identifier(field.id)
+    checks = []
+    if restriction.enumeration is not None:
+        members = ", ".join(
+            sql_literal(_bound_value(m, field.datatype))
+            for m in restriction.enumeration
+        )
+        checks.append(("enumeration", f"{column} IN ({members})"))
+    for facet, operator in _BOUND_OPERATORS:
+        bound = getattr(restriction, facet)
+        if bound is not None:
+            literal = sql_literal(_bound_value(bound, field.datatype))
+            checks.append((facet, f"{column} {operator} {literal}"))
+    for facet, operator in _LENGTH_OPERATORS:
+        length = getattr(restriction, facet)
+        if length is not None:
+            checks.append((facet, f"length({column}) {operator} {length}"))
+    return checks
+
+
+def record_to_sql(record: Record, constraints: bool = True) -> str:
+    """
+    Returns a CREATE TABLE statement for a record. The table is named after the record id and has a column for each
+    field, named after the field id.
+
+    With constraints, the primary key fields are NOT NULL and make up the PRIMARY KEY, each foreign key is a
+    FOREIGN KEY constraint and each facet from :func:`field_checks` is a CHECK constraint. Without them, the
+    table accepts any values, so that invalid data can be loaded and then reported on.
+    """
+    lines = []
+    for f in record.fields:
+        line = f"{quote_identifier(f.id)} {sql_type(f.datatype)}"
+        if constraints:
+            if f.primary_key:
+                line += " NOT NULL"
+            for _, expression in field_checks(f):
+                line += f" CHECK ({expression})"
+        lines.append(line)
+
+    if constraints:
+        primary_keys = record.primary_keys
+        if primary_keys:
+            columns = ", ".join(quote_identifier(f.id) for f in primary_keys)
+            lines.append(f"PRIMARY KEY ({columns})")
+        for f in record.fields:
+            for parent in f.foreign_keys:
+                lines.append(
+                    f"FOREIGN KEY ({quote_identifier(f.id)}) REFERENCES "
+                    f"{quote_identifier(parent.record.id)} ({quote_identifier(parent.id)})"
+                )
+
+    body = ",\n    ".join(lines)
+    return f"CREATE TABLE {quote_identifier(record.id)} (\n    {body}\n)"
+
+
+def schema_to_sql(schema: TabularSchema, constraints: bool = True) -> str:
+    """
+    Returns the DDL for a schema, as a CREATE TABLE statement for each record. Tables are created after the tables
+    their foreign keys refer to.
+    """
+    statements = [
+        record_to_sql(schema.get_record(id), constraints)
+        for id in foreign_key_scan_order(schema)
+    ]
+    return "".join(f"{s};\n\n" for s in statements)
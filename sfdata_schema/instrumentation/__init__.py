@@ -0,0 +1,197 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+SpanHook = Callable[["Span"], None]
+
+
+@dataclass
+class Span:
+    """
+    A named, timed stage of work. Spans started while another span is open on the same thread are its children,
+    and have a depth one greater. Times are from :func:`time.perf_counter`, in seconds.
+    """
+
+    name: str
+    start: float
+    end: Optional[float] = None
+    depth: int = 0
+    thread: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list, repr=False)
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+
+_hooks: List[SpanHook] = []
+_local = threading.local()
+
+
+def add_hook(hook: SpanHook) -> SpanHook:
+    """
+    Registers a function that is called with every span when it ends, for example to forward timings to a metrics
+    library. Spans are only recorded while at least one hook is registered. Returns the hook, so this can be used
+    as a decorator.
+    """
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: SpanHook) -> None:
+    _hooks.remove(hook)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Times the enclosed block as a span with the given name and attributes. If no hooks are registered this does
+    nothing and yields None, so instrumented code costs next to nothing in normal use.
+    """
+    if not _hooks:
+        yield None
+        return
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    current = Span(
+        name,
+        time.perf_counter(),
+        depth=len(stack),
+        thread=threading.get_ident(),
+        attributes=attributes,
+    )
+    if stack:
+        stack[-1].children.append(current)
+    stack.append(current)
+    try:
+        yield current
+    finally:
+        current.end = time.perf_counter()
+        stack.pop()
+        for hook in tuple(_hooks):
+            hook(current)
+
+
+def instrumented(name: str):
+    """Decorates a function so every call is timed as a span with the given name."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass
+class _SpanSummary:
+    name: str
+    calls: int = 0
+    total: float = 0.0
+    children: Dict[str, "_SpanSummary"] = field(default_factory=dict)
+
+    @property
+    def own(self) -> float:
+        return max(self.total - sum(c.total for c in self.children.values()), 0.0)
+
+
+def _summarise(spans: List[Span], summaries: Dict[str, _SpanSummary]) -> None:
+    for s in spans:
+        summary = summaries.setdefault(s.name, _SpanSummary(s.name))
+        summary.calls += 1
+        summary.total += s.duration
+        _summarise(s.children, summary.children)
+
+
+class SpanRecorder:
+    """
+    A hook that keeps every top level span, with its children, so a run can be reported once it is complete. Use
+    it as a context manager to register and remove it.
+
+    Spans started on other threads, such as the graphviz layouts run in a thread pool, are recorded as top level
+    spans of their own.
+    """
+
+    def __init__(self):
+        self.roots: List[Span] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        if span.depth == 0:
+            with self._lock:
+                self.roots.append(span)
+
+    def __enter__(self) -> "SpanRecorder":
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        remove_hook(self)
+
+    def format_tree(self) -> str:
+        """
+        Formats the recorded spans as an indented tree. Spans with the same name under the same parent are merged,
+        and shown with the number of calls, their total time and the time not spent in child spans.
+        """
+        summaries: Dict[str, _SpanSummary] = {}
+        _summarise(self.roots, summaries)
+
+        rows = []
+
+        def visit(summary: _SpanSummary, indent: int):
+            rows.append((" " * indent + summary.name, summary))
+            for child in summary.children.values():
+                visit(child, indent + 2)
+
+        for summary in summaries.values():
+            visit(summary, 0)
+        if not rows:
+            return "No spans recorded"
+
+        width = max(len(label) for label, _ in rows)
+        lines = [f"{'span':<{width}}  {'calls':>6}  {'total ms':>10}  {'self ms':>10}"]
+        for label, s in rows:
+            lines.append(
+                f"{label:<{width}}  {s.calls:>6}  {s.total * 1000:>10.1f}  {s.own * 1000:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Returns the recorded spans as complete events in the Trace Event Format read by chrome://tracing."""
+        events = []
+
+        def visit(s: Span):
+            events.append(
+                dict(
+                    name=s.name,
+                    ph="X",
+                    ts=s.start * 1e6,
+                    dur=s.duration * 1e6,
+                    pid=0,
+                    tid=s.thread,
+                    args={k: str(v) for k, v in s.attributes.items()},
+                )
+            )
+            for child in s.children:
+                visit(child)
+
+        for root in self.roots:
+            visit(root)
+        return events
+
+    def write_trace(self, path: Union[str, Path]) -> None:
+        import json
+
+        Path(path).write_text(json.dumps({"traceEvents": self.trace_events()}))
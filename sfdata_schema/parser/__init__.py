@@ -1,11 +1,26 @@
+import logging
+import os
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Protocol, Union, runtime_checkable
-
-import json5
-import yaml
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
 from sfdata_schema import spec
-from sfdata_schema.spec.datatypes import STANDARD_TYPES, Datatype, DatatypeRestriction
+from sfdata_schema.instrumentation import instrumented
+from sfdata_schema.spec.datatypes import (
+    Datatype,
+    DatatypeRegistry,
+    DatatypeRestriction,
+)
 
 
 @runtime_checkable
@@ -15,39 +30,284 @@ class Readable(Protocol):
 
 ParserInput = Union[Dict[str, Any], Readable, str, Path]
 
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".json": "json",
+    ".json5": "json5",
+}
+
+MANIFEST_NAMES = ("schema.yml", "schema.yaml", "schema.json", "schema.json5")
+
 
-def parse_schema(schema: ParserInput) -> spec.TabularSchema:
+@instrumented("parse_schema")
+def parse_schema(
+    schema: ParserInput,
+    cache_dir: Optional[Union[str, Path]] = None,
+    format: Optional[str] = None,
+) -> spec.TabularSchema:
+    """
+    Parses a schema from a dictionary, a readable stream, a YAML or JSON file, or a directory of files.
+
+    Records in a schema document can be given as the path of a separate file, relative to the document, instead
+    of inline. These records are only parsed when they are first accessed. See :func:`parse_directory` for the
+    layout of a directory.
+
+    The format is one of 'yaml', 'json' or 'json5'. If not given, it is taken from the file extension, or
+    detected from the content. See :func:`load_document` for the parser backends used for each format.
+
+    If a cache directory is given, the parsed schema is stored there in pickled form, keyed by a hash of the
+    source content, its format and the library version. Later calls with the same content load the pickle instead
+    of parsing the source again. Schemas that refer to other files are not cached whole, but the documents loaded
+    from those files are.
+    """
+    base_dir = Path.cwd()
     if isinstance(schema, dict):
-        return _parse_dict(schema)
+        return _parse_dict(schema, base_dir)
     elif isinstance(schema, Readable):
-        return _parse_string(schema.read())
-    elif isinstance(schema, str):
-        return _parse_file(Path(str))
-    elif isinstance(schema, Path):
-        return _parse_file(schema)
+        content = schema.read()
+    elif isinstance(schema, (str, Path)):
+        path = Path(schema)
+        if path.is_dir():
+            return parse_directory(path, cache_dir)
+        base_dir = path.parent
+        content = path.read_text()
+        if format is None:
+            format = FORMAT_EXTENSIONS.get(path.suffix.lower())
+    else:
+        raise TypeError(f"Cannot parse schema from {type(schema).__name__}")
 
+    if cache_dir is None:
+        return _parse_string(content, format, base_dir)
+    return _parse_string_cached(content, Path(cache_dir), format, base_dir)
 
-def _parse_file(path: Path) -> spec.TabularSchema:
-    with path.open("rt") as f:
-        return _parse_string(f.read())
 
+def parse_directory(
+    path: Path, cache_dir: Optional[Union[str, Path]] = None
+) -> spec.TabularSchema:
+    """
+    Parses a schema split over a directory of files. If the directory contains a manifest named 'schema.yml' (or
+    .yaml, .json, .json5), that is parsed as a schema document whose records refer to the record files.
 
-def _parse_string(content: str) -> spec.TabularSchema:
-    if content.startswith("{"):
-        content = json5.loads(content)
-    else:
-        content = yaml.safe_load(content)
-    return _parse_dict(content)
+    Otherwise the schema id is the name of the directory, the datatypes are read from a file named 'datatypes'
+    with any supported extension, and every other supported file holds one record, named after the file.
+
+    Datatypes are parsed up front. Each record is only parsed when it is first accessed. If a cache directory is
+    given, the documents loaded from the files are cached as described in :func:`parse_schema`.
+    """
+    path = Path(path)
+    for name in MANIFEST_NAMES:
+        if (path / name).is_file():
+            return parse_schema(path / name, cache_dir)
+
+    document = {"id": path.name, "records": {}}
+    for file in sorted(path.iterdir()):
+        if not file.is_file() or file.suffix.lower() not in FORMAT_EXTENSIONS:
+            continue
+        if file.stem == "datatypes":
+            document["datatypes"] = file.name
+        else:
+            document["records"][file.stem] = file.name
+
+    return _parse_dict(document, path, cache_dir)
+
+
+def _library_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("sfdata-schema")
+    except Exception:
+        return "unknown"
+
+
+def _cache_key(content: str, format: str, kind: str) -> str:
+    import hashlib
+
+    digest = hashlib.sha256()
+    for part in (_library_version(), kind, format):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(content.encode())
+    return digest.hexdigest()
+
+
+def _read_cache(cache_file: Path) -> Any:
+    # Only needed when caching, so not imported with the module
+    import pickle
+
+    if cache_file.exists():
+        try:
+            with cache_file.open("rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Unreadable or written by an incompatible version - parse and overwrite
+            pass
+    return None
+
+
+def _write_cache(cache_file: Path, value: Any) -> None:
+    import pickle
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_file.open("wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_file.replace(cache_file)
+
+
+def _parse_string_cached(
+    content: str, cache_dir: Path, format: Optional[str], base_dir: Path
+) -> spec.TabularSchema:
+    format = format or detect_format(content)
+    cache_file = cache_dir / f"{_cache_key(content, format, 'schema')}.pickle"
+    schema = _read_cache(cache_file)
+    if schema is not None:
+        return schema
+
+    document, _ = load_document(content, format)
+    cacheable = not _refers_to_files(document)
+    schema = _parse_dict(document, base_dir, cache_dir)
+    if cacheable:
+        _write_cache(cache_file, schema)
+    return schema
+
+
+def _load_document_cached(content: str, format: Optional[str], cache_dir: Path) -> Any:
+    """Loads a document as :func:`load_document` does, keeping the loaded content in the cache directory."""
+    format = format or detect_format(content)
+    cache_file = cache_dir / f"{_cache_key(content, format, 'document')}.pickle"
+    document = _read_cache(cache_file)
+    if document is None:
+        document, _ = load_document(content, format)
+        _write_cache(cache_file, document)
+    return document
+
+
+def _load_yaml(content: str) -> Tuple[Any, str]:
+    import yaml
 
+    try:
+        return yaml.load(content, Loader=yaml.CSafeLoader), "yaml-libyaml"
+    except AttributeError:
+        # PyYAML was built without libyaml
+        return yaml.load(content, Loader=yaml.SafeLoader), "yaml"
+
+
+def _load_json5(content: str) -> Tuple[Any, str]:
+    import json5
+
+    return json5.loads(content), "json5"
+
+
+def _load_json(content: str) -> Tuple[Any, str]:
+    try:
+        import orjson
+
+        loads, backend = orjson.loads, "orjson"
+    except ImportError:
+        import json
+
+        loads, backend = json.loads, "json"
+
+    try:
+        return loads(content), backend
+    except ValueError:
+        # Not strict JSON - it may still be valid JSON5, e.g. with comments or trailing commas
+        return _load_json5(content)
+
+
+_LOADERS = {
+    "yaml": _load_yaml,
+    "json": _load_json,
+    "json5": _load_json5,
+}
+
+
+def detect_format(content: str) -> str:
+    return "json" if content.lstrip().startswith("{") else "yaml"
+
+
+@instrumented("parse.load_document")
+def load_document(content: str, format: Optional[str] = None) -> Tuple[Any, str]:
+    """
+    Loads a YAML or JSON document using the fastest backend available, and returns the content together with the
+    name of the backend that was used.
+
+    YAML is loaded with the libyaml based CSafeLoader if PyYAML was built with it. JSON is loaded with orjson if
+    installed, or the standard library json module, falling back to json5 for documents that are not strict
+    JSON. Documents in the 'json5' format are always loaded with json5.
+    """
+    if format is None:
+        format = detect_format(content)
+    try:
+        loader = _LOADERS[format]
+    except KeyError:
+        raise ValueError(f"Unknown schema format '{format}'") from None
+
+    data, backend = loader(content)
+    logger.debug("Loaded %s schema document using %s", format, backend)
+    return data, backend
+
+
+def _parse_string(
+    content: str, format: Optional[str] = None, base_dir: Optional[Path] = None
+) -> spec.TabularSchema:
+    content, _ = load_document(content, format)
+    return _parse_dict(content, base_dir)
+
+
+def _load_file(path: Path, cache_dir: Optional[Path] = None) -> Any:
+    content, format = path.read_text(), FORMAT_EXTENSIONS.get(path.suffix.lower())
+    if cache_dir is not None:
+        return _load_document_cached(content, format, cache_dir)
+    content, _ = load_document(content, format)
+    return content
+
+
+def _refers_to_files(document: Dict[str, Any]) -> bool:
+    records = document.get("records") or {}
+    return isinstance(document.get("datatypes"), str) or any(
+        isinstance(r, str) for r in records.values()
+    )
+
+
+def _load_record_file(
+    path: Path, id: str, schema: spec.TabularSchema, cache_dir: Optional[Path] = None
+) -> None:
+    record = _load_file(path, cache_dir) or {}
+    record["id"] = id
+    parse_record(schema, record)
+
+
+@instrumented("parse.build_schema")
+def _parse_dict(
+    schema: Dict[str, Any],
+    base_dir: Optional[Path] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> spec.TabularSchema:
+    base_dir = base_dir or Path.cwd()
+    cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    datatypes = schema.pop("datatypes", {})
+    if isinstance(datatypes, str):
+        datatypes = _load_file(base_dir / datatypes, cache_dir) or {}
+    datatypes = parse_datatypes(datatypes)
 
-def _parse_dict(schema: Dict[str, Any]) -> spec.TabularSchema:
-    datatypes = parse_datatypes(schema.pop("datatypes", {}))
     records = schema.pop("records", {})
     if "id" not in schema:
         schema["id"] = "unknown"
 
     schema = spec.TabularSchema(**schema, datatypes=datatypes)
     for id, record in records.items():
+        if isinstance(record, str):
+            schema.add_record_loader(
+                id,
+                partial(_load_record_file, base_dir / record, id, cache_dir=cache_dir),
+            )
+            continue
         if "id" not in record:
             record["id"] = id
         parse_record(schema, record)
@@ -56,38 +316,47 @@ def _parse_dict(schema: Dict[str, Any]) -> spec.TabularSchema:
 
 
 def parse_datatype(
-    datatype: Dict[str, Any], datatypes: Iterable[spec.Datatype] = None
+    datatype: Dict[str, Any],
+    datatypes: Union[DatatypeRegistry, Iterable[spec.Datatype]] = None,
 ) -> spec.Datatype:
+    if datatypes is None or isinstance(datatypes, DatatypeRegistry):
+        registry = datatypes
+    else:
+        registry = DatatypeRegistry(datatypes)
+
     if "extends" in datatype:
-        if datatypes is None:
+        if registry is None:
             raise ValueError("Cannot extend a datatype without a list of datatypes")
 
-        extends = next((dt for dt in datatypes if dt.id == datatype["extends"]), None)
-        if extends is None:
+        try:
+            extends = registry.get(datatype["extends"])
+        except KeyError:
             raise ValueError(
                 f"Cannot find datatype {datatype['extends']} to extend from"
-            )
+            ) from None
 
         datatype["extends"] = extends
 
     if "restriction" in datatype:
-        datatype["restriction"] = DatatypeRestriction(**datatype["restriction"])
+        restriction = DatatypeRestriction(**datatype["restriction"])
+        if registry is not None:
+            restriction = registry.intern_restriction(restriction)
+        datatype["restriction"] = restriction
 
     return Datatype(**datatype)
 
 
 def parse_datatypes(datatypes: Dict[str, Dict[str, str]]) -> List[spec.Datatype]:
-    datatype_list = list(STANDARD_TYPES)
+    registry = DatatypeRegistry()
     for id, datatype in datatypes.items():
         if "id" not in datatype:
             datatype["id"] = id
-        dt = parse_datatype(datatype, datatype_list)
-        datatype_list.append(dt)
-    return datatype_list
+        registry.add(parse_datatype(datatype, registry))
+    return registry.datatypes
 
 
 def parse_record(schema: spec.TabularSchema, record: Dict[str, Any]) -> spec.Record:
-    fields = record.pop("fields") or {}
+    fields = record.pop("fields", None) or {}
 
     schema_record = schema.add_record(**record)
     for id, field in fields.items():
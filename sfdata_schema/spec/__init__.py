@@ -1,4 +1,5 @@
-from typing import Any, Iterable, List, Mapping, Optional, Tuple
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from .datatypes import DT_STRING, STANDARD_TYPES, Datatype
 
@@ -27,11 +28,46 @@ class __FieldSummary__:
         return ", ".join([f"{field}='{value}'" for field, value in self.fields])
 
 
+class _EmptyOptions(dict):
+    """
+    An empty, read-only options mapping. A single instance is shared by every item created without options, so
+    items do not each hold an empty dict.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Options shared between schema items cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Pickles and copies resolve to the shared instance
+        return "EMPTY_OPTIONS"
+
+
+EMPTY_OPTIONS = _EmptyOptions()
+
+
+def _intern(value):
+    """Interns strings such as ids and labels, which are repeated across records and schema versions."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _compact_options(options: Optional[Mapping[str, Any]]) -> Mapping[str, Any]:
+    if not options:
+        return EMPTY_OPTIONS
+    return {_intern(key): value for key, value in options.items()}
+
+
 class SchemaItem:
     """Base class for all schema items. This class is used to define the common attributes and methods for all schema
     items.
     """
 
+    __slots__ = ("_id", "_schema", "_description", "_options")
+
     def __init__(
         self,
         id: str,
@@ -39,10 +75,10 @@ class SchemaItem:
         description: Optional[str] = None,
         options: Optional[Mapping[str, Any]] = None,
     ):
-        self._id = id
+        self._id = _intern(id)
         self._schema = schema
         self._description = description
-        self._options = options or {}
+        self._options = _compact_options(options)
 
     @property
     def id(self) -> str:
@@ -85,6 +121,8 @@ class CategoricalValueItem(SchemaItem):
     representation of the value.
     """
 
+    __slots__ = ("_label",)
+
     def __init__(
         self,
         id: str,
@@ -94,7 +132,7 @@ class CategoricalValueItem(SchemaItem):
         options: Optional[Mapping[str, Any]] = None,
     ):
         super().__init__(id, schema, description, options)
-        self._label = label
+        self._label = _intern(label)
 
 
 class CategoricalValueType(Datatype):
@@ -122,6 +160,16 @@ class Field(SchemaItem):
     element name.
     """
 
+    __slots__ = (
+        "_record",
+        "_label",
+        "_datatype",
+        "_primary_key",
+        "_foreign_keys",
+        "_foreign_key_fields",
+        "_fingerprint",
+    )
+
     def __init__(
         self,
         id: str,
@@ -135,10 +183,12 @@ class Field(SchemaItem):
     ):
         super().__init__(id, record.schema, description, options)
         self._record = record
-        self._label = label or id
+        self._label = _intern(label or id)
         self._datatype = record.schema.get_datatype(datatype)
         self._primary_key = primary_key
-        self._foreign_keys = foreign_keys or tuple()
+        self._foreign_keys = tuple(_intern(fk) for fk in foreign_keys or ())
+        self._foreign_key_fields = None
+        self._fingerprint = None
 
     @property
     def record(self) -> "Record":
@@ -166,11 +216,25 @@ class Field(SchemaItem):
 
     @property
     def foreign_keys(self) -> Tuple["Field"]:
-        return tuple(self.schema.get_field(fk) for fk in self._foreign_keys)
+        # Resolved on first access, as the referenced records may not exist yet
+        if self._foreign_key_fields is None:
+            self._foreign_key_fields = tuple(
+                self.schema.get_field(fk) for fk in self._foreign_keys
+            )
+        return self._foreign_key_fields
 
     @property
     def foreign_key_names(self) -> Tuple[str]:
-        return tuple(self._foreign_keys)
+        return self._foreign_keys
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the content of the field, including its datatype."""
+        if self._fingerprint is None:
+            from .fingerprint import field_fingerprint
+
+            self._fingerprint = field_fingerprint(self)
+        return self._fingerprint
 
 
 class Record(SchemaItem):
@@ -181,6 +245,8 @@ class Record(SchemaItem):
     the table or sheet name.
     """
 
+    __slots__ = ("_label", "_fields", "_fields_tuple", "_field_index", "_fingerprint")
+
     def __init__(
         self,
         id: str,
@@ -190,8 +256,11 @@ class Record(SchemaItem):
         options: Optional[Mapping[str, Any]] = None,
     ):
         super().__init__(id, schema, description, options)
-        self._label = label
+        self._label = _intern(label)
         self._fields = []
+        self._fields_tuple = None
+        self._field_index: Dict[str, Field] = {}
+        self._fingerprint = None
 
     @property
     def schema(self) -> "Schema":
@@ -225,21 +294,39 @@ class Record(SchemaItem):
             options=options,
         )
         self._fields.append(field)
+        self._fields_tuple = None
+        self._fingerprint = None
+        self._field_index.setdefault(field.id, field)
+        self.schema._index_field(field)
         return field
 
     @property
     def fields(self) -> Tuple[Field]:
-        return tuple(self._fields)
+        if self._fields_tuple is None:
+            self._fields_tuple = tuple(self._fields)
+        return self._fields_tuple
 
     @property
     def primary_keys(self) -> Tuple[Field]:
         return tuple(f for f in self.fields if f.primary_key)
 
     def get_field(self, id: str) -> Field:
-        for field in self.fields:
-            if field.id == id:
-                return field
-        raise KeyError(f"Field '{id}' not found in record '{self.id}'")
+        try:
+            return self._field_index[id]
+        except KeyError:
+            raise KeyError(f"Field '{id}' not found in record '{self.id}'") from None
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the content of the record, built from the fingerprints of its fields."""
+        if self._fingerprint is None:
+            from .fingerprint import record_fingerprint
+
+            self._fingerprint = record_fingerprint(self)
+        return self._fingerprint
+
+
+RecordLoader = Callable[["TabularSchema"], Any]
 
 
 class Schema(SchemaItem):
@@ -247,13 +334,15 @@ class Schema(SchemaItem):
     This is a common subclass for schema objects, whether tabular or hierarchical.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         id: str,
         description: Optional[str] = None,
         options: Optional[Mapping[str, Any]] = None,
     ):
-        super().__init__(id, description, options)
+        super().__init__(id, None, description, options)
 
 
 class TabularSchema(Schema):
@@ -262,6 +351,18 @@ class TabularSchema(Schema):
     with multiple sheets or a collection of CSV files.
     """
 
+    __slots__ = (
+        "_version",
+        "_records",
+        "_records_tuple",
+        "_record_index",
+        "_record_loaders",
+        "_field_index",
+        "_datatypes",
+        "_datatype_index",
+        "_fingerprint",
+    )
+
     def __init__(
         self,
         id: str,
@@ -273,7 +374,15 @@ class TabularSchema(Schema):
         super().__init__(id, description, options)
         self._version = version
         self._records = []
+        self._records_tuple = None
+        self._record_index: Dict[str, Record] = {}
+        self._record_loaders: Dict[str, Tuple[int, RecordLoader]] = {}
+        self._field_index: Dict[str, Field] = {}
         self._datatypes = tuple(datatypes or [])
+        self._datatype_index: Dict[str, Datatype] = {}
+        for datatype in self._datatypes:
+            self._datatype_index.setdefault(datatype.id, datatype)
+        self._fingerprint = None
 
     def add_record(
         self,
@@ -295,12 +404,54 @@ class TabularSchema(Schema):
             description=description,
             options=options,
         )
-        self._records.append(record)
+        pending = self._record_loaders.pop(id, None)
+        if pending is None:
+            self._records.append(record)
+        else:
+            self._records[pending[0]] = record
+        self._records_tuple = None
+        self._record_index.setdefault(record.id, record)
+        self._fingerprint = None
         return record
 
+    def add_record_loader(self, id: str, loader: "RecordLoader") -> None:
+        """
+        Registers a record that is only created when it is first needed, either by :meth:`get_record` or by
+        listing the records. The loader is called with the schema and must add the record with :meth:`add_record`.
+        The record keeps its position in the schema, regardless of when it is loaded.
+        """
+        if id in self._record_index or id in self._record_loaders:
+            raise ValueError(f"Record '{id}' already exists in schema '{self.id}'")
+        self._record_loaders[id] = (len(self._records), loader)
+        self._records.append(None)
+        self._fingerprint = None
+
+    def _load_record(self, id: str) -> Record:
+        _, loader = self._record_loaders[id]
+        loader(self)
+        if id in self._record_loaders:
+            raise ValueError(f"Loader for record '{id}' did not add the record")
+        return self._record_index[id]
+
+    @property
+    def loaded(self) -> bool:
+        """False if there are records registered with :meth:`add_record_loader` that have not been loaded yet."""
+        return not self._record_loaders
+
+    def _index_field(self, field: Field) -> None:
+        """Called by :meth:`Record.add_field` to keep the qualified name index up to date."""
+        self._field_index.setdefault(field.qname, field)
+        self._fingerprint = None
+
     @property
     def records(self) -> Tuple[Record]:
-        return tuple(self._records)
+        if self._record_loaders:
+            for id in list(self._record_loaders):
+                if id in self._record_loaders:
+                    self._load_record(id)
+        if self._records_tuple is None:
+            self._records_tuple = tuple(self._records)
+        return self._records_tuple
 
     @property
     def datatypes(self) -> Tuple[Datatype]:
@@ -321,12 +472,17 @@ class TabularSchema(Schema):
         return tuple(t for t in self.datatypes if t in used_types)
 
     def get_record(self, id: str) -> Record:
-        for record in self.records:
-            if record.id == id:
-                return record
-        raise KeyError(f"Record '{id}' not found in schema '{self.id}'")
+        try:
+            return self._record_index[id]
+        except KeyError:
+            if id in self._record_loaders:
+                return self._load_record(id)
+            raise KeyError(f"Record '{id}' not found in schema '{self.id}'") from None
 
     def get_field(self, id: str) -> Field:
+        field = self._field_index.get(id)
+        if field is not None:
+            return field
         if id.count(".") != 1:
             raise ValueError(
                 f"Invalid field id '{id}'. Must be of format <record_id>.<field_id>"
@@ -334,10 +490,48 @@ class TabularSchema(Schema):
         record_id, field_id = id.split(".", 1)
         return self.get_record(record_id).get_field(field_id)
 
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the content of the schema, built from the fingerprints of its datatypes and records. Use
+        :func:`sfdata_schema.spec.fingerprint.diff` to find what changed between two schemas.
+        """
+        if self._fingerprint is None:
+            from .fingerprint import schema_fingerprint
+
+            self._fingerprint = schema_fingerprint(self)
+        return self._fingerprint
+
     def get_datatype(self, id: str) -> Datatype:
         if hasattr(id, "id"):
             id = id.id
-        for datatype in self.datatypes:
-            if datatype.id == id:
-                return datatype
-        raise KeyError(f"Datatype '{id}' not found in schema '{self.id}'")
+        try:
+            return self._datatype_index[id]
+        except KeyError:
+            raise KeyError(f"Datatype '{id}' not found in schema '{self.id}'") from None
+
+
+def foreign_key_scan_order(schema: TabularSchema) -> List[str]:
+    """
+    Orders records so that every record comes after the records its foreign keys refer to. Records in a cycle
+    keep their schema order.
+    """
+    parents = {r.id: set() for r in schema.records}
+    for child in schema.all_fields:
+        for parent in child.foreign_keys:
+            if child.record.id != parent.record.id:
+                parents[child.record.id].add(parent.record.id)
+
+    order = []
+    done = set()
+    pending = [r.id for r in schema.records]
+    while pending:
+        ready = [id for id in pending if parents[id] <= done]
+        if not ready:
+            # A cycle - take the first record and check the foreign keys it cannot resolve afterwards
+            ready = pending[:1]
+        for id in ready:
+            order.append(id)
+            done.add(id)
+        pending = [id for id in pending if id not in done]
+    return order
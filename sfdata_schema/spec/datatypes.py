@@ -1,5 +1,5 @@
-from dataclasses import dataclass, field
-from typing import Any, List, Literal, Mapping, Optional
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Mapping, Optional
 
 
 @dataclass(frozen=True, eq=True, repr=True)
@@ -57,6 +57,31 @@ class Datatype:
     restriction: DatatypeRestriction = field(default=None, compare=False)
     options: Optional[Mapping[str, Any]] = field(default=None, compare=False)
 
+    def __post_init__(self):
+        # The root of the 'extends' chain and the merged restriction are resolved once, from the values already
+        # resolved on the datatype this one extends
+        extends = self.extends
+        if extends is None:
+            base, effective = self, self.restriction
+        else:
+            base = extends._base_datatype
+            effective = _merge_restrictions(
+                extends._effective_restriction, self.restriction
+            )
+        object.__setattr__(self, "_base_datatype", base)
+        object.__setattr__(self, "_effective_restriction", effective)
+
+    @property
+    def fingerprint(self) -> str:
+        """A hash of the content of the datatype, including the datatypes it extends."""
+        fingerprint = self.__dict__.get("_fingerprint")
+        if fingerprint is None:
+            from .fingerprint import datatype_fingerprint
+
+            fingerprint = datatype_fingerprint(self)
+            object.__setattr__(self, "_fingerprint", fingerprint)
+        return fingerprint
+
 
 DT_STRING = Datatype("string")
 DT_INTEGER = Datatype("integer")
@@ -81,3 +106,91 @@ STANDARD_TYPES = (
     DT_YEARMONTH,
     DT_MONTHDAY,
 )
+
+
+def _merge_restrictions(
+    inherited: Optional[DatatypeRestriction], local: Optional[DatatypeRestriction]
+) -> Optional[DatatypeRestriction]:
+    if inherited is None:
+        return local
+    if local is None:
+        return inherited
+
+    facets = {}
+    for restriction in (inherited, local):
+        for f in fields(restriction):
+            value = getattr(restriction, f.name)
+            if value is not None:
+                facets[f.name] = value
+    return DatatypeRestriction(**facets)
+
+
+def base_datatype(datatype: Datatype) -> Datatype:
+    """Returns the datatype at the root of the 'extends' chain, usually one of the standard types."""
+    return datatype._base_datatype
+
+
+def effective_restriction(datatype: Datatype) -> Optional[DatatypeRestriction]:
+    """Returns the restrictions of a datatype and all the datatypes it extends merged into a single restriction.
+
+    Facets set on a datatype override the same facets inherited from the datatype it extends. The merged
+    restriction is computed once, when the datatype is created.
+    """
+    return datatype._effective_restriction
+
+
+def _restriction_key(restriction: DatatypeRestriction) -> tuple:
+    return tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (getattr(restriction, f.name) for f in fields(restriction))
+    )
+
+
+class DatatypeRegistry:
+    """
+    The datatypes of a schema, looked up by id. If several datatypes share an id, the first one added is returned.
+
+    Identical restrictions are interned, so datatypes that declare the same facets share a single restriction
+    object, and so do their effective restrictions. Restrictions are treated as immutable once added.
+    """
+
+    def __init__(self, datatypes: Iterable[Datatype] = STANDARD_TYPES):
+        self._datatypes: List[Datatype] = []
+        self._index: Dict[str, Datatype] = {}
+        self._restrictions: Dict[tuple, DatatypeRestriction] = {}
+        for datatype in datatypes:
+            self.add(datatype)
+
+    def intern_restriction(
+        self, restriction: Optional[DatatypeRestriction]
+    ) -> Optional[DatatypeRestriction]:
+        """Returns the registered restriction equal to this one, registering it if there is none."""
+        if restriction is None:
+            return None
+        return self._restrictions.setdefault(_restriction_key(restriction), restriction)
+
+    def add(self, datatype: Datatype) -> Datatype:
+        effective = self.intern_restriction(datatype._effective_restriction)
+        object.__setattr__(datatype, "_effective_restriction", effective)
+        self._datatypes.append(datatype)
+        self._index.setdefault(datatype.id, datatype)
+        return datatype
+
+    def get(self, id: str) -> Datatype:
+        try:
+            return self._index[id]
+        except KeyError:
+            raise KeyError(f"Datatype '{id}' not found") from None
+
+    @property
+    def datatypes(self) -> List[Datatype]:
+        return list(self._datatypes)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._index
+
+    def __iter__(self) -> Iterator[Datatype]:
+        return iter(self._datatypes)
+
+    def __len__(self) -> int:
+        return len(self._datatypes)
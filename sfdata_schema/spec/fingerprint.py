@@ -0,0 +1,147 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping
+
+if TYPE_CHECKING:
+    from . import Field, Record, TabularSchema
+    from .datatypes import Datatype
+
+
+# Fingerprints form a Merkle tree: a field's fingerprint includes the fingerprint of its datatype, a record's those
+# of its fields, and a schema's those of its datatypes and records. They are stable across processes, but may change
+# between versions of this library.
+def _digest(*parts: Any) -> str:
+    content = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def datatype_fingerprint(datatype: "Datatype") -> str:
+    return _digest(
+        "datatype",
+        datatype.id,
+        datatype.description,
+        datatype.extends.fingerprint if datatype.extends is not None else None,
+        asdict(datatype.restriction) if datatype.restriction is not None else None,
+        datatype.options,
+    )
+
+
+def field_fingerprint(field: "Field") -> str:
+    return _digest(
+        "field",
+        field.id,
+        field.label,
+        field.description,
+        field.options,
+        field.datatype.fingerprint,
+        field.primary_key,
+        field.foreign_key_names,
+    )
+
+
+def record_fingerprint(record: "Record") -> str:
+    return _digest(
+        "record",
+        record.id,
+        record.label,
+        record.description,
+        record.options,
+        [f.fingerprint for f in record.fields],
+    )
+
+
+def schema_fingerprint(schema: "TabularSchema") -> str:
+    return _digest(
+        "schema",
+        schema.id,
+        schema.version,
+        schema.description,
+        schema.options,
+        [dt.fingerprint for dt in schema.datatypes],
+        [r.fingerprint for r in schema.records],
+    )
+
+
+@dataclass
+class SchemaDiff:
+    """
+    The differences between two versions of a schema. Records and datatypes are identified by id, and fields by
+    qualified name. The fields of added and removed records are listed as added and removed fields.
+
+    A field is modified if anything that affects it has changed, including its datatype, so the modified fields are
+    exactly those whose validators or documentation need rebuilding. A record is modified if any of its own
+    attributes or fields have changed.
+    """
+
+    added_records: List[str] = field(default_factory=list)
+    removed_records: List[str] = field(default_factory=list)
+    modified_records: List[str] = field(default_factory=list)
+    added_fields: List[str] = field(default_factory=list)
+    removed_fields: List[str] = field(default_factory=list)
+    modified_fields: List[str] = field(default_factory=list)
+    added_datatypes: List[str] = field(default_factory=list)
+    removed_datatypes: List[str] = field(default_factory=list)
+    modified_datatypes: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f) for f in self.__dataclass_fields__)
+
+
+def _by_id(items) -> Mapping[str, Any]:
+    index: Dict[str, Any] = {}
+    for item in items:
+        index.setdefault(item.id, item)
+    return index
+
+
+def _diff_fields(old: "Record", new: "Record", result: SchemaDiff) -> None:
+    old_fields = _by_id(old.fields)
+    new_fields = _by_id(new.fields)
+    for id, f in old_fields.items():
+        other = new_fields.get(id)
+        if other is None:
+            result.removed_fields.append(f.qname)
+        elif other.fingerprint != f.fingerprint:
+            result.modified_fields.append(f.qname)
+    result.added_fields.extend(
+        f.qname for id, f in new_fields.items() if id not in old_fields
+    )
+
+
+def diff(old: "TabularSchema", new: "TabularSchema") -> SchemaDiff:
+    """
+    Compares two versions of a schema. Records and datatypes with unchanged fingerprints are skipped without
+    looking at their contents, so once fingerprints are cached the work done is proportional to the number of
+    records and datatypes plus the size of the change.
+    """
+    result = SchemaDiff()
+    if old.fingerprint == new.fingerprint:
+        return result
+
+    old_datatypes = _by_id(old.datatypes)
+    new_datatypes = _by_id(new.datatypes)
+    for id, dt in old_datatypes.items():
+        other = new_datatypes.get(id)
+        if other is None:
+            result.removed_datatypes.append(id)
+        elif other.fingerprint != dt.fingerprint:
+            result.modified_datatypes.append(id)
+    result.added_datatypes.extend(id for id in new_datatypes if id not in old_datatypes)
+
+    old_records = _by_id(old.records)
+    new_records = _by_id(new.records)
+    for id, record in old_records.items():
+        other = new_records.get(id)
+        if other is None:
+            result.removed_records.append(id)
+            result.removed_fields.extend(f.qname for f in record.fields)
+        elif other.fingerprint != record.fingerprint:
+            result.modified_records.append(id)
+            _diff_fields(record, other, result)
+    for id, record in new_records.items():
+        if id not in old_records:
+            result.added_records.append(id)
+            result.added_fields.extend(f.qname for f in record.fields)
+
+    return result
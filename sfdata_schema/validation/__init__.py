@@ -0,0 +1,272 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sfdata_schema.spec import Field, Record
+from sfdata_schema.spec.datatypes import (
+    DatatypeRestriction,
+    base_datatype,
+    effective_restriction,
+)
+
+from .coerce import get_coercer, get_python_type
+
+Check = Callable[[Any], bool]
+
+_NO_FAILURES: Tuple[str, ...] = ()
+_REQUIRED_FAILURE: Tuple[str, ...] = ("required",)
+_DATATYPE_FAILURE: Tuple[str, ...] = ("datatype",)
+
+_WHITESPACE_RE = re.compile(r"[\t\n\r]")
+_MULTIPLE_SPACES_RE = re.compile(r" {2,}")
+
+
+@dataclass(frozen=True)
+class Violation:
+    """A value that failed one of the checks of a field. The facet is the name of the restriction facet that
+    failed, or one of 'required' (a primary key value is missing) or 'datatype' (the value could not be
+    converted to the field's datatype)."""
+
+    field: str
+    facet: str
+    value: Any
+    row: Optional[int] = None
+
+
+def _replace_whitespace(value: str) -> str:
+    return _WHITESPACE_RE.sub(" ", value)
+
+
+def _collapse_whitespace(value: str) -> str:
+    return _MULTIPLE_SPACES_RE.sub(" ", _WHITESPACE_RE.sub(" ", value)).strip()
+
+
+_WHITESPACE_HANDLERS = {
+    "preserve": None,
+    "replace": _replace_whitespace,
+    "collapse": _collapse_whitespace,
+}
+
+
+def _digits(value: str) -> Optional[Tuple[int, int]]:
+    """Returns the total and fraction digits of a decimal number, or None if it is not a number."""
+    try:
+        sign, digits, exponent = Decimal(value).normalize().as_tuple()
+    except InvalidOperation:
+        return None
+    if not isinstance(exponent, int):
+        return None
+    # Normalising drops trailing zeros, so 1000000 is 1E+6 and its zeros are counted back from the exponent
+    fraction = max(-exponent, 0)
+    return max(len(digits) + max(exponent, 0), fraction), fraction
+
+
+def _coerce_bound(bound: Any, coerce: Callable[[str], Any], python_type: type) -> Any:
+    if isinstance(bound, python_type):
+        return bound
+    if python_type is float and isinstance(bound, int):
+        return bound
+    return coerce(str(bound))
+
+
+def _compile_lexical_checks(
+    restriction: DatatypeRestriction,
+) -> Tuple[Tuple[str, Check], ...]:
+    checks = []
+    if restriction.pattern is not None:
+        match = re.compile(restriction.pattern).fullmatch
+        checks.append(("pattern", lambda v: match(v) is not None))
+    if restriction.length is not None:
+        length = restriction.length
+        checks.append(("length", lambda v: len(v) == length))
+    if restriction.min_length is not None:
+        min_length = restriction.min_length
+        checks.append(("min_length", lambda v: len(v) >= min_length))
+    if restriction.max_length is not None:
+        max_length = restriction.max_length
+        checks.append(("max_length", lambda v: len(v) <= max_length))
+    if restriction.total_digits is not None:
+        total_digits = restriction.total_digits
+        checks.append(
+            ("total_digits", lambda v: (_digits(v) or (0, 0))[0] <= total_digits)
+        )
+    if restriction.fraction_digits is not None:
+        fraction_digits = restriction.fraction_digits
+        checks.append(
+            ("fraction_digits", lambda v: (_digits(v) or (0, 0))[1] <= fraction_digits)
+        )
+    return tuple(checks)
+
+
+def _compile_value_checks(
+    restriction: DatatypeRestriction,
+    coerce: Callable[[str], Any],
+    python_type: type,
+) -> Tuple[Tuple[str, Check], ...]:
+    checks = []
+    if restriction.enumeration is not None:
+        members = set()
+        for member in restriction.enumeration:
+            try:
+                members.add(_coerce_bound(member, coerce, python_type))
+            except ValueError:
+                members.add(member)
+        members = frozenset(members)
+        checks.append(("enumeration", members.__contains__))
+
+    bound = _coerce_bound
+    if restriction.min_inclusive is not None:
+        min_inclusive = bound(restriction.min_inclusive, coerce, python_type)
+        checks.append(("min_inclusive", lambda v: v >= min_inclusive))
+    if restriction.min_exclusive is not None:
+        min_exclusive = bound(restriction.min_exclusive, coerce, python_type)
+        checks.append(("min_exclusive", lambda v: v > min_exclusive))
+    if restriction.max_inclusive is not None:
+        max_inclusive = bound(restriction.max_inclusive, coerce, python_type)
+        checks.append(("max_inclusive", lambda v: v <= max_inclusive))
+    if restriction.max_exclusive is not None:
+        max_exclusive = bound(restriction.max_exclusive, coerce, python_type)
+        checks.append(("max_exclusive", lambda v: v < max_exclusive))
+    return tuple(checks)
+
+
+class FieldValidator:
+    """
+    A precompiled validator for a single field. The restriction facets of the field's datatype, including the
+    ones inherited through 'extends', are resolved once when the validator is compiled.
+
+    Calling the validator with a value returns a tuple of the coerced value and the names of the facets that
+    failed.
+    """
+
+    def __init__(self, field: Field):
+        datatype = field.datatype
+        restriction = effective_restriction(datatype) or DatatypeRestriction()
+
+        self.field = field
+        self.qname = field.qname
+        self.restriction = restriction
+        self.required = field.primary_key
+        self.python_type = get_python_type(datatype)
+        self.coerce = get_coercer(datatype)
+        # Bounds and enumeration members are in the standard form, whatever format the data is in
+        self.coerce_bound = get_coercer(datatype, cache_size=0, use_options=False)
+
+        white_space = restriction.white_space
+        if white_space is None and base_datatype(datatype).id != "string":
+            white_space = "collapse"
+        self._normalise = _WHITESPACE_HANDLERS[white_space or "preserve"]
+
+        self._lexical_checks = _compile_lexical_checks(restriction)
+        self._value_checks = _compile_value_checks(
+            restriction, self.coerce_bound, self.python_type
+        )
+
+    @property
+    def has_checks(self) -> bool:
+        return bool(self._lexical_checks or self._value_checks)
+
+    def __call__(self, value: Any) -> Tuple[Any, Tuple[str, ...]]:
+        if value is None or value == "":
+            return None, _REQUIRED_FAILURE if self.required else _NO_FAILURES
+
+        if isinstance(value, str):
+            if self._normalise is not None:
+                value = self._normalise(value)
+            lexical = value
+            try:
+                value = self.coerce(value)
+            except ValueError:
+                return value, _DATATYPE_FAILURE
+        else:
+            lexical = str(value)
+            if not isinstance(value, self.python_type):
+                try:
+                    value = self.coerce(lexical)
+                except ValueError:
+                    return value, _DATATYPE_FAILURE
+
+        failures = [f for f, check in self._lexical_checks if not check(lexical)]
+        for facet, check in self._value_checks:
+            try:
+                valid = check(value)
+            except TypeError:
+                valid = False
+            if not valid:
+                failures.append(facet)
+
+        return value, tuple(failures) if failures else _NO_FAILURES
+
+
+class RecordValidator:
+    """
+    A precompiled validator for the fields of a record. Rows are mappings of field id to value.
+
+    By default all fields are validated. Passing a subset of field ids restricts validation, and the values
+    returned, to those fields.
+    """
+
+    def __init__(self, record: Record, fields: Optional[Iterable[str]] = None):
+        self.record = record
+        if fields is None:
+            selected = record.fields
+        else:
+            selected = [record.get_field(id) for id in fields]
+        self.validators: Tuple[FieldValidator, ...] = tuple(
+            FieldValidator(f) for f in selected
+        )
+
+    def validate_row(
+        self, row: Mapping[str, Any], row_number: Optional[int] = None
+    ) -> Tuple[Mapping[str, Any], List[Violation]]:
+        """Validates a single row. Returns the row with the coerced values and a list of violations."""
+        coerced = {}
+        violations = []
+        for validator in self.validators:
+            id = validator.field.id
+            raw = row.get(id)
+            value, failures = validator(raw)
+            coerced[id] = value
+            for facet in failures:
+                violations.append(Violation(validator.qname, facet, raw, row_number))
+        return coerced, violations
+
+    def validate_values(
+        self, values: Sequence[Any], row_number: Optional[int] = None
+    ) -> Tuple[List[Any], List[Violation]]:
+        """Validates a row given as a sequence of values in the same order as the fields of the record."""
+        coerced = []
+        violations = []
+        for validator, raw in zip(self.validators, values):
+            value, failures = validator(raw)
+            coerced.append(value)
+            for facet in failures:
+                violations.append(Violation(validator.qname, facet, raw, row_number))
+        return coerced, violations
+
+    def validate_rows(self, rows: Iterable[Mapping[str, Any]]) -> Iterable[Violation]:
+        """Validates a sequence of rows and yields the violations. Rows are numbered from 1."""
+        for row_number, row in enumerate(rows, start=1):
+            yield from self.validate_row(row, row_number)[1]
+
+
+def compile_field_validator(field: Field) -> FieldValidator:
+    return FieldValidator(field)
+
+
+def compile_validator(record: Record) -> RecordValidator:
+    """
+    Compiles a validator for a record. The schema objects are only read while compiling, so the returned
+    validator can be reused for any number of rows.
+    """
+    return RecordValidator(record)
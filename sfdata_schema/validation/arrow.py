@@ -0,0 +1,240 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from sfdata_schema.spec import Field, Record
+
+from . import FieldValidator, RecordValidator, _coerce_bound, compile_validator
+from .coerce import has_lexical_form
+from .columns import ColumnResult
+
+_BOUND_FACETS = (
+    ("min_inclusive", "greater_equal"),
+    ("min_exclusive", "greater"),
+    ("max_inclusive", "less_equal"),
+    ("max_exclusive", "less"),
+)
+
+_LENGTH_FACETS = ("length", "min_length", "max_length")
+
+# Facets that have no compute kernel, so are checked once per distinct value instead
+_PER_VALUE_FACETS = ("total_digits", "fraction_digits")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError:
+        raise ImportError("Arrow validation requires the pyarrow package")
+    return pyarrow, pyarrow.compute
+
+
+class ArrowColumnResult(ColumnResult):
+    """A :class:`ColumnResult` whose mask is a pyarrow BooleanArray."""
+
+    @property
+    def invalid_count(self) -> int:
+        return len(self.mask) - self.mask.true_count
+
+
+def _native_type(pa, array_type, python_type) -> bool:
+    """True if the array already holds values of the field's python type, so they can be compared directly."""
+    types = pa.types
+    if python_type is str:
+        return types.is_string(array_type) or types.is_large_string(array_type)
+    if python_type is int:
+        return types.is_integer(array_type)
+    if python_type is float:
+        return types.is_integer(array_type) or types.is_floating(array_type)
+    if python_type is bool:
+        return types.is_boolean(array_type)
+    if python_type is date:
+        return types.is_date(array_type)
+    if python_type is datetime:
+        return types.is_timestamp(array_type)
+    return False
+
+
+def _check_kernels(pa, pc, validator: FieldValidator, array, failures) -> bool:
+    """
+    Checks the facets of a field with compute kernels. Returns False without checking anything if some facet
+    cannot be checked this way.
+    """
+    restriction = validator.restriction
+    is_string = validator.python_type is str
+    if any(getattr(restriction, f) is not None for f in _PER_VALUE_FACETS):
+        return False
+    if is_string and validator._normalise is not None:
+        return False
+    if not is_string and (
+        validator._lexical_checks or has_lexical_form(validator.field.datatype)
+    ):
+        return False
+
+    if restriction.pattern is not None:
+        try:
+            matched = pc.match_substring_regex(array, f"^(?:{restriction.pattern})$")
+        except pa.ArrowInvalid:
+            # Python regular expression syntax that RE2 does not support
+            return False
+        failures["pattern"] = pc.invert(matched)
+    if any(getattr(restriction, f) is not None for f in _LENGTH_FACETS):
+        lengths = pc.utf8_length(array)
+    if restriction.length is not None:
+        failures["length"] = pc.not_equal(lengths, restriction.length)
+    if restriction.min_length is not None:
+        failures["min_length"] = pc.less(lengths, restriction.min_length)
+    if restriction.max_length is not None:
+        failures["max_length"] = pc.greater(lengths, restriction.max_length)
+
+    coerce, python_type = validator.coerce_bound, validator.python_type
+    if restriction.enumeration is not None:
+        members = []
+        for member in restriction.enumeration:
+            try:
+                members.append(_coerce_bound(member, coerce, python_type))
+            except ValueError:
+                # As in the per-value validator, a member that is not of the datatype matches nothing
+                pass
+        if not members:
+            return False
+        value_set = pa.array(members)
+        try:
+            values = (
+                array if array.type == value_set.type else array.cast(value_set.type)
+            )
+        except pa.ArrowInvalid:
+            return False
+        failures["enumeration"] = pc.invert(pc.is_in(values, value_set=value_set))
+    for facet, kernel in _BOUND_FACETS:
+        bound = getattr(restriction, facet)
+        if bound is not None:
+            bound = _coerce_bound(bound, coerce, python_type)
+            failures[facet] = pc.invert(getattr(pc, kernel)(array, bound))
+    return True
+
+
+def _check_unique(pa, pc, validator: FieldValidator, array, failures) -> None:
+    """
+    Runs the per-value validator once for each distinct value, and maps the outcome back over the column. Values
+    are validated in their string form, as they would be read from a text file.
+    """
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        array = pc.cast(array, pa.string())
+    uniques = pc.unique(array)
+
+    unique_failures: Dict[str, list] = {}
+    for ix, value in enumerate(uniques.to_pylist()):
+        if value is None:
+            continue
+        for facet in validator(value)[1]:
+            unique_failures.setdefault(facet, [False] * len(uniques))[ix] = True
+
+    if unique_failures:
+        positions = pc.index_in(array, value_set=uniques)
+        for facet, failed in unique_failures.items():
+            failures[facet] = pc.take(pa.array(failed, pa.bool_()), positions)
+
+
+def _check_values(pa, pc, validator: FieldValidator, array) -> Dict[str, Any]:
+    """Returns a boolean array for each failing facet, True where the value fails. Null values never fail."""
+    if pa.types.is_dictionary(array.type):
+        # Check each dictionary entry once, then expand the outcome by the indices
+        failures = _check_values(pa, pc, validator, array.dictionary)
+        return {
+            facet: pc.take(failed, array.indices) for facet, failed in failures.items()
+        }
+
+    failures: Dict[str, Any] = {}
+    if validator.python_type is str and not validator.has_checks:
+        return failures
+
+    checked = False
+    if _native_type(pa, array.type, validator.python_type):
+        checked = _check_kernels(pa, pc, validator, array, failures)
+    if not checked:
+        failures.clear()
+        _check_unique(pa, pc, validator, array, failures)
+    return failures
+
+
+def _missing(pa, pc, array):
+    """Missing values are nulls, NaNs and empty strings, matching the per-value validator."""
+    missing = pc.is_null(array, nan_is_null=True)
+    value_type = array.type
+    if pa.types.is_dictionary(value_type):
+        value_type = value_type.value_type
+    if pa.types.is_string(value_type) or pa.types.is_large_string(value_type):
+        missing = pc.or_kleene(missing, pc.equal(array, ""))
+    return pc.fill_null(missing, True)
+
+
+def validate_array(
+    field: Field, array: Any, validator: Optional[FieldValidator] = None
+) -> ArrowColumnResult:
+    """
+    Validates a pyarrow Array or ChunkedArray of values for a field, without converting the values to Python
+    objects.
+
+    Facets are checked with pyarrow.compute kernels, directly on the Arrow buffers, when the array already holds
+    the field's type. Dictionary encoded arrays are checked once per dictionary entry. Facets without a kernel,
+    and arrays of another type such as strings read from a text file, are checked once per distinct value.
+    """
+    pa, pc = _import_pyarrow()
+    if validator is None:
+        validator = FieldValidator(field)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+
+    missing = _missing(pa, pc, array)
+    null_count = missing.true_count
+    present = pc.invert(missing)
+
+    error_counts = {}
+    valid = pa.repeat(True, len(array))
+    if validator.required and null_count:
+        error_counts["required"] = null_count
+        valid = present
+
+    for facet, failed in _check_values(pa, pc, validator, array).items():
+        failed = pc.and_(pc.fill_null(failed, False), present)
+        count = failed.true_count
+        if count:
+            error_counts[facet] = count
+            valid = pc.and_not(valid, failed)
+
+    return ArrowColumnResult(validator.qname, valid, error_counts, null_count)
+
+
+def validate_batch(
+    record: Record, batch: Any, validator: Optional[RecordValidator] = None
+) -> Dict[str, ArrowColumnResult]:
+    """
+    Validates the columns of a pyarrow RecordBatch or Table against a record, keyed by field qualified name.
+    Columns are matched by field label, as in :func:`sfdata_schema.export.arrow.record_to_arrow_schema`, or failing
+    that by field id. A field without a column is reported with every row failing 'missing_column'.
+
+    A validator compiled once with :func:`compile_validator` can be passed in when many batches are validated
+    against the same record.
+    """
+    pa, _ = _import_pyarrow()
+    if validator is None:
+        validator = compile_validator(record)
+    names = set(batch.schema.names)
+
+    results = {}
+    for field_validator in validator.validators:
+        field = field_validator.field
+        name = field.label if field.label in names else field.id
+        if name not in names:
+            results[field.qname] = ArrowColumnResult(
+                field.qname,
+                pa.repeat(False, batch.num_rows),
+                {"missing_column": batch.num_rows},
+                batch.num_rows,
+            )
+            continue
+        results[field.qname] = validate_array(
+            field, batch.column(name), field_validator
+        )
+    return results
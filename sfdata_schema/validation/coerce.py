@@ -0,0 +1,307 @@
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple
+
+from sfdata_schema.spec.datatypes import Datatype, base_datatype
+
+Coercer = Callable[[str], Any]
+
+_TRUE_VALUES = frozenset(("true", "1"))
+_FALSE_VALUES = frozenset(("false", "0"))
+
+_YEAR_RE = re.compile(r"-?\d{4,}")
+_YEARMONTH_RE = re.compile(r"(-?\d{4,})-(\d{2})")
+_MONTHDAY_RE = re.compile(r"(?:--)?(\d{2})-(\d{2})")
+
+# The number of distinct values whose coerced form is kept, per coercer
+CACHE_SIZE = 1024
+
+# Standard types whose values are usually drawn from a small set, so repeats are served from a cache
+_CACHED_TYPES = frozenset(("date", "time", "yearmonth", "monthday"))
+
+# Numeric standard types whose coercers also check how the number is written
+_LEXICAL_FORM_TYPES = frozenset(("year",))
+
+# strptime directives with a fixed number of digits, and the datetime argument each sets
+_FIXED_WIDTH_DIRECTIVES = {
+    "Y": ("year", 4),
+    "m": ("month", 2),
+    "d": ("day", 2),
+    "H": ("hour", 2),
+    "M": ("minute", 2),
+    "S": ("second", 2),
+}
+
+
+def _boolean(value: str) -> bool:
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean value '{value}'")
+
+
+def _year(value: str) -> int:
+    value = value.strip()
+    if not _YEAR_RE.fullmatch(value):
+        raise ValueError(f"Invalid year value '{value}'")
+    return int(value)
+
+
+def _yearmonth(value: str) -> str:
+    value = value.strip()
+    match = _YEARMONTH_RE.fullmatch(value)
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Invalid yearmonth value '{value}'")
+    return value
+
+
+def _monthday(value: str) -> str:
+    value = value.strip()
+    match = _MONTHDAY_RE.fullmatch(value)
+    if not match:
+        raise ValueError(f"Invalid monthday value '{value}'")
+    month, day = match.groups()
+    # Validate against a leap year so that --02-29 is accepted
+    date(2000, int(month), int(day))
+    return f"--{month}-{day}"
+
+
+def _string(value: str) -> str:
+    return value
+
+
+COERCERS: Mapping[str, Coercer] = {
+    "string": _string,
+    "integer": int,
+    "number": float,
+    "boolean": _boolean,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "datetime": datetime.fromisoformat,
+    "year": _year,
+    "yearmonth": _yearmonth,
+    "monthday": _monthday,
+}
+
+PYTHON_TYPES: Mapping[str, type] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "date": date,
+    "time": time,
+    "datetime": datetime,
+    "year": int,
+    "yearmonth": str,
+    "monthday": str,
+}
+
+# The arguments each type is constructed from, in order, with their defaults
+_ARGUMENTS: Mapping[type, Tuple[Tuple[str, int], ...]] = {
+    date: (("year", 1900), ("month", 1), ("day", 1)),
+    time: (("hour", 0), ("minute", 0), ("second", 0)),
+    datetime: (
+        ("year", 1900),
+        ("month", 1),
+        ("day", 1),
+        ("hour", 0),
+        ("minute", 0),
+        ("second", 0),
+    ),
+}
+
+
+def _fixed_width_fields(format: str) -> Optional[Tuple[int, tuple, tuple]]:
+    """
+    Splits a strptime format into the position of each numeric field and of each literal character. Returns None if
+    the format has a directive whose width varies, such as a month name.
+    """
+    position = 0
+    fields = []
+    literals = []
+    ix = 0
+    while ix < len(format):
+        char = format[ix]
+        if char == "%":
+            directive = format[ix + 1 : ix + 2]
+            ix += 2
+            if directive == "%":
+                literals.append((position, "%"))
+                position += 1
+                continue
+            if directive not in _FIXED_WIDTH_DIRECTIVES:
+                return None
+            name, width = _FIXED_WIDTH_DIRECTIVES[directive]
+            fields.append((name, position, position + width))
+            position += width
+        else:
+            literals.append((position, char))
+            position += 1
+            ix += 1
+    return position, tuple(fields), tuple(literals)
+
+
+def compile_format(format: str, python_type: type) -> Coercer:
+    """
+    Returns a function that parses values in a strptime format to a date, time or datetime.
+
+    Formats made only of fixed width numeric fields (%Y, %m, %d, %H, %M and %S) and literal characters, such as
+    '%d/%m/%Y', are parsed by slicing the value at fixed positions, which is several times faster than strptime. Values
+    that do not fit the fixed positions, such as '1/2/2020', are passed on to strptime, so a format accepts the same
+    values either way. Any other format is parsed with strptime.
+    """
+    convert = {date: datetime.date, time: datetime.time}.get(python_type)
+
+    def parse_strptime(value: str) -> Any:
+        parsed = datetime.strptime(value, format)
+        return parsed if convert is None else convert(parsed)
+
+    layout = _fixed_width_fields(format)
+    arguments = _ARGUMENTS[python_type]
+    names = [name for name, _ in arguments]
+    if layout is None or not all(name in names for name, _, _ in layout[1]):
+        return parse_strptime
+
+    length, fields, literals = layout
+    defaults = [default for _, default in arguments]
+    fields = tuple((names.index(name), start, end) for name, start, end in fields)
+
+    def parse_fixed(value: str) -> Any:
+        if (
+            len(value) != length
+            or not value.isascii()
+            or any(value[i] != c for i, c in literals)
+        ):
+            return parse_strptime(value)
+        args = list(defaults)
+        for ix, start, end in fields:
+            digits = value[start:end]
+            if not digits.isdigit():
+                return parse_strptime(value)
+            args[ix] = int(digits)
+        return python_type(*args)
+
+    return parse_fixed
+
+
+def _option(datatype: Datatype, name: str) -> Any:
+    """Returns an option of the datatype, or failing that of the nearest datatype it extends that sets it."""
+    while datatype is not None:
+        options = datatype.options
+        if options and name in options:
+            return options[name]
+        datatype = datatype.extends
+    return None
+
+
+def _compile_boolean(true_values: Iterable[str], false_values: Iterable[str]):
+    true_values = frozenset(str(v).lower() for v in true_values)
+    false_values = frozenset(str(v).lower() for v in false_values)
+
+    def parse_boolean(value: str) -> bool:
+        value = value.strip().lower()
+        if value in true_values:
+            return True
+        if value in false_values:
+            return False
+        raise ValueError(f"Invalid boolean value '{value}'")
+
+    return parse_boolean
+
+
+def has_lexical_options(datatype: Datatype) -> bool:
+    """True if the datatype has options that change how its values are written, see :func:`get_coercer`."""
+    base_id = base_datatype(datatype).id
+    if base_id in ("date", "time", "datetime"):
+        return _option(datatype, "format") is not None
+    if base_id == "boolean":
+        return (
+            _option(datatype, "true_values") is not None
+            or _option(datatype, "false_values") is not None
+        )
+    return False
+
+
+def has_lexical_form(datatype: Datatype) -> bool:
+    """
+    True if the datatype's values are numbers that must also be written in a particular form, such as a year of
+    at least four digits. Such values can only be checked in their string form.
+    """
+    return base_datatype(datatype).id in _LEXICAL_FORM_TYPES
+
+
+def get_coercer(
+    datatype: Datatype, cache_size: int = CACHE_SIZE, use_options: bool = True
+) -> Coercer:
+    """
+    Returns a function that converts a string to the python representation of the datatype. The coercer raises
+    ValueError if the value cannot be converted. Datatypes that do not extend one of the standard types are
+    treated as strings.
+
+    Dates, times and datetimes are read in ISO 8601 format unless the datatype, or one it extends, has a 'format'
+    option with a strptime format, see :func:`compile_format`. Booleans accept the values in the 'true_values' and
+    'false_values' options, in any case, instead of true, false, 1 and 0.
+
+    Types whose values tend to repeat, such as dates, and any type read with a custom format, keep the last
+    cache_size distinct values in an LRU cache. A cache_size of 0 turns the cache off.
+
+    Values written in the schema itself, such as bounds and enumeration members, are always in the standard form.
+    They are read with use_options set to False, which ignores the options.
+    """
+    base_id = base_datatype(datatype).id
+    coerce = COERCERS.get(base_id, _string)
+    cached = base_id in _CACHED_TYPES
+
+    if use_options and base_id in ("date", "time", "datetime"):
+        format = _option(datatype, "format")
+        if format is not None:
+            coerce = compile_format(format, PYTHON_TYPES[base_id])
+            cached = True
+    elif use_options and base_id == "boolean":
+        true_values = _option(datatype, "true_values")
+        false_values = _option(datatype, "false_values")
+        if true_values is not None or false_values is not None:
+            coerce = _compile_boolean(
+                _TRUE_VALUES if true_values is None else true_values,
+                _FALSE_VALUES if false_values is None else false_values,
+            )
+
+    if cached and cache_size:
+        coerce = lru_cache(maxsize=cache_size)(coerce)
+    return coerce
+
+
+def get_python_type(datatype: Datatype) -> type:
+    """Returns the python type values of the datatype are coerced to."""
+    return PYTHON_TYPES.get(base_datatype(datatype).id, str)
+
+
+def coerce_batch(
+    coerce: Coercer, values: Iterable[Optional[str]]
+) -> Tuple[List[Any], List[int]]:
+    """
+    Converts a batch of values with a coercer from :func:`get_coercer`, calling it once for each distinct value
+    in the batch. Missing values, None or empty strings, become None.
+
+    Returns the converted values and the positions of the values that could not be converted, which are None in
+    the converted values.
+    """
+    values = values if isinstance(values, list) else list(values)
+    converted = {None: None, "": None}
+    failed = set()
+    for value in dict.fromkeys(values):
+        if value in converted:
+            continue
+        try:
+            converted[value] = coerce(value)
+        except ValueError:
+            converted[value] = None
+            failed.add(value)
+
+    errors = (
+        [ix for ix, value in enumerate(values) if value in failed] if failed else []
+    )
+    return [converted[value] for value in values], errors
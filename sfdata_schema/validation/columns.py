@@ -0,0 +1,274 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sfdata_schema.spec import Field
+
+from . import FieldValidator, _coerce_bound
+from .coerce import has_lexical_form
+
+_BOUND_FACETS = (
+    ("min_inclusive", "__ge__"),
+    ("min_exclusive", "__gt__"),
+    ("max_inclusive", "__le__"),
+    ("max_exclusive", "__lt__"),
+)
+
+_LENGTH_FACETS = (
+    ("length", "__eq__"),
+    ("min_length", "__ge__"),
+    ("max_length", "__le__"),
+)
+
+# Facets that are only checked by the per-value validator
+_PER_VALUE_FACETS = ("total_digits", "fraction_digits")
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Column validation requires the numpy package")
+    return numpy
+
+
+@dataclass
+class ColumnResult:
+    """
+    The outcome of validating a column. The mask is True for every valid value. The error counts are keyed by the
+    name of the failing facet, as for :class:`sfdata_schema.validation.Violation`.
+    """
+
+    field: str
+    mask: Any
+    error_counts: Dict[str, int]
+    null_count: int
+
+    @property
+    def invalid_count(self) -> int:
+        return int(len(self.mask) - self.mask.sum())
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.error_counts
+
+
+def _to_numpy(np, column):
+    if hasattr(column, "to_numpy"):
+        try:
+            # pyarrow arrays only convert without copying if there are no nulls
+            return column.to_numpy(zero_copy_only=False)
+        except TypeError:
+            return column.to_numpy()
+    return np.asarray(column)
+
+
+def _null_mask(np, column, values):
+    """Missing values are nulls, NaNs and empty strings, matching the per-value validator."""
+    if hasattr(column, "isna"):
+        null = np.asarray(column.isna(), dtype=bool)
+    elif hasattr(column, "is_null"):
+        null = np.asarray(_to_numpy(np, column.is_null()), dtype=bool)
+    else:
+        null = None
+
+    kind = values.dtype.kind
+    if kind == "f":
+        empty = np.isnan(values)
+    elif kind in "mM":
+        empty = np.isnat(values)
+    elif kind in "US":
+        empty = values == values.dtype.type()
+    elif kind == "O":
+        empty = np.asarray(
+            (values == None) | (values == "") | (values != values),  # noqa: E711
+            dtype=bool,
+        )
+    else:
+        empty = np.zeros(len(values), dtype=bool)
+
+    return empty if null is None else null | empty
+
+
+def _as_numeric(np, values, python_type):
+    """
+    Converts values to a numeric array, or returns None if that is not possible without checking each value. Also
+    returns a mask of the values that are not of the datatype, for floats in an integer field that are not whole
+    numbers, or None if every value is.
+    """
+    kind = values.dtype.kind
+    if python_type is int:
+        if kind in "iu":
+            return values, None
+        if kind == "f":
+            not_integral = ~(np.isfinite(values) & (values == np.floor(values)))
+            return values, not_integral if not_integral.any() else None
+        target = np.int64
+    else:
+        if kind in "iuf":
+            return values, None
+        target = np.float64
+
+    try:
+        return values.astype(target), None
+    except (ValueError, TypeError, OverflowError):
+        return None, None
+
+
+def _check_numeric(np, validator: FieldValidator, numeric, failures):
+    restriction = validator.restriction
+    coerce, python_type = validator.coerce_bound, validator.python_type
+
+    if restriction.enumeration is not None:
+        members = []
+        for member in restriction.enumeration:
+            try:
+                members.append(_coerce_bound(member, coerce, python_type))
+            except ValueError:
+                # As in the per-value validator, a member that is not of the datatype matches nothing
+                pass
+        failures["enumeration"] = ~np.isin(numeric, members)
+
+    for facet, op in _BOUND_FACETS:
+        bound = getattr(restriction, facet)
+        if bound is not None:
+            bound = _coerce_bound(bound, coerce, python_type)
+            failures[facet] = ~getattr(numeric, op)(bound)
+
+
+def _check_strings(np, validator: FieldValidator, text, failures) -> bool:
+    """
+    Checks the facets of a string field with array operations. Only patterns are matched once per distinct value.
+    Returns False without checking anything if some facet cannot be checked this way.
+    """
+    restriction = validator.restriction
+    if validator._normalise is not None or any(
+        getattr(restriction, f) is not None for f in _PER_VALUE_FACETS
+    ):
+        return False
+
+    for facet, check in validator._lexical_checks:
+        if facet == "pattern":
+            uniques, inverse = np.unique(text, return_inverse=True)
+            matched = np.array([check(v) for v in uniques.tolist()], dtype=bool)
+            failures["pattern"] = ~matched[inverse.reshape(-1)]
+
+    if any(getattr(restriction, f) is not None for f, _ in _LENGTH_FACETS):
+        lengths = np.char.str_len(text)
+        for facet, op in _LENGTH_FACETS:
+            length = getattr(restriction, facet)
+            if length is not None:
+                failures[facet] = ~getattr(lengths, op)(length)
+
+    if restriction.enumeration is not None:
+        failures["enumeration"] = ~np.isin(
+            text, [str(m) for m in restriction.enumeration]
+        )
+    for facet, op in _BOUND_FACETS:
+        bound = getattr(restriction, facet)
+        if bound is not None:
+            failures[facet] = ~getattr(text, op)(str(bound))
+    return True
+
+
+def _as_text(np, values, python_type):
+    """
+    Returns the values as strings, as they would be read from a text file. Whole floats in an integer field lose
+    their fraction, and datetime64 values are written to the precision the datatype parses.
+    """
+    kind = values.dtype.kind
+    if kind == "f" and python_type is int:
+        text = values.astype(str)
+        integral = (
+            np.isfinite(values)
+            & (values == np.floor(values))
+            & (np.abs(values) < 2**63)
+        )
+        text[integral] = values[integral].astype(np.int64).astype(str)
+        return text
+    if kind == "M" and python_type is date:
+        days = values.astype("datetime64[D]")
+        # Values with a time of day are not dates, so they keep it and fail
+        return np.where(days == values, days.astype(str), values.astype(str))
+    if kind == "M":
+        return values.astype("datetime64[us]").astype(str)
+    return values.astype(str)
+
+
+def _check_unique(np, validator: FieldValidator, values, failures):
+    """
+    Runs the per-value validator once for each distinct value and broadcasts the outcome back over the column.
+    Columns with repeated values, such as codes and dates, only pay for the values that are distinct.
+    """
+    text = _as_text(np, values, validator.python_type)
+    uniques, inverse = np.unique(text, return_inverse=True)
+
+    unique_failures: Dict[str, Any] = {}
+    for ix, value in enumerate(uniques.tolist()):
+        for facet in validator(value)[1]:
+            if facet not in unique_failures:
+                unique_failures[facet] = np.zeros(len(uniques), dtype=bool)
+            unique_failures[facet][ix] = True
+
+    for facet, failed in unique_failures.items():
+        failures[facet] = failed[inverse.reshape(-1)]
+
+
+def validate_column(
+    field: Field, column: Any, validator: Optional[FieldValidator] = None
+) -> ColumnResult:
+    """
+    Validates a whole column of values for a field. The column can be a numpy array, a pandas Series, a pyarrow
+    Array or ChunkedArray, or any sequence numpy can convert.
+
+    Numeric columns, and the lengths, enumerations and bounds of string columns, are checked with array operations.
+    String patterns, and other columns such as dates and years, are checked once per distinct value.
+    """
+    np = _import_numpy()
+    if validator is None:
+        validator = FieldValidator(field)
+
+    values = _to_numpy(np, column)
+    null = _null_mask(np, column, values)
+    null_count = int(null.sum())
+
+    mask = np.ones(len(values), dtype=bool)
+    error_counts = {}
+    if validator.required and null_count:
+        mask[null] = False
+        error_counts["required"] = null_count
+
+    present_ix = np.flatnonzero(~null)
+    present = values[present_ix]
+
+    numeric = not_datatype = None
+    if (
+        validator.python_type in (int, float)
+        and not validator._lexical_checks
+        and not has_lexical_form(field.datatype)
+    ):
+        numeric, not_datatype = _as_numeric(np, present, validator.python_type)
+
+    failures: Dict[str, Any] = {}
+    if numeric is not None:
+        _check_numeric(np, validator, numeric, failures)
+        if not_datatype is not None:
+            # As in the per-value validator, a value that is not of the datatype fails no other facet
+            failures = {f: failed & ~not_datatype for f, failed in failures.items()}
+            failures["datatype"] = not_datatype
+    elif validator.python_type is str and not validator.has_checks:
+        pass
+    elif validator.python_type is str and _check_strings(
+        np, validator, present.astype(str), failures
+    ):
+        pass
+    elif len(present):
+        _check_unique(np, validator, present, failures)
+
+    for facet, failed in failures.items():
+        count = int(failed.sum())
+        if count:
+            error_counts[facet] = count
+            mask[present_ix[failed]] = False
+
+    return ColumnResult(validator.qname, mask, error_counts, null_count)
@@ -0,0 +1,136 @@
+import csv
+import io
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+from sfdata_schema.spec import Record
+
+from . import FieldValidator, RecordValidator, Violation, compile_validator
+
+CsvSource = Union[str, Path, IO[bytes]]
+
+
+@dataclass(frozen=True)
+class ValidatedRow:
+    """A row read from a CSV file. The values are keyed by field id and coerced to the field's datatype."""
+
+    row: int
+    values: Dict[str, Any]
+    violations: List[Violation]
+
+
+@contextmanager
+def open_csv_source(
+    source: CsvSource, encoding: str = "utf-8-sig"
+) -> Iterator[IO[str]]:
+    """Opens a path or a binary stream as a text stream suitable for the csv module. Streams are not closed."""
+    if isinstance(source, (str, Path)):
+        with open(source, "rt", encoding=encoding, newline="") as file:
+            yield file
+    else:
+        wrapper = io.TextIOWrapper(source, encoding=encoding, newline="")
+        try:
+            yield wrapper
+        finally:
+            wrapper.detach()
+
+
+def map_header(
+    validator: RecordValidator, header: Sequence[str]
+) -> Tuple[Tuple[Tuple[int, FieldValidator], ...], List[Violation]]:
+    """
+    Matches the column headers of a file against the labels of the record's fields. Returns the column index of
+    each field that is present and a 'missing_column' violation for each field that is not. Columns that do not
+    match a field are ignored.
+    """
+    columns = {}
+    for ix, label in enumerate(header):
+        columns.setdefault(label.strip(), ix)
+
+    positions = []
+    violations = []
+    for field_validator in validator.validators:
+        ix = columns.get(field_validator.field.label)
+        if ix is None:
+            violations.append(
+                Violation(field_validator.qname, "missing_column", None, None)
+            )
+        else:
+            positions.append((ix, field_validator))
+    return tuple(positions), violations
+
+
+def iter_validated_rows(
+    validator: RecordValidator,
+    rows: Iterator[Sequence[str]],
+    header: Sequence[str],
+    first_row: int = 1,
+) -> Iterator[ValidatedRow]:
+    """Validates rows of raw cell values that are laid out according to the header."""
+    positions, _ = map_header(validator, header)
+    present = {v.field.id for _, v in positions}
+    missing = tuple(
+        v.field.id for v in validator.validators if v.field.id not in present
+    )
+
+    for row_number, cells in enumerate(rows, start=first_row):
+        values = dict.fromkeys(missing)
+        violations = []
+        n_cells = len(cells)
+        for ix, field_validator in positions:
+            raw = cells[ix] if ix < n_cells else None
+            value, failures = field_validator(raw)
+            values[field_validator.field.id] = value
+            for facet in failures:
+                violations.append(
+                    Violation(field_validator.qname, facet, raw, row_number)
+                )
+        yield ValidatedRow(row_number, values, violations)
+
+
+def read_csv(
+    record: Record,
+    source: CsvSource,
+    encoding: str = "utf-8-sig",
+    validator: RecordValidator = None,
+    **csv_options,
+) -> Iterator[ValidatedRow]:
+    """
+    Streams the rows of a CSV file for a record. The first line of the file is the header, which is matched against
+    the field labels once. Rows are read one at a time so the whole file is never held in memory.
+
+    Rows are numbered from 1, excluding the header.
+    """
+    if validator is None:
+        validator = compile_validator(record)
+
+    with open_csv_source(source, encoding) as file:
+        reader = csv.reader(file, **csv_options)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from iter_validated_rows(validator, reader, header)
+
+
+def validate_csv(
+    record: Record,
+    source: CsvSource,
+    encoding: str = "utf-8-sig",
+    **csv_options,
+) -> Iterator[Violation]:
+    """
+    Validates a CSV file against a record and yields every violation found, starting with any columns that are
+    missing from the header.
+    """
+    validator = compile_validator(record)
+
+    with open_csv_source(source, encoding) as file:
+        reader = csv.reader(file, **csv_options)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from map_header(validator, header)[1]
+        for row in iter_validated_rows(validator, reader, header):
+            yield from row.violations
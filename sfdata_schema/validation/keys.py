@@ -0,0 +1,410 @@
+import csv
+import heapq
+import math
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Set,
+    Tuple,
+    Union,
+)
+
+from sfdata_schema.spec import (
+    Field,
+    Record,
+    TabularSchema,
+    foreign_key_scan_order,
+)
+
+from . import RecordValidator
+from .csvfile import iter_validated_rows, map_header, open_csv_source
+
+PathLike = Union[str, Path]
+IndexType = Literal["hash", "bloom"]
+
+# Primary key entries are a 16 byte key digest followed by the big endian row number, so sorting the raw bytes
+# groups equal keys together in row order
+_DIGEST_SIZE = 16
+_ENTRY = struct.Struct(f">{_DIGEST_SIZE}sQ")
+# Approximate memory held per buffered entry, including the bytes object and its list slot
+_ENTRY_MEMORY = 64
+
+
+def key_digest(value: Any, digest_size: int = 8) -> bytes:
+    """
+    A fixed width digest of a key value. Values are hashed by their string form, so a key that is an integer in
+    one record and a string in another still matches.
+    """
+    if isinstance(value, tuple):
+        value = "\x1f".join(str(v) for v in value)
+    return blake2b(str(value).encode("utf-8"), digest_size=digest_size).digest()
+
+
+class HashKeyIndex:
+    """An exact set of key values, stored as 64 bit digests rather than the values themselves."""
+
+    def __init__(self):
+        self._digests: Set[int] = set()
+
+    def add(self, value: Any) -> None:
+        self._digests.add(int.from_bytes(key_digest(value), "little"))
+
+    def __contains__(self, value: Any) -> bool:
+        return int.from_bytes(key_digest(value), "little") in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class BloomKeyIndex:
+    """
+    A Bloom filter over key values, using a fixed amount of memory for the expected number of keys. Lookups never
+    miss a key that was added, but may report a key that was not added as present with the given error rate, so
+    a small fraction of orphans can go undetected.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: Any) -> Iterable[int]:
+        digest = key_digest(value, 16)
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value: Any) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: Any) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+@dataclass
+class ForeignKeyReport:
+    """
+    The outcome of checking one foreign key. Samples are (row number, value) pairs of orphaned values. Missing
+    columns are the key columns absent from their files, in which case the foreign key is not checked.
+    """
+
+    field: str
+    references: str
+    checked: int = 0
+    orphans: int = 0
+    samples: List[Tuple[int, Any]] = field(default_factory=list)
+    missing_columns: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.orphans == 0 and not self.missing_columns
+
+
+def _foreign_keys(schema: TabularSchema) -> List[Tuple[Field, Field]]:
+    return [(f, fk) for f in schema.all_fields for fk in f.foreign_keys]
+
+
+def _missing_columns(record: Record, path: Path, field_ids: Iterable[str]) -> List[str]:
+    """Returns the qualified names of the fields whose columns are not in the header of a CSV file."""
+    validator = RecordValidator(record, sorted(field_ids))
+    with open_csv_source(path) as file:
+        header = next(csv.reader(file), None)
+    if header is None:
+        return []
+    return [v.field for v in map_header(validator, header)[1]]
+
+
+def _read_columns(record: Record, path: Path, field_ids: Iterable[str]):
+    validator = RecordValidator(record, sorted(field_ids))
+    with open_csv_source(path) as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from iter_validated_rows(validator, reader, header)
+
+
+def check_foreign_keys(
+    schema: TabularSchema,
+    sources: Union[PathLike, Mapping[str, PathLike]],
+    index: IndexType = "hash",
+    expected_keys: int = 10_000_000,
+    error_rate: float = 0.001,
+    max_samples: int = 20,
+) -> List[ForeignKeyReport]:
+    """
+    Checks that every foreign key value in a dataset of CSV files exists in the record it refers to.
+
+    Records are read in :func:`sfdata_schema.spec.foreign_key_scan_order`, one row at a time. While a record is
+    read, the values of its columns that other records refer to are added to a key index, and its foreign key
+    columns are looked up in the indexes of the records already read. Each file is therefore read once, however many
+    records refer to it. Only foreign keys that are part of a cycle need a second read of the referring file. An
+    index is dropped as soon as every record that refers to it has been checked.
+
+    The 'hash' index holds a 64 bit digest per distinct key. The 'bloom' index uses a fixed amount of memory
+    sized for expected_keys at the given error rate, at the cost of occasionally missing an orphan.
+
+    Missing values are not checked. Foreign keys whose files are not in the sources are skipped, and foreign keys
+    whose key columns are not in their files are reported in missing_columns rather than checked.
+    """
+    if not isinstance(sources, Mapping):
+        from .parallel import find_record_files
+
+        sources = find_record_files(schema, sources)
+    sources = {id: Path(path) for id, path in sources.items()}
+
+    def new_index():
+        if index == "bloom":
+            return BloomKeyIndex(expected_keys, error_rate)
+        return HashKeyIndex()
+
+    foreign_keys = [
+        (child, parent)
+        for child, parent in _foreign_keys(schema)
+        if child.record.id in sources and parent.record.id in sources
+    ]
+    reports = {
+        (child.qname, parent.qname): ForeignKeyReport(child.qname, parent.qname)
+        for child, parent in foreign_keys
+    }
+
+    # Columns to index per record, and how many foreign keys still need each index
+    indexed: Dict[str, Set[str]] = {}
+    remaining: Dict[str, int] = {}
+    for _, parent in foreign_keys:
+        indexed.setdefault(parent.record.id, set()).add(parent.id)
+        remaining[parent.qname] = remaining.get(parent.qname, 0) + 1
+
+    indexes: Dict[str, Any] = {}
+    # Indexed columns that are not in their files, so have empty indexes
+    unindexed: Set[str] = set()
+    deferred: Dict[str, List[Tuple[Field, Field]]] = {}
+
+    def release(parent: Field) -> None:
+        remaining[parent.qname] -= 1
+        if remaining[parent.qname] == 0:
+            indexes.pop(parent.qname, None)
+
+    def scan(record_id: str, checks: List[Tuple[Field, Field]], build: Set[str]):
+        building = {id: new_index() for id in build}
+        record = schema.get_record(record_id)
+        for id, key_index in building.items():
+            indexes[record.get_field(id).qname] = key_index
+
+        columns = set(build) | {child.id for child, _ in checks}
+        missing = set(_missing_columns(record, sources[record_id], columns))
+        unindexed.update(qname for qname in indexes if qname in missing)
+
+        lookups = []
+        for child, parent in checks:
+            report = reports[(child.qname, parent.qname)]
+            absent = [
+                f.qname for f in (child, parent) if f.qname in missing | unindexed
+            ]
+            if absent:
+                report.missing_columns.extend(absent)
+            else:
+                lookups.append((child.id, indexes[parent.qname], report))
+        for row in _read_columns(record, sources[record_id], columns):
+            values = row.values
+            for id, key_index in building.items():
+                value = values[id]
+                if value is not None:
+                    key_index.add(value)
+            for id, key_index, report in lookups:
+                value = values[id]
+                if value is None:
+                    continue
+                report.checked += 1
+                if value not in key_index:
+                    report.orphans += 1
+                    if len(report.samples) < max_samples:
+                        report.samples.append((row.row, value))
+
+        for child, parent in checks:
+            release(parent)
+
+    for record_id in foreign_key_scan_order(schema):
+        if record_id not in sources:
+            continue
+        checks = []
+        for child, parent in foreign_keys:
+            if child.record.id != record_id:
+                continue
+            if parent.qname in indexes:
+                checks.append((child, parent))
+            else:
+                deferred.setdefault(record_id, []).append((child, parent))
+        scan(record_id, checks, indexed.get(record_id, set()))
+
+    for record_id, checks in deferred.items():
+        scan(record_id, checks, set())
+
+    return list(reports.values())
+
+
+@dataclass
+class DuplicateKey:
+    """A primary key value that appears on more than one row."""
+
+    key: Tuple[Any, ...]
+    rows: Tuple[int, ...]
+
+
+@dataclass
+class PrimaryKeyReport:
+    """
+    The outcome of checking the primary key of one record. Duplicates counts the rows that repeat a key seen on an
+    earlier row, and incomplete counts the rows with a missing key value, which are not checked. Missing columns
+    are the key columns absent from the file, in which case the key is not checked.
+    """
+
+    record: str
+    fields: Tuple[str, ...]
+    rows: int = 0
+    incomplete: int = 0
+    duplicate_keys: int = 0
+    duplicates: int = 0
+    samples: List[DuplicateKey] = field(default_factory=list)
+    missing_columns: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.duplicates == 0 and not self.missing_columns
+
+
+def _write_run(directory: str, entries: List[bytes]) -> str:
+    entries.sort()
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as file:
+        file.write(b"".join(entries))
+        return file.name
+
+
+def _read_run(file: IO[bytes], buffer_entries: int = 4096) -> Iterator[bytes]:
+    size = _ENTRY.size
+    while True:
+        block = file.read(size * buffer_entries)
+        if not block:
+            return
+        for offset in range(0, len(block), size):
+            yield block[offset : offset + size]
+
+
+def _duplicate_groups(entries: Iterable[bytes]) -> Iterator[List[int]]:
+    """Yields the row numbers of each run of entries with the same key digest, for runs of two or more."""
+    current = None
+    rows = []
+    for entry in entries:
+        digest, row = _ENTRY.unpack(entry)
+        if digest != current:
+            if len(rows) > 1:
+                yield rows
+            current = digest
+            rows = []
+        rows.append(row)
+    if len(rows) > 1:
+        yield rows
+
+
+def check_primary_key(
+    record: Record,
+    source: PathLike,
+    memory_budget: int = 256 * 1024 * 1024,
+    tmp_dir: PathLike = None,
+    max_samples: int = 20,
+) -> PrimaryKeyReport:
+    """
+    Checks that the primary key of a record, which may span several fields, is unique in a CSV file.
+
+    Each key is reduced to a 16 byte digest and stored with its row number, so memory use does not depend on the
+    size of the key values. Once the buffered entries exceed memory_budget they are sorted and written to a run file
+    in tmp_dir, and the runs are merged from disk at the end. Memory use is therefore bounded however many rows the
+    file has. Duplicates are found as runs of equal digests in the sorted entries. The file is read a second time
+    only if there are duplicates, to fetch the key values of the sampled duplicates.
+    """
+    source = Path(source)
+    key_fields = tuple(f.id for f in record.primary_keys)
+    report = PrimaryKeyReport(record.id, key_fields)
+    if not key_fields:
+        return report
+    report.missing_columns = _missing_columns(record, source, key_fields)
+    if report.missing_columns:
+        return report
+
+    max_entries = max(memory_budget // _ENTRY_MEMORY, 1)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        entries: List[bytes] = []
+        runs: List[str] = []
+        for row in _read_columns(record, source, key_fields):
+            report.rows += 1
+            key = tuple(row.values[id] for id in key_fields)
+            if None in key:
+                report.incomplete += 1
+                continue
+            entries.append(_ENTRY.pack(key_digest(key, _DIGEST_SIZE), row.row))
+            if len(entries) >= max_entries:
+                runs.append(_write_run(run_dir, entries))
+                entries = []
+
+        entries.sort()
+        sample_rows = []
+        files = [open(run, "rb") for run in runs]
+        try:
+            merged = heapq.merge(entries, *(_read_run(f) for f in files))
+            for rows in _duplicate_groups(merged):
+                report.duplicate_keys += 1
+                report.duplicates += len(rows) - 1
+                if len(sample_rows) < max_samples:
+                    sample_rows.append(tuple(rows))
+        finally:
+            for f in files:
+                f.close()
+
+    if sample_rows:
+        wanted = {rows[0]: rows for rows in sample_rows}
+        keys = {}
+        for row in _read_columns(record, source, key_fields):
+            if row.row in wanted:
+                keys[row.row] = tuple(row.values[id] for id in key_fields)
+                if len(keys) == len(wanted):
+                    break
+        report.samples = [DuplicateKey(keys[rows[0]], rows) for rows in sample_rows]
+    return report
+
+
+def check_primary_keys(
+    schema: TabularSchema,
+    sources: Union[PathLike, Mapping[str, PathLike]],
+    memory_budget: int = 256 * 1024 * 1024,
+    tmp_dir: PathLike = None,
+    max_samples: int = 20,
+) -> Dict[str, PrimaryKeyReport]:
+    """Checks the primary key of each record that has one and a file in the sources, keyed by record id."""
+    if not isinstance(sources, Mapping):
+        from .parallel import find_record_files
+
+        sources = find_record_files(schema, sources)
+
+    return {
+        record.id: check_primary_key(
+            record, sources[record.id], memory_budget, tmp_dir, max_samples
+        )
+        for record in schema.records
+        if record.primary_keys and record.id in sources
+    }
@@ -0,0 +1,238 @@
+import csv
+import io
+import os
+import pickle
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from sfdata_schema.spec import TabularSchema
+
+from . import RecordValidator, Violation, compile_validator
+from .csvfile import iter_validated_rows, map_header, open_csv_source
+
+PathLike = Union[str, Path]
+
+# Set in each worker process by _init_worker
+_worker_schema: Optional[TabularSchema] = None
+_worker_validators: Dict[str, RecordValidator] = {}
+
+
+@dataclass
+class RecordReport:
+    """The merged outcome of validating the file for one record."""
+
+    record: str
+    source: str
+    rows: int = 0
+    violation_counts: Counter = field(default_factory=Counter)
+    samples: List[Violation] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.violation_counts
+
+
+@dataclass
+class _ChunkResult:
+    record: str
+    chunk: int
+    rows: int
+    violation_counts: Counter
+    samples: List[Violation]
+
+
+def find_record_files(
+    schema: TabularSchema, directory: PathLike, suffix: str = ".csv"
+) -> Dict[str, Path]:
+    """Finds the file for each record in a directory. Files are named after the record label, or failing that its id."""
+    directory = Path(directory)
+    files = {}
+    for record in schema.records:
+        for name in (record.label, record.id):
+            path = directory / f"{name}{suffix}"
+            if path.is_file():
+                files[record.id] = path
+                break
+    return files
+
+
+def _chunk_ranges(path: Path, chunk_size: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Splits a file into byte ranges that end on a line break, after the header line. Returns the header line and the
+    ranges. Assumes values do not contain quoted line breaks.
+    """
+    size = path.stat().st_size
+    with path.open("rb") as file:
+        header = file.readline()
+        ranges = []
+        start = file.tell()
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _init_worker(schema_data: bytes) -> None:
+    global _worker_schema, _worker_validators
+    _worker_schema = pickle.loads(schema_data)
+    _worker_validators = {}
+
+
+def _get_validator(record_id: str) -> RecordValidator:
+    validator = _worker_validators.get(record_id)
+    if validator is None:
+        validator = compile_validator(_worker_schema.get_record(record_id))
+        _worker_validators[record_id] = validator
+    return validator
+
+
+def _summarise(
+    record_id: str,
+    chunk: int,
+    header_violations: List[Violation],
+    rows,
+    max_samples: int,
+) -> _ChunkResult:
+    counts = Counter()
+    samples = []
+    n_rows = 0
+    for violation in header_violations:
+        counts[(violation.field, violation.facet)] += 1
+        samples.append(violation)
+    for row in rows:
+        n_rows += 1
+        for violation in row.violations:
+            counts[(violation.field, violation.facet)] += 1
+            if len(samples) < max_samples:
+                samples.append(violation)
+    return _ChunkResult(record_id, chunk, n_rows, counts, samples)
+
+
+def _validate_file(
+    record_id: str, path: str, encoding: str, max_samples: int
+) -> _ChunkResult:
+    validator = _get_validator(record_id)
+    with open_csv_source(path, encoding) as file:
+        reader = csv.reader(file)
+        header = next(reader, None) or []
+        header_violations = map_header(validator, header)[1]
+        rows = iter_validated_rows(validator, reader, header)
+        return _summarise(record_id, 0, header_violations, rows, max_samples)
+
+
+def _validate_chunk(
+    record_id: str,
+    path: str,
+    chunk: int,
+    start: int,
+    end: int,
+    header: List[str],
+    encoding: str,
+    max_samples: int,
+) -> _ChunkResult:
+    validator = _get_validator(record_id)
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    reader = csv.reader(io.StringIO(data.decode(encoding), newline=""))
+    header_violations = map_header(validator, header)[1] if chunk == 0 else []
+    rows = iter_validated_rows(validator, reader, header)
+    return _summarise(record_id, chunk, header_violations, rows, max_samples)
+
+
+def _merge(
+    reports: Mapping[str, RecordReport],
+    results: Iterator[_ChunkResult],
+    max_samples: int,
+) -> None:
+    by_record: Dict[str, List[_ChunkResult]] = {}
+    for result in results:
+        by_record.setdefault(result.record, []).append(result)
+
+    for record_id, chunks in by_record.items():
+        report = reports[record_id]
+        offset = 0
+        for result in sorted(chunks, key=lambda c: c.chunk):
+            report.rows += result.rows
+            report.violation_counts.update(result.violation_counts)
+            for sample in result.samples:
+                if len(report.samples) >= max_samples:
+                    break
+                if sample.row is not None and offset:
+                    sample = Violation(
+                        sample.field, sample.facet, sample.value, sample.row + offset
+                    )
+                report.samples.append(sample)
+            offset += result.rows
+
+
+def validate_dataset(
+    schema: TabularSchema,
+    sources: Union[PathLike, Mapping[str, PathLike]],
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    encoding: str = "utf-8-sig",
+    max_samples: int = 100,
+) -> Dict[str, RecordReport]:
+    """
+    Validates a dataset of CSV files, one per record, in a pool of worker processes. The sources are either a
+    mapping of record id to file, or a directory in which files are found with :func:`find_record_files`.
+
+    The schema is pickled once and sent to each worker when it starts, so tasks only carry file names and
+    offsets. If a chunk size in bytes is given, files larger than that are split into chunks that are validated
+    in parallel. Chunking assumes values do not contain quoted line breaks.
+
+    Returns a report per record, with violation counts keyed by (field qname, facet) and a sample of violations.
+    """
+    if not isinstance(sources, Mapping):
+        sources = find_record_files(schema, sources)
+    sources = {record_id: Path(path) for record_id, path in sources.items()}
+    for record_id in sources:
+        schema.get_record(record_id)
+
+    reports = {
+        record_id: RecordReport(record_id, str(path))
+        for record_id, path in sources.items()
+    }
+    schema_data = pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(schema_data,),
+    ) as executor:
+        futures = []
+        for record_id, path in sources.items():
+            if chunk_size and path.stat().st_size > chunk_size:
+                header, ranges = _chunk_ranges(path, chunk_size)
+                header = next(csv.reader([header.decode(encoding)]), [])
+                for chunk, (start, end) in enumerate(ranges):
+                    futures.append(
+                        executor.submit(
+                            _validate_chunk,
+                            record_id,
+                            str(path),
+                            chunk,
+                            start,
+                            end,
+                            header,
+                            encoding,
+                            max_samples,
+                        )
+                    )
+            else:
+                futures.append(
+                    executor.submit(
+                        _validate_file, record_id, str(path), encoding, max_samples
+                    )
+                )
+
+        _merge(reports, (f.result() for f in futures), max_samples)
+
+    return reports
@@ -0,0 +1,187 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Union
+
+from sfdata_schema.spec import Record
+
+from . import FieldValidator, RecordValidator, _coerce_bound, compile_validator
+from .arrow import _native_type, validate_array
+from .coerce import has_lexical_form
+
+ParquetSource = Union[str, Path, IO[bytes]]
+
+_LOWER_BOUNDS = (("min_inclusive", "__ge__"), ("min_exclusive", "__gt__"))
+_UPPER_BOUNDS = (("max_inclusive", "__le__"), ("max_exclusive", "__lt__"))
+
+
+def _import_parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet validation requires the pyarrow package")
+    return pyarrow, pyarrow.parquet
+
+
+@dataclass
+class ParquetReport:
+    """
+    The outcome of validating a Parquet file against a record. Error counts are keyed by field qualified name and
+    then by facet, as in :class:`sfdata_schema.validation.columns.ColumnResult`.
+
+    Column chunks are the values of one column in one row group. Pruned chunks were answered from the row group
+    statistics, and decoded chunks had to be read.
+    """
+
+    record: str
+    source: str
+    rows: int = 0
+    row_groups: int = 0
+    decoded_chunks: int = 0
+    pruned_chunks: int = 0
+    error_counts: Dict[str, Counter] = field(default_factory=dict)
+    missing_columns: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.missing_columns and not any(self.error_counts.values())
+
+
+def _bounds_hold(validator: FieldValidator, minimum: Any, maximum: Any) -> bool:
+    """True if every value between the minimum and maximum statistics passes the bound facets."""
+    restriction = validator.restriction
+    coerce, python_type = validator.coerce_bound, validator.python_type
+    for facets, value in ((_LOWER_BOUNDS, minimum), (_UPPER_BOUNDS, maximum)):
+        for facet, op in facets:
+            bound = getattr(restriction, facet)
+            if bound is None:
+                continue
+            try:
+                if not getattr(value, op)(_coerce_bound(bound, coerce, python_type)):
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+def _needs_decode(pa, validator: FieldValidator, column_type, statistics, rows) -> bool:
+    """
+    Decides whether a column chunk has to be read, or whether its statistics show that no value can fail. Only
+    the required check and the bound facets can be answered from statistics. Any other check that applies
+    means the chunk is read.
+    """
+    if has_lexical_form(validator.field.datatype):
+        # The values must be written out to check their form, as for a four digit year
+        return True
+    if not validator.required and not validator.has_checks:
+        return False
+    if statistics is None or not statistics.has_null_count:
+        return True
+
+    null_count = statistics.null_count
+    if null_count == rows:
+        # Nothing but nulls, so only the required check applies, and the null count answers it
+        return False
+    if not statistics.has_min_max:
+        return True
+    minimum, maximum = statistics.min, statistics.max
+    if pa.types.is_dictionary(column_type):
+        column_type = column_type.value_type
+
+    if validator.required and (minimum == "" or pa.types.is_floating(column_type)):
+        # Empty strings and NaNs count as missing, but are not in the null count
+        return True
+    if not validator.has_checks:
+        return False
+    if not _native_type(pa, column_type, validator.python_type):
+        return True
+    if validator._lexical_checks:
+        return True
+    if validator.python_type is str and validator._normalise is not None:
+        return True
+
+    restriction = validator.restriction
+    if restriction.enumeration is not None:
+        members = set()
+        for member in restriction.enumeration:
+            try:
+                members.add(
+                    _coerce_bound(member, validator.coerce_bound, validator.python_type)
+                )
+            except ValueError:
+                pass
+        if minimum != maximum or minimum not in members:
+            return True
+    return not _bounds_hold(validator, minimum, maximum)
+
+
+def validate_parquet(
+    record: Record,
+    source: ParquetSource,
+    validator: Optional[RecordValidator] = None,
+) -> ParquetReport:
+    """
+    Validates a Parquet file against a record, reading as little of it as possible.
+
+    Columns are matched by field label, or failing that by field id, and columns the record does not declare are
+    never read. For each row group, the footer statistics of each column are checked first. Missing primary key
+    values are counted from the null counts. Where the minimum and maximum show that every value passes the
+    bound facets, the column chunk is not decoded. Only the chunks that could hold a failing value are read, and
+    they are checked with the Arrow validator.
+    """
+    pa, pq = _import_parquet()
+    if validator is None:
+        validator = compile_validator(record)
+
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    arrow_schema = parquet_file.schema_arrow
+    names = set(arrow_schema.names)
+
+    report = ParquetReport(
+        record.id, str(source), metadata.num_rows, metadata.num_row_groups
+    )
+
+    columns = []
+    for field_validator in validator.validators:
+        f = field_validator.field
+        report.error_counts[f.qname] = Counter()
+        name = f.label if f.label in names else f.id
+        if name in names:
+            columns.append((name, field_validator))
+        else:
+            report.missing_columns.append(f.qname)
+
+    if metadata.num_row_groups:
+        first = metadata.row_group(0)
+        positions = {
+            first.column(ix).path_in_schema: ix for ix in range(first.num_columns)
+        }
+
+    for group in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group)
+        rows = row_group.num_rows
+        decode = []
+        for name, field_validator in columns:
+            statistics = row_group.column(positions[name]).statistics
+            column_type = arrow_schema.field(name).type
+            if _needs_decode(pa, field_validator, column_type, statistics, rows):
+                decode.append((name, field_validator))
+                continue
+            report.pruned_chunks += 1
+            if field_validator.required and statistics.null_count:
+                counts = report.error_counts[field_validator.qname]
+                counts["required"] += statistics.null_count
+
+        if not decode:
+            continue
+        table = parquet_file.read_row_group(group, columns=[name for name, _ in decode])
+        for name, field_validator in decode:
+            report.decoded_chunks += 1
+            result = validate_array(
+                field_validator.field, table.column(name), field_validator
+            )
+            report.error_counts[field_validator.qname].update(result.error_counts)
+
+    return report
@@ -0,0 +1,445 @@
+import csv
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from sfdata_schema.export.sql import field_checks, quote_identifier, record_to_sql
+from sfdata_schema.spec import Field, Record, TabularSchema, foreign_key_scan_order
+from sfdata_schema.spec.datatypes import base_datatype
+
+from . import FieldValidator, RecordValidator
+from .coerce import has_lexical_options
+from .csvfile import CsvSource, map_header, open_csv_source
+from .keys import (
+    DuplicateKey,
+    ForeignKeyReport,
+    PathLike,
+    PrimaryKeyReport,
+)
+
+# Settings for a scratch database that is loaded once and then queried. The rollback journal and fsyncs are
+# turned off, so a database file is left corrupt if the process dies while loading.
+BULK_LOAD_PRAGMAS = (
+    ("journal_mode", "OFF"),
+    ("synchronous", "OFF"),
+    ("locking_mode", "EXCLUSIVE"),
+    ("temp_store", "MEMORY"),
+)
+
+# Expressions that are true where a loaded value has the field's datatype, keyed by standard type. Values that
+# could not be converted by the column type affinity are left as text, and values stored as BLOBs on insert
+# because they are not of the datatype, fail these checks.
+_DATATYPE_CHECKS: Mapping[str, str] = {
+    "integer": "typeof({c}) = 'integer'",
+    "year": "typeof({c}) = 'integer'",
+    "number": "typeof({c}) IN ('integer', 'real')",
+    "boolean": "{c} IN (0, 1)",
+    "date": "date({c}) IS {c}",
+    "time": "typeof({c}) = 'text' AND time({c}) IS NOT NULL",
+    "datetime": "typeof({c}) = 'text' AND julianday({c}) IS NOT NULL",
+    "yearmonth": "{c} GLOB '[0-9][0-9][0-9][0-9]-[01][0-9]'",
+    "monthday": "{c} GLOB '--[01][0-9]-[0-3][0-9]'",
+}
+
+
+def _integer_insert(sign: str, digits: str) -> str:
+    """
+    An insert expression for whole numbers. INTEGER affinity would store text such as '1.0' or '1e3' as an
+    integer, so text that is not an optional sign followed by the digits is stored as a BLOB, which fails the
+    datatype check.
+    """
+    text = "trim(?{n})"
+    unsigned = f"substr({text}, 1 + ({text} GLOB '{sign}*'))"
+    return (
+        f"CASE WHEN {text} = '' THEN NULL "
+        f"WHEN {unsigned} GLOB '{digits}' AND {unsigned} NOT GLOB '*[^0-9]*' THEN {text} "
+        f"ELSE CAST({text} AS BLOB) END"
+    )
+
+
+# Converts the raw text of a cell as it is inserted. Empty cells are NULL, and values of any type other than
+# string have their surrounding whitespace removed.
+_INSERT_EXPRESSIONS: Mapping[str, str] = {
+    "string": "NULLIF(?{n}, '')",
+    "integer": _integer_insert("[+-]", "[0-9]*"),
+    "year": _integer_insert("-", "[0-9][0-9][0-9][0-9]*"),
+    "boolean": (
+        "CASE lower(trim(?{n})) WHEN '' THEN NULL WHEN 'true' THEN 1 WHEN '1' THEN 1 "
+        "WHEN 'false' THEN 0 WHEN '0' THEN 0 ELSE ?{n} END"
+    ),
+}
+_DEFAULT_INSERT_EXPRESSION = "NULLIF(trim(?{n}), '')"
+# Cells already converted in Python, see _python_converter
+_CONVERTED_INSERT_EXPRESSION = "?{n}"
+
+
+@dataclass
+class DatabaseReport:
+    """
+    The outcome of checking a dataset loaded into SQLite. Error counts are keyed by field qualified name and then by
+    facet, as in :class:`sfdata_schema.validation.parquet.ParquetReport`, and include 'required' and 'datatype'.
+    Missing columns are the fields that had no column in the loaded files, which are not checked.
+    """
+
+    rows: Dict[str, int] = field(default_factory=dict)
+    error_counts: Dict[str, Counter] = field(default_factory=dict)
+    primary_keys: Dict[str, PrimaryKeyReport] = field(default_factory=dict)
+    foreign_keys: List[ForeignKeyReport] = field(default_factory=list)
+    missing_columns: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return (
+            not self.missing_columns
+            and not any(self.error_counts.values())
+            and all(r.is_valid for r in self.primary_keys.values())
+            and all(r.is_valid for r in self.foreign_keys)
+        )
+
+
+def connect(
+    database: Union[str, Path] = ":memory:", cache_size: int = 256 * 1024 * 1024
+) -> sqlite3.Connection:
+    """
+    Opens an SQLite database tuned for bulk loading, with the :data:`BULK_LOAD_PRAGMAS` and a page cache of
+    cache_size bytes. Foreign keys are not enforced while loading.
+    """
+    connection = sqlite3.connect(str(database))
+    for pragma, value in BULK_LOAD_PRAGMAS:
+        connection.execute(f"PRAGMA {pragma} = {value}")
+    connection.execute(f"PRAGMA cache_size = {-(cache_size // 1024)}")
+    return connection
+
+
+def create_tables(
+    connection: sqlite3.Connection, schema: TabularSchema, constraints: bool = False
+) -> None:
+    """
+    Creates a table for each record. By default the tables have no constraints, so every row loads and the
+    problems can be reported by :func:`check_database`.
+    """
+    with connection:
+        for id in foreign_key_scan_order(schema):
+            connection.execute(record_to_sql(schema.get_record(id), constraints))
+
+
+def _python_converter(validator: FieldValidator) -> Optional[Callable[[Any], Any]]:
+    """
+    Returns a function that converts cells in Python for datatypes with a custom format or boolean values, which
+    SQLite cannot parse. The field's coercer reads the value, which is then written in the standard form that the
+    datatype checks expect. Values that cannot be read are stored as BLOBs, so they fail those checks. Other
+    datatypes are converted by SQLite, and get None.
+    """
+    if not has_lexical_options(validator.field.datatype):
+        return None
+    normalise, coerce = validator._normalise, validator.coerce
+
+    def convert(value):
+        if value is None:
+            return None
+        if normalise is not None:
+            value = normalise(value)
+        if value == "":
+            return None
+        try:
+            value = coerce(value)
+        except ValueError:
+            # Kept as a BLOB, which fails the datatype checks even where the text would be valid in standard form
+            return value.encode("utf-8")
+        if isinstance(value, bool):
+            return int(value)
+        return value.isoformat()
+
+    return convert
+
+
+def _insert_statement(
+    record: Record, fields: Sequence[Field], converted: Sequence[bool]
+) -> str:
+    columns = ", ".join(quote_identifier(f.id) for f in fields)
+    expressions = []
+    for n, (f, is_converted) in enumerate(zip(fields, converted), start=1):
+        if is_converted:
+            expression = _CONVERTED_INSERT_EXPRESSION
+        else:
+            expression = _INSERT_EXPRESSIONS.get(
+                base_datatype(f.datatype).id, _DEFAULT_INSERT_EXPRESSION
+            )
+        expressions.append(expression.format(n=n))
+    values = ", ".join(expressions)
+    return f"INSERT INTO {quote_identifier(record.id)} ({columns}) VALUES ({values})"
+
+
+def _row_values(rows: Iterator[Sequence[str]], positions: Sequence[int]):
+    get = itemgetter(*positions) if len(positions) > 1 else None
+    last = max(positions)
+    for cells in rows:
+        if len(cells) <= last:
+            yield tuple(cells[ix] if ix < len(cells) else None for ix in positions)
+        elif get is None:
+            yield (cells[positions[0]],)
+        else:
+            yield get(cells)
+
+
+def load_csv(
+    connection: sqlite3.Connection,
+    record: Record,
+    source: CsvSource,
+    batch_size: int = 10_000,
+    encoding: str = "utf-8-sig",
+    missing_columns: Optional[List[str]] = None,
+    **csv_options,
+) -> int:
+    """
+    Loads a CSV file into the table of a record and returns the number of rows loaded. Columns are matched to fields
+    by label, as in :func:`sfdata_schema.validation.csvfile.read_csv`. Fields without a column are left NULL, and
+    their qualified names are added to missing_columns if it is given.
+
+    Rows are inserted with executemany in batches of batch_size, all in one transaction. Python only picks the
+    cells out of each row. Converting the text to the column types is done by SQLite as the rows are inserted.
+    The exception is datatypes with a 'format', 'true_values' or 'false_values' option. Their cells are read in
+    Python with the same coercer as the other validators, and stored in the standard form. Integers and years
+    are stored as text is written, so '1.0' is not an integer, as it is not for the other validators.
+    """
+    with open_csv_source(source, encoding) as file:
+        reader = csv.reader(file, **csv_options)
+        header = next(reader, None)
+        if header is None:
+            return 0
+        positions, violations = map_header(RecordValidator(record), header)
+        if missing_columns is not None:
+            missing_columns.extend(v.field for v in violations)
+        if not positions:
+            return 0
+
+        converters = [_python_converter(v) for _, v in positions]
+        statement = _insert_statement(
+            record, [v.field for _, v in positions], [c is not None for c in converters]
+        )
+        values = _row_values(reader, [ix for ix, _ in positions])
+        if any(converters):
+            values = (
+                tuple(v if c is None else c(v) for c, v in zip(converters, row))
+                for row in values
+            )
+        loaded = 0
+        with connection:
+            while True:
+                batch = list(islice(values, batch_size))
+                if not batch:
+                    break
+                connection.executemany(statement, batch)
+                loaded += len(batch)
+    return loaded
+
+
+def _check_values(
+    connection: sqlite3.Connection,
+    record: Record,
+    report: DatabaseReport,
+    missing: Set[str],
+) -> None:
+    # Every count for a table is the sum of one expression, so the table is scanned once
+    sums = ["COUNT(*)"]
+    keys: List[Tuple[Field, str]] = []
+    for f in record.fields:
+        report.error_counts[f.qname] = Counter()
+        if f.qname in missing:
+            continue
+        column = quote_identifier(f.id)
+        if f.primary_key:
+            sums.append(f"SUM({column} IS NULL)")
+            keys.append((f, "required"))
+
+        datatype_check = _DATATYPE_CHECKS.get(base_datatype(f.datatype).id)
+        if datatype_check is not None:
+            datatype_check = datatype_check.format(c=column)
+            sums.append(f"SUM({column} IS NOT NULL AND NOT ({datatype_check}))")
+            keys.append((f, "datatype"))
+        else:
+            datatype_check = "1"
+
+        for facet, expression in field_checks(f):
+            sums.append(
+                f"SUM({column} IS NOT NULL AND ({datatype_check}) AND NOT ({expression}))"
+            )
+            keys.append((f, facet))
+
+    query = f"SELECT {', '.join(sums)} FROM {quote_identifier(record.id)}"
+    rows, *counts = connection.execute(query).fetchone()
+    report.rows[record.id] = rows
+    for (f, facet), count in zip(keys, counts):
+        if count:
+            report.error_counts[f.qname][facet] += count
+
+
+def _check_primary_key(
+    connection: sqlite3.Connection, record: Record, max_samples: int
+) -> PrimaryKeyReport:
+    table = quote_identifier(record.id)
+    key_fields = tuple(f.id for f in record.primary_keys)
+    columns = ", ".join(quote_identifier(id) for id in key_fields)
+    complete = " AND ".join(f"{quote_identifier(id)} IS NOT NULL" for id in key_fields)
+
+    report = PrimaryKeyReport(record.id, key_fields)
+    report.rows, report.incomplete = connection.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(NOT ({complete})), 0) FROM {table}"
+    ).fetchone()
+    duplicates = connection.execute(
+        f"SELECT {columns}, group_concat(rowid) FROM {table} WHERE {complete} "
+        f"GROUP BY {columns} HAVING COUNT(*) > 1"
+    )
+    for *key, rows in duplicates:
+        rows = tuple(sorted(int(r) for r in rows.split(",")))
+        report.duplicate_keys += 1
+        report.duplicates += len(rows) - 1
+        if len(report.samples) < max_samples:
+            report.samples.append(DuplicateKey(tuple(key), rows))
+    report.samples.sort(key=lambda d: d.rows)
+    return report
+
+
+def _check_foreign_key(
+    connection: sqlite3.Connection, child: Field, parent: Field, max_samples: int
+) -> ForeignKeyReport:
+    child_table = quote_identifier(child.record.id)
+    parent_table = quote_identifier(parent.record.id)
+    child_column = quote_identifier(child.id)
+    parent_column = quote_identifier(parent.id)
+
+    # An index on the referenced column turns each lookup into a b-tree search
+    index = quote_identifier(f"sfdata_{parent.record.id}_{parent.id}")
+    connection.execute(
+        f"CREATE INDEX IF NOT EXISTS {index} ON {parent_table} ({parent_column})"
+    )
+
+    orphans = (
+        f"FROM {child_table} AS c WHERE c.{child_column} IS NOT NULL AND NOT EXISTS "
+        f"(SELECT 1 FROM {parent_table} AS p WHERE p.{parent_column} = c.{child_column})"
+    )
+    report = ForeignKeyReport(child.qname, parent.qname)
+    report.checked = connection.execute(
+        f"SELECT COUNT(*) FROM {child_table} WHERE {child_column} IS NOT NULL"
+    ).fetchone()[0]
+    report.orphans = connection.execute(f"SELECT COUNT(*) {orphans}").fetchone()[0]
+    if report.orphans:
+        report.samples = connection.execute(
+            f"SELECT c.rowid, c.{child_column} {orphans} ORDER BY c.rowid LIMIT ?",
+            (max_samples,),
+        ).fetchall()
+    return report
+
+
+def check_database(
+    connection: sqlite3.Connection,
+    schema: TabularSchema,
+    records: Optional[Sequence[str]] = None,
+    max_samples: int = 20,
+    missing_columns: Sequence[str] = (),
+) -> DatabaseReport:
+    """
+    Checks the data loaded into the tables of a schema with SQL queries, so the work is done by the database engine
+    rather than in Python. Records are limited to those given, or default to every record.
+
+    Each table is scanned once to count missing primary key values, values that do not have the field's datatype
+    and values that fail the facets from :func:`sfdata_schema.export.sql.field_checks`. Patterns and digit counts are
+    not checked. Primary keys are checked for duplicates with a GROUP BY. Foreign keys are checked with an anti-join,
+    after indexing the referenced column. Both reuse the reports of :mod:`sfdata_schema.validation.keys`, with
+    rowids as row numbers, which match the CSV row numbers for a table loaded from one file.
+
+    Fields in missing_columns, as collected by :func:`load_csv`, had no column to load. They are reported as
+    missing rather than checked, and so are the keys that include them.
+    """
+    if records is None:
+        records = [r.id for r in schema.records]
+    records = set(records)
+    missing = set(missing_columns)
+
+    report = DatabaseReport(missing_columns=list(missing_columns))
+    for record in schema.records:
+        if record.id not in records:
+            continue
+        _check_values(connection, record, report, missing)
+        if record.primary_keys:
+            absent = [f.qname for f in record.primary_keys if f.qname in missing]
+            if absent:
+                key_report = PrimaryKeyReport(
+                    record.id, tuple(f.id for f in record.primary_keys)
+                )
+                key_report.missing_columns = absent
+            else:
+                key_report = _check_primary_key(connection, record, max_samples)
+            report.primary_keys[record.id] = key_report
+
+    with connection:
+        for child in schema.all_fields:
+            if child.record.id not in records:
+                continue
+            for parent in child.foreign_keys:
+                if parent.record.id not in records:
+                    continue
+                absent = [f.qname for f in (child, parent) if f.qname in missing]
+                if absent:
+                    key_report = ForeignKeyReport(child.qname, parent.qname)
+                    key_report.missing_columns = absent
+                else:
+                    key_report = _check_foreign_key(
+                        connection, child, parent, max_samples
+                    )
+                report.foreign_keys.append(key_report)
+    return report
+
+
+def check_dataset(
+    schema: TabularSchema,
+    sources: Union[PathLike, Mapping[str, PathLike]],
+    database: Union[str, Path] = ":memory:",
+    batch_size: int = 10_000,
+    max_samples: int = 20,
+) -> DatabaseReport:
+    """
+    Loads a dataset of CSV files into an SQLite database and checks it with :func:`check_database`. Sources are a
+    directory, searched with :func:`sfdata_schema.validation.parallel.find_record_files`, or a mapping of record id
+    to file. Only records with a file are checked.
+
+    The database is in memory by default. For datasets larger than memory, give the path of a new file.
+    """
+    if not isinstance(sources, Mapping):
+        from .parallel import find_record_files
+
+        sources = find_record_files(schema, sources)
+
+    connection = connect(database)
+    try:
+        create_tables(connection, schema)
+        missing_columns: List[str] = []
+        for id, source in sources.items():
+            load_csv(
+                connection,
+                schema.get_record(id),
+                Path(source),
+                batch_size,
+                missing_columns=missing_columns,
+            )
+        return check_database(
+            connection, schema, list(sources), max_samples, missing_columns
+        )
+    finally:
+        connection.close()
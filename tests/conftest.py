@@ -3,6 +3,37 @@ from pathlib import Path
 import pytest
 
 from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import (
+    DT_INTEGER,
+    DT_STRING,
+    STANDARD_TYPES,
+    Datatype,
+    DatatypeRestriction,
+)
+
+DT_CODE = Datatype(
+    "code",
+    extends=DT_STRING,
+    restriction=DatatypeRestriction(pattern=r"[A-Z]+", max_length=3),
+)
+DT_SHORT_CODE = Datatype(
+    "short_code", extends=DT_CODE, restriction=DatatypeRestriction(max_length=2)
+)
+DT_COLOUR = Datatype(
+    "colour",
+    extends=DT_STRING,
+    restriction=DatatypeRestriction(enumeration=["red", "green", "blue"]),
+)
+DT_PERCENT = Datatype(
+    "percent",
+    extends=DT_INTEGER,
+    restriction=DatatypeRestriction(min_inclusive=0, max_inclusive=100),
+)
+DT_LABEL = Datatype(
+    "label",
+    extends=DT_STRING,
+    restriction=DatatypeRestriction(min_length=3, max_length=6),
+)
 
 
 @pytest.fixture
@@ -42,3 +73,20 @@ def pet_schema():
     primary_phone_record.add_field("number")
 
     return schema
+
+
+@pytest.fixture
+def record():
+    schema = TabularSchema(
+        id="s1",
+        datatypes=STANDARD_TYPES
+        + (DT_CODE, DT_SHORT_CODE, DT_COLOUR, DT_PERCENT, DT_LABEL),
+    )
+    record = schema.add_record("r1")
+    record.add_field("id", datatype="integer", primary_key=True)
+    record.add_field("code", datatype="short_code")
+    record.add_field("colour", label="Colour", datatype="colour")
+    record.add_field("score", datatype="percent")
+    record.add_field("born", datatype="date")
+    record.add_field("label", datatype="label")
+    return record
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from sfdata_schema.docgen.erd import get_erd_context, graphviz_render_erd, render_erd
 
 
@@ -45,3 +47,32 @@ def test_dot_svg(pet_schema):
     assert "<title>pet</title>" in svg
     assert "<title>address</title>" in svg
     assert '<polygon fill="LightPink"' in svg
+
+
+def test_render_cache(pet_schema, tmpdir, monkeypatch):
+    import graphviz
+
+    from sfdata_schema.docgen import erd
+
+    calls = []
+
+    def pipe(engine, format, data):
+        calls.append((engine, format))
+        return b"<svg/>"
+
+    monkeypatch.setattr(graphviz, "pipe", pipe)
+    monkeypatch.setattr(erd, "_render_cache", erd.OrderedDict())
+    cache_dir = Path(tmpdir) / "erd"
+
+    assert graphviz_render_erd(pet_schema, "svg", cache_dir=cache_dir) == b"<svg/>"
+    assert graphviz_render_erd(pet_schema, "svg", cache_dir=cache_dir) == b"<svg/>"
+    assert calls == [("circo", "svg")]
+    assert len(list(cache_dir.glob("*.svg"))) == 1
+
+    # A new process starts with an empty in-memory cache, but still finds the file
+    erd._render_cache.clear()
+    graphviz_render_erd(pet_schema, "svg", cache_dir=cache_dir)
+    assert len(calls) == 1
+
+    graphviz_render_erd(pet_schema, "svg", engine="dot", cache_dir=cache_dir)
+    assert calls[-1] == ("dot", "svg")
@@ -0,0 +1,91 @@
+import pytest
+
+from sfdata_schema.docgen.erd import get_erd_context, render_erd
+from sfdata_schema.docgen.erd.partition import (
+    ErdPartition,
+    graphviz_render_partitions,
+    partition_erd,
+    render_overview_erd,
+)
+
+
+@pytest.fixture
+def schema(pet_schema):
+    vet = pet_schema.add_record("vet", options={"group": "care"})
+    vet.add_field("id", primary_key=True)
+    visit = pet_schema.add_record("visit", options={"group": "care"})
+    visit.add_field("vet_id", foreign_keys=["vet.id"])
+    pet_schema.add_record("log").add_field("message")
+    return pet_schema
+
+
+def test_components(schema):
+    partitions = partition_erd(schema, "components")
+    assert partitions == [
+        ("person", ("person", "pet", "address", "primary_phone")),
+        ("vet", ("vet", "visit")),
+        ("log", ("log",)),
+    ]
+
+
+def test_neighbourhood(pet_schema):
+    partitions = {p.name: p.records for p in partition_erd(pet_schema, "neighbourhood")}
+    assert partitions["pet"] == ("person", "pet")
+    assert len(partitions["person"]) == 4
+
+    partitions = partition_erd(pet_schema, "neighbourhood", hops=2)
+    assert all(len(p.records) == 4 for p in partitions)
+
+
+def test_groups(schema):
+    partitions = partition_erd(schema, "groups")
+    assert [p.name for p in partitions] == ["ungrouped", "care"]
+    assert partitions[1].records == ("vet", "visit")
+
+
+def test_partial_erd(pet_schema):
+    context = get_erd_context(pet_schema, records=["pet", "address"])
+    assert [r.id for r in context["records"]] == ["pet", "address"]
+    assert context["relationships"] == []
+
+    erd = render_erd(pet_schema, records=["pet", "person"])
+    assert '<FONT POINT-SIZE="16">pet</FONT>' in erd
+    assert '<FONT POINT-SIZE="16">address</FONT>' not in erd
+    assert '"pet" -- "person"' in erd
+
+
+def test_overview(schema):
+    partitions = partition_erd(schema, "groups")
+    overview = render_overview_erd(schema, partitions)
+    assert '"ungrouped" [id="ungrouped", label="ungrouped\\n(5 records)"]' in overview
+    assert "--" not in overview
+
+
+def test_render_partitions(schema, monkeypatch):
+    import graphviz
+
+    from sfdata_schema.docgen import erd
+
+    monkeypatch.setattr(erd, "_render_cache", erd.OrderedDict())
+    monkeypatch.setattr(graphviz, "pipe", lambda engine, format, data: data)
+
+    partitions = partition_erd(schema, "components")
+    rendered = graphviz_render_partitions(schema, partitions, max_workers=2)
+    assert list(rendered) == ["person", "vet", "log", "overview"]
+    assert b'"visit" -- "vet"' in rendered["vet"]
+
+
+def test_render_partitions_overview_name(schema, monkeypatch):
+    import graphviz
+
+    from sfdata_schema.docgen import erd
+
+    monkeypatch.setattr(erd, "_render_cache", erd.OrderedDict())
+    monkeypatch.setattr(graphviz, "pipe", lambda engine, format, data: data)
+
+    partitions = [ErdPartition("overview", ("person",))]
+    with pytest.raises(ValueError):
+        graphviz_render_partitions(schema, partitions)
+
+    rendered = graphviz_render_partitions(schema, partitions, overview=False)
+    assert list(rendered) == ["overview"]
@@ -0,0 +1,48 @@
+import pytest
+
+from sfdata_schema.export.arrow import record_to_arrow_schema, schema_to_arrow
+from sfdata_schema.parser import parse_schema
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_record_to_arrow_schema():
+    schema = parse_schema(
+        {
+            "id": "pets",
+            "datatypes": {
+                "species": {"restriction": {"enumeration": ["cat", "dog"]}},
+                "price": {
+                    "extends": "number",
+                    "restriction": {"total_digits": 8, "fraction_digits": 2},
+                },
+            },
+            "records": {
+                "pet": {
+                    "fields": {
+                        "id": {"datatype": "integer", "primary_key": True},
+                        "name": {"label": "Pet Name"},
+                        "species": {"datatype": "species"},
+                        "born": {"datatype": "date"},
+                        "price": {"datatype": "price"},
+                    }
+                }
+            },
+        }
+    )
+    arrow_schema = record_to_arrow_schema(schema.get_record("pet"))
+
+    assert arrow_schema.names == ["id", "Pet Name", "species", "born", "price"]
+    assert arrow_schema.field("id").type == pa.int64()
+    assert not arrow_schema.field("id").nullable
+    assert arrow_schema.field("Pet Name").nullable
+    assert arrow_schema.field("species").type == pa.dictionary(pa.int32(), pa.string())
+    assert arrow_schema.field("born").type == pa.date32()
+    assert arrow_schema.field("price").type == pa.decimal128(8, 2)
+    assert arrow_schema.field("Pet Name").metadata[b"sfdata.id"] == b"name"
+
+
+def test_schema_to_arrow(pet_schema):
+    schemas = schema_to_arrow(pet_schema)
+    assert list(schemas) == ["person", "pet", "address", "primary_phone"]
+    assert schemas["pet"].names == ["id", "owner_id", "name"]
@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from sfdata_schema.export.sql import (
+    field_checks,
+    record_to_sql,
+    schema_to_sql,
+    sql_literal,
+)
+from sfdata_schema.parser import parse_schema
+
+
+def test_record_to_sql():
+    schema = parse_schema(
+        {
+            "id": "pets",
+            "datatypes": {
+                "species": {"restriction": {"enumeration": ["cat", "dog"]}},
+                "age": {"extends": "integer", "restriction": {"min_inclusive": 0}},
+                "price": {
+                    "extends": "number",
+                    "restriction": {"total_digits": 8, "fraction_digits": 2},
+                },
+            },
+            "records": {
+                "pet": {
+                    "fields": {
+                        "id": {"datatype": "integer", "primary_key": True},
+                        "species": {"datatype": "species"},
+                        "age": {"datatype": "age"},
+                        "price": {"datatype": "price"},
+                    }
+                }
+            },
+        }
+    )
+    record = schema.get_record("pet")
+    assert field_checks(record.get_field("age")) == [("min_inclusive", '"age" >= 0')]
+
+    sql = record_to_sql(record)
+    assert '"id" INTEGER NOT NULL' in sql
+    assert "CHECK (\"species\" IN ('cat', 'dog'))" in sql
+    assert '"price" NUMERIC(8, 2)' in sql
+    assert 'PRIMARY KEY ("id")' in sql
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute(sql)
+    connection.execute("INSERT INTO pet VALUES (1, 'cat', 3, 9.99)")
+    for row in [(1, "dog", 3, 1), (2, "cow", 3, 1), (3, "cat", -1, 1)]:
+        try:
+            connection.execute("INSERT INTO pet VALUES (?, ?, ?, ?)", row)
+        except sqlite3.IntegrityError:
+            continue
+        assert False, f"{row} was accepted"
+
+    assert "CHECK" not in record_to_sql(record, constraints=False)
+
+
+def test_schema_to_sql(pet_schema):
+    sql = schema_to_sql(pet_schema)
+    assert sql.index('CREATE TABLE "person"') < sql.index('CREATE TABLE "pet"')
+    assert 'FOREIGN KEY ("owner_id") REFERENCES "person" ("id")' in sql
+    assert 'PRIMARY KEY ("owner_id", "type")' in sql
+
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(sql)
+    tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    assert {name for name, in tables} == {"person", "pet", "address", "primary_phone"}
+
+
+def test_sql_literal():
+    assert sql_literal(None) == "NULL"
+    assert sql_literal(True) == "1"
+    assert sql_literal(1.5) == "1.5"
+    assert sql_literal(date(2020, 2, 1)) == "'2020-02-01'"
+    assert sql_literal("it's") == "'it''s'"
+    for value in (float("inf"), float("-inf"), float("nan")):
+        with pytest.raises(ValueError):
+            sql_literal(value)
@@ -0,0 +1,56 @@
+from sfdata_schema.parser import parse_schema
+from sfdata_schema.spec.fingerprint import diff
+
+
+def test_fingerprint_stable(base_dir):
+    schema_file = base_dir / "tests/fixtures/single-file-schema.yml"
+    old = parse_schema(schema_file)
+    new = parse_schema(schema_file)
+
+    assert old.fingerprint == new.fingerprint
+    assert old.get_record("person").fingerprint == new.get_record("person").fingerprint
+    assert not diff(old, new)
+
+
+def test_fingerprint_invalidated(pet_schema):
+    schema_fingerprint = pet_schema.fingerprint
+    pet = pet_schema.get_record("pet")
+    record_fingerprint = pet.fingerprint
+    field_fingerprint = pet.get_field("name").fingerprint
+
+    pet.add_field("species")
+    assert pet.fingerprint != record_fingerprint
+    assert pet_schema.fingerprint != schema_fingerprint
+    assert pet.get_field("name").fingerprint == field_fingerprint
+
+
+def test_diff():
+    def document(code_length, owner_label, extra_record):
+        records = {
+            "person": {"fields": {"id": {"primary_key": True}, "name": {}}},
+            "pet": {
+                "fields": {
+                    "id": {"primary_key": True, "datatype": "code"},
+                    "owner": {"label": owner_label, "foreign_keys": ["person.id"]},
+                }
+            },
+        }
+        if extra_record:
+            records[extra_record] = {"fields": {"id": {}}}
+        return {
+            "id": "pets",
+            "datatypes": {"code": {"restriction": {"max_length": code_length}}},
+            "records": records,
+        }
+
+    old = parse_schema(document(5, "Owner", "vet"))
+    new = parse_schema(document(6, "Owner ID", "toy"))
+    changes = diff(old, new)
+
+    assert changes.modified_datatypes == ["code"]
+    assert changes.added_records == ["toy"]
+    assert changes.removed_records == ["vet"]
+    assert changes.modified_records == ["pet"]
+    assert changes.modified_fields == ["pet.id", "pet.owner"]
+    assert changes.added_fields == ["toy.id"]
+    assert changes.removed_fields == ["vet.id"]
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are only needed by some formats or commands, and must not be imported up front
+DEFERRED_MODULES = ("yaml", "json5", "orjson", "xml", "jinja2", "graphviz", "pickle")
+
+# Budget for the time spent importing the package's own modules, in microseconds. This is several times the
+# measured time, so it only fails if import-time work is added, not on a slow machine.
+IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(module: str):
+    """Imports a module in a fresh interpreter with -X importtime, and returns the self time of each module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.mark.parametrize("module", ["sfdata_schema.parser", "sfdata_schema.docgen.cli"])
+def test_import_time(module):
+    times = _import_times(module)
+    assert module in times
+
+    imported = {name.split(".")[0] for name in times}
+    assert imported.isdisjoint(DEFERRED_MODULES)
+
+    own = sum(t for name, t in times.items() if name.startswith("sfdata_schema"))
+    assert own < IMPORT_BUDGET_US
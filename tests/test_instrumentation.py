@@ -0,0 +1,48 @@
+import json
+
+from sfdata_schema.instrumentation import (
+    SpanRecorder,
+    add_hook,
+    remove_hook,
+    span,
+)
+from sfdata_schema.parser import parse_schema
+
+
+def test_span_disabled():
+    with span("idle") as s:
+        assert s is None
+
+
+def test_hook():
+    finished = []
+    hook = add_hook(lambda s: finished.append((s.name, s.depth, s.attributes)))
+    try:
+        with span("outer"):
+            with span("inner", size=2):
+                pass
+    finally:
+        remove_hook(hook)
+
+    assert finished == [("inner", 1, {"size": 2}), ("outer", 0, {})]
+
+
+def test_recorder(base_dir, tmpdir):
+    with SpanRecorder() as recorder:
+        parse_schema(base_dir / "tests/fixtures/single-file-schema.yml")
+        parse_schema(base_dir / "tests/fixtures/single-file-schema.yml")
+
+    assert [s.name for s in recorder.roots] == ["parse_schema", "parse_schema"]
+    assert [s.name for s in recorder.roots[0].children] == [
+        "parse.load_document",
+        "parse.build_schema",
+    ]
+
+    lines = recorder.format_tree().splitlines()
+    assert lines[1].split()[:2] == ["parse_schema", "2"]
+    assert lines[2].split()[:2] == ["parse.load_document", "2"]
+
+    trace_file = tmpdir / "trace.json"
+    recorder.write_trace(trace_file)
+    events = json.loads(trace_file.read_text("utf-8"))["traceEvents"]
+    assert len(events) == 6
@@ -1,3 +1,4 @@
+import pickle
 from pathlib import Path
 
 import yaml
@@ -40,3 +41,134 @@ def test_write_record_data(pet_schema, tmpdir):
         "address",
         "primary_phone",
     }
+
+
+def test_incremental_collections(pet_schema, tmpdir):
+    tmpdir = Path(tmpdir)
+
+    # The first run documents a field that the second run's schema no longer has
+    schema = pickle.loads(pickle.dumps(pet_schema))
+    pet_schema.get_record("person").add_field("removed")
+    writer = JekyllDocumentationWriter(tmpdir, incremental=True)
+    writer.write_all_collections(pet_schema)
+    writer.write_all_data(pet_schema)
+    assert writer.stats["written"] == 4 + 12 + 1 + 3
+    assert writer.stats["skipped"] == 0
+
+    unchanged_file = tmpdir / "_records" / "pet.md"
+    mtime = unchanged_file.stat().st_mtime_ns
+    stale_file = tmpdir / "_fields" / "person.removed.md"
+    assert stale_file.exists()
+
+    schema.get_record("person").add_field("nickname")
+    writer = JekyllDocumentationWriter(tmpdir, incremental=True)
+    writer.write_all_collections(schema)
+    writer.write_all_data(schema)
+
+    # The person record, the new field and the records and fields data files changed
+    assert writer.stats["written"] == 4
+    assert writer.stats["skipped"] == 4 + 11 + 1 + 3 - 3
+    assert writer.stats["removed"] == 1
+    assert not stale_file.exists()
+    assert (tmpdir / "_fields" / "person.nickname.md").exists()
+    assert unchanged_file.stat().st_mtime_ns == mtime
+    assert "removed 1 stale files" in writer.summary()
+
+
+def test_incremental_keeps_untracked_files(pet_schema, tmpdir):
+    tmpdir = Path(tmpdir)
+    handwritten = tmpdir / "_fields" / "notes.md"
+    handwritten.parent.mkdir(parents=True)
+    handwritten.write_text("Written by hand")
+
+    for _ in range(2):
+        writer = JekyllDocumentationWriter(tmpdir, incremental=True)
+        writer.write_all_collections(pet_schema)
+        writer.write_all_data(pet_schema)
+        assert writer.stats["removed"] == 0
+
+    assert handwritten.read_text() == "Written by hand"
+
+
+def test_memoised_dicts(pet_schema, tmpdir):
+    writer = JekyllDocumentationWriter(Path(tmpdir))
+    field = pet_schema.get_field("pet.name")
+
+    data = writer.field_to_dict(field)
+    assert writer.field_to_dict(field) is data
+    assert writer.datatype_to_dict(field.datatype) is data["datatype"]
+
+    writer.write_field_data(pet_schema)
+    assert writer.field_to_dict(field) is not data
+
+    record_data = writer.record_to_dict(pet_schema.get_record("pet"))
+    assert record_data["fields"][2] is writer.field_to_dict(field)
+
+    # Shared dictionaries are written out in full rather than as YAML aliases
+    data_file = writer.write_record_data(pet_schema)
+    assert "&id" not in data_file.read_text()
+
+
+SAMPLE_SVG = b"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg width="100pt" height="50pt" xmlns="http://www.w3.org/2000/svg">
+<g id="graph0" class="graph">
+<polygon fill="white" points="0,0 100,0 100,50 0,50"/>
+<g id="person" class="node"><title>person</title></g>
+<g id="pet--person" class="edge"><title>pet&#45;&#45;person</title></g>
+<g id="pet" class="node"><title>pet</title></g>
+</g>
+</svg>
+"""
+
+
+def test_write_record_erds(pet_schema, tmpdir, monkeypatch):
+    import graphviz
+
+    from sfdata_schema.docgen import erd
+
+    monkeypatch.setattr(erd, "_render_cache", erd.OrderedDict())
+    monkeypatch.setattr(graphviz, "pipe", lambda engine, format, data: SAMPLE_SVG)
+
+    writer = JekyllDocumentationWriter(Path(tmpdir))
+    erd_dir = writer.write_record_erds(pet_schema)
+
+    assert sorted(p.name for p in erd_dir.iterdir()) == [
+        "address.svg",
+        "person.svg",
+        "pet.svg",
+        "primary_phone.svg",
+    ]
+    svg = (erd_dir / "pet.svg").read_text()
+    assert "<polygon" not in svg
+    assert "{{ '/records/pet.html' | relative_url }}" in svg
+
+
+def test_write_embeddable_svg():
+    import xml.etree.ElementTree as ET
+    from io import BytesIO
+
+    from sfdata_schema.docgen.jekyll.svg import write_embeddable_svg
+
+    target = BytesIO()
+    write_embeddable_svg(BytesIO(SAMPLE_SVG), target, "/records/{record_id}.html")
+
+    ns = {"svg": "http://www.w3.org/2000/svg"}
+    root = ET.fromstring(target.getvalue())
+    assert root.attrib["width"] == "auto"
+    assert root.attrib["height"] == "auto"
+
+    graph = root.find("svg:g", ns)
+    assert graph.find("svg:polygon", ns) is None
+
+    children = list(graph)
+    assert [c.attrib.get("id") for c in children] == [
+        "pet--person",
+        None,
+        None,
+    ]
+    links = graph.findall("svg:a", ns)
+    assert [a.attrib["href"] for a in links] == [
+        "{{ '/records/person.html' | relative_url }}",
+        "{{ '/records/pet.html' | relative_url }}",
+    ]
+    assert links[1].find("svg:g/svg:title", ns).text == "pet"
@@ -1,5 +1,10 @@
 from sfdata_schema.parser import parse_datatype, parse_datatypes
-from sfdata_schema.spec.datatypes import DT_STRING, STANDARD_TYPES
+from sfdata_schema.spec.datatypes import (
+    DT_STRING,
+    STANDARD_TYPES,
+    base_datatype,
+    effective_restriction,
+)
 
 
 def test_parse_datatype():
@@ -53,3 +58,19 @@ def test_parse_datatypes_extends():
     dt_map = {d.id: d for d in dt}
     assert dt_map["testtype1"].extends == DT_STRING
     assert dt_map["testtype2"].extends == dt_map["testtype1"]
+
+
+def test_parse_datatypes_interned():
+    data = {
+        "code": {"restriction": {"pattern": "[A-Z]+", "enumeration": ["A", "B"]}},
+        "other_code": {"restriction": {"pattern": "[A-Z]+", "enumeration": ["A", "B"]}},
+        "short_code": {"extends": "code", "restriction": {"max_length": 1}},
+    }
+    dt_map = {d.id: d for d in parse_datatypes(data)}
+    assert dt_map["code"].restriction is dt_map["other_code"].restriction
+    assert dt_map["code"].restriction.enumeration == ["A", "B"]
+
+    restriction = effective_restriction(dt_map["short_code"])
+    assert restriction.pattern == "[A-Z]+"
+    assert restriction.max_length == 1
+    assert base_datatype(dt_map["short_code"]) is dt_map["code"]
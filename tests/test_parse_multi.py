@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from sfdata_schema import parser
+from sfdata_schema.parser import parse_schema
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "multi-file-schema"
+
+
+def test_parse_directory():
+    schema = parse_schema(FIXTURE_DIR)
+
+    assert schema.id == "multi-file-schema"
+    assert not schema.loaded
+    assert schema.get_datatype("categorical").restriction.enumeration == [
+        "one",
+        "two",
+        "three",
+    ]
+
+    person = schema.get_record("person")
+    assert [f.id for f in person.fields] == ["id", "name", "count"]
+    assert not schema.loaded
+
+    assert [r.id for r in schema.records] == ["address", "person"]
+    assert schema.loaded
+
+
+def test_foreign_key_loads_parent():
+    schema = parse_schema(FIXTURE_DIR)
+    person_id = schema.get_field("address.person_id")
+    assert person_id.foreign_keys[0].qname == "person.id"
+    assert schema.loaded
+
+
+def test_parse_manifest(tmpdir):
+    tmpdir = Path(tmpdir)
+    manifest = tmpdir / "schema.yml"
+    manifest.write_text(f"""
+id: manifest
+datatypes: {FIXTURE_DIR / "datatypes.yml"}
+records:
+  person: {FIXTURE_DIR / "person.yml"}
+  address: {FIXTURE_DIR / "address.json"}
+  inline:
+    fields:
+      id: {{}}
+""")
+
+    schema = parse_schema(manifest, cache_dir=tmpdir / "cache")
+    assert schema.id == "manifest"
+    assert [r.id for r in schema.records] == ["person", "address", "inline"]
+    assert schema.get_field("person.count").datatype.id == "categorical"
+
+    # The manifest refers to other files so is not cached whole, but the files it refers to are
+    assert len(list((tmpdir / "cache").glob("*.pickle"))) == 3
+    cached = parse_schema(manifest, cache_dir=tmpdir / "cache")
+    assert [f.qname for f in cached.all_fields] == [f.qname for f in schema.all_fields]
+
+
+def test_parse_directory_cached(tmpdir, monkeypatch):
+    cache_dir = Path(tmpdir) / "cache"
+    schema = parse_schema(FIXTURE_DIR, cache_dir=cache_dir)
+    assert [r.id for r in schema.records] == ["address", "person"]
+    assert len(list(cache_dir.glob("*.pickle"))) == 3
+
+    def load_document(content, format=None):
+        raise AssertionError("Document loaded instead of read from the cache")
+
+    monkeypatch.setattr(parser, "load_document", load_document)
+    cached = parse_schema(FIXTURE_DIR, cache_dir=cache_dir)
+    assert [f.qname for f in cached.all_fields] == [f.qname for f in schema.all_fields]
+    assert len(list(cache_dir.glob("*.pickle"))) == 3
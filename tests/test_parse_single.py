@@ -1,13 +1,14 @@
+from io import StringIO
 from pathlib import Path
 
-from sfdata_schema.parser import Readable, parse_schema
+import pytest
+
+from sfdata_schema.parser import Readable, load_document, parse_schema
 from sfdata_schema.spec import TabularSchema
 from sfdata_schema.spec.datatypes import DT_STRING
 
 
 def test_readable():
-    from io import StringIO
-
     readable = StringIO("{'bar': 1}")
     assert isinstance(readable, Readable)
 
@@ -30,8 +31,10 @@ def test_parse_single_file_json():
 
 
 def assert_schema(file):
-    schema = parse_schema(file)
+    assert_schema_content(parse_schema(file))
+
 
+def assert_schema_content(schema):
     assert isinstance(schema, TabularSchema)
 
     assert len(schema.records) == 2
@@ -61,3 +64,67 @@ def assert_schema(file):
     count_type = schema.get_field("person.count").datatype
     assert count_type.id == "categorical"
     assert count_type.restriction.enumeration == ["one", "two", "three"]
+
+
+def test_parse_str_path():
+    file = Path(__file__).parent / "fixtures" / "single-file-schema.yml"
+    assert_schema(str(file))
+
+
+def test_parse_cached(tmpdir):
+    cache_dir = Path(tmpdir) / "cache"
+    file = Path(__file__).parent / "fixtures" / "single-file-schema.yml"
+
+    schema = parse_schema(file, cache_dir=cache_dir)
+    cache_files = list(cache_dir.glob("*.pickle"))
+    assert len(cache_files) == 1
+
+    cached = parse_schema(file, cache_dir=cache_dir)
+    assert cached is not schema
+    assert [f.qname for f in cached.all_fields] == [f.qname for f in schema.all_fields]
+    assert_schema_content(cached)
+
+    cache_files[0].write_bytes(b"corrupt")
+    assert_schema_content(parse_schema(file, cache_dir=cache_dir))
+
+
+def test_parse_cached_format(tmpdir):
+    cache_dir = Path(tmpdir) / "cache"
+    content = '{id: "s1", version: 1e3}'
+
+    # The same content reads differently as YAML and as JSON5, so each has its own cache entry
+    yaml_schema = parse_schema(StringIO(content), cache_dir=cache_dir, format="yaml")
+    json5_schema = parse_schema(StringIO(content), cache_dir=cache_dir, format="json5")
+    assert yaml_schema.version == "1e3"
+    assert json5_schema.version == 1000.0
+    assert len(list(cache_dir.glob("*.pickle"))) == 2
+    assert (
+        parse_schema(StringIO(content), cache_dir=cache_dir, format="json5").version
+        == 1000.0
+    )
+
+
+def test_load_document_backends():
+    data, backend = load_document('{"id": "strict"}')
+    assert data == {"id": "strict"}
+    assert backend in ("orjson", "json")
+
+    data, backend = load_document("{id: 'loose', /* comment */}")
+    assert data == {"id": "loose"}
+    assert backend == "json5"
+
+    data, backend = load_document('{"id": "strict"}', format="json5")
+    assert backend == "json5"
+
+    data, backend = load_document("id: yaml")
+    assert data == {"id": "yaml"}
+    assert backend in ("yaml-libyaml", "yaml")
+
+    with pytest.raises(ValueError):
+        load_document("id: yaml", format="toml")
+
+
+def test_parse_format_from_extension(tmpdir):
+    file = Path(tmpdir) / "schema.yml"
+    file.write_text('{"id": "flow-style-yaml"}')
+    assert parse_schema(file).id == "flow-style-yaml"
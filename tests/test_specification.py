@@ -1,6 +1,8 @@
+import pickle
+
 import pytest
 
-from sfdata_schema.spec import Record, TabularSchema
+from sfdata_schema.spec import Record, TabularSchema, foreign_key_scan_order
 from sfdata_schema.spec.datatypes import DT_STRING
 
 
@@ -56,3 +58,55 @@ def test_spec_hash():
     my_lookup = {r1: r1, r1_alt: r1_alt}
 
     assert len(my_lookup) == 1
+
+
+def test_lookups(simple_schema):
+    r1 = simple_schema.get_record("r1")
+    assert r1.id == "r1"
+    assert r1.get_field("f2").qname == "r1.f2"
+    assert simple_schema.get_field("r2.f3").record.id == "r2"
+    assert simple_schema.get_datatype("string") == DT_STRING
+    assert simple_schema.get_datatype(DT_STRING) is DT_STRING
+
+    with pytest.raises(KeyError):
+        simple_schema.get_record("r3")
+    with pytest.raises(KeyError):
+        r1.get_field("f3")
+    with pytest.raises(KeyError):
+        simple_schema.get_field("r1.f3")
+    with pytest.raises(ValueError):
+        simple_schema.get_field("f3")
+
+
+def test_lookups_after_add(simple_schema):
+    r3 = simple_schema.add_record("r3")
+    assert simple_schema.records[-1] is r3
+
+    f4 = r3.add_field("f4", foreign_keys=["r1.f1"])
+    assert r3.fields == (f4,)
+    assert simple_schema.get_field("r3.f4") is f4
+
+
+def test_foreign_keys_resolved_once(pet_schema):
+    owner_id = pet_schema.get_field("pet.owner_id")
+    fks = owner_id.foreign_keys
+    assert fks == (pet_schema.get_field("person.id"),)
+    assert owner_id.foreign_keys is fks
+
+
+def test_compact_items(pet_schema):
+    pet, owner = pet_schema.get_record("pet").fields[:2]
+    assert not hasattr(pet, "__dict__")
+    assert pet.options is owner.options
+    with pytest.raises(TypeError):
+        pet.options["sensitive"] = True
+
+    restored = pickle.loads(pickle.dumps(pet_schema))
+    assert restored.get_field("pet.owner_id").foreign_keys[0].qname == "person.id"
+    assert restored.get_field("pet.id").options is pet.options
+
+
+def test_foreign_key_scan_order(pet_schema):
+    order = foreign_key_scan_order(pet_schema)
+    assert order[0] == "person"
+    assert set(order) == {"person", "pet", "address", "primary_phone"}
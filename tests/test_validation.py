@@ -0,0 +1,78 @@
+import pytest
+
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import (
+    DT_NUMBER,
+    DT_STRING,
+    STANDARD_TYPES,
+    Datatype,
+    DatatypeRestriction,
+    effective_restriction,
+)
+from sfdata_schema.validation import FieldValidator, Violation, compile_validator
+
+
+def test_effective_restriction(record):
+    restriction = effective_restriction(record.schema.get_datatype("short_code"))
+    assert restriction.pattern == r"[A-Z]+"
+    assert restriction.max_length == 2
+    assert effective_restriction(DT_STRING) is None
+
+
+def test_valid_row(record):
+    validator = compile_validator(record)
+    row, violations = validator.validate_row(
+        {"id": "1", "code": "AB", "colour": "red", "score": "50", "born": "2001-02-03"}
+    )
+    assert violations == []
+    assert row["id"] == 1
+    assert row["score"] == 50
+    assert row["born"].year == 2001
+
+
+def test_invalid_row(record):
+    validator = compile_validator(record)
+    row, violations = validator.validate_row(
+        {"id": "", "code": "abc", "colour": "pink", "score": "101", "born": "x"}, 7
+    )
+    assert set((v.field, v.facet) for v in violations) == {
+        ("r1.id", "required"),
+        ("r1.code", "pattern"),
+        ("r1.code", "max_length"),
+        ("r1.colour", "enumeration"),
+        ("r1.score", "max_inclusive"),
+        ("r1.born", "datatype"),
+    }
+    assert all(v.row == 7 for v in violations)
+
+
+def test_validate_rows(record):
+    validator = compile_validator(record)
+    rows = [{"id": 1, "score": 10}, {"id": 2, "score": -1}, {"id": "x"}]
+    assert list(validator.validate_rows(rows)) == [
+        Violation("r1.score", "min_inclusive", -1, 2),
+        Violation("r1.id", "datatype", "x", 3),
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, failures",
+    [
+        ("10", ()),
+        ("1.5", ()),
+        ("0.05", ("fraction_digits",)),
+        ("100", ("total_digits",)),
+        ("1000000", ("total_digits",)),
+        ("100.0", ("total_digits",)),
+        ("12.34", ("total_digits", "fraction_digits")),
+    ],
+)
+def test_digits(value, failures):
+    datatype = Datatype(
+        "amount",
+        extends=DT_NUMBER,
+        restriction=DatatypeRestriction(total_digits=2, fraction_digits=1),
+    )
+    schema = TabularSchema(id="s1", datatypes=STANDARD_TYPES + (datatype,))
+    field = schema.add_record("r1").add_field("amount", datatype="amount")
+    assert FieldValidator(field)(value)[1] == failures
@@ -0,0 +1,85 @@
+import pytest
+
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import (
+    DT_INTEGER,
+    STANDARD_TYPES,
+    Datatype,
+    DatatypeRestriction,
+)
+from sfdata_schema.validation.arrow import validate_array, validate_batch
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_typed_array(record):
+    result = validate_array(record.get_field("score"), pa.array([0, 50, 101, -1, None]))
+    assert result.error_counts == {"min_inclusive": 1, "max_inclusive": 1}
+    assert result.mask.to_pylist() == [True, True, False, False, True]
+    assert result.null_count == 1
+    assert result.invalid_count == 2
+
+
+def test_string_array(record):
+    result = validate_array(
+        record.get_field("code"), pa.chunked_array([["AB", "ab"], ["ABC", "", None]])
+    )
+    assert result.error_counts == {"pattern": 1, "max_length": 1}
+    assert result.mask.to_pylist() == [True, False, False, True, True]
+    assert result.null_count == 2
+
+
+def test_required_array(record):
+    result = validate_array(record.get_field("id"), pa.array([1, None, 3]))
+    assert result.error_counts == {"required": 1}
+    assert result.mask.to_pylist() == [True, False, True]
+
+
+def test_dictionary_array(record):
+    colours = pa.array(["red", "pink", "red", None, "pink"]).dictionary_encode()
+    result = validate_array(record.get_field("colour"), colours)
+    assert result.error_counts == {"enumeration": 2}
+    assert result.mask.to_pylist() == [True, False, True, True, False]
+
+
+def test_text_array(record):
+    result = validate_array(
+        record.get_field("score"), pa.array(["5", "x", "101", "5", None])
+    )
+    assert result.error_counts == {"datatype": 1, "max_inclusive": 1}
+    assert result.mask.to_pylist() == [True, False, False, True, True]
+
+
+def test_validate_batch(record):
+    batch = pa.record_batch(
+        {
+            "id": [1, 2],
+            "Colour": ["red", "teal"],
+            "score": pa.array([1, 2], pa.int8()),
+        }
+    )
+    results = validate_batch(record, batch)
+    assert results["r1.id"].is_valid
+    assert results["r1.colour"].error_counts == {"enumeration": 1}
+    assert results["r1.score"].is_valid
+    assert results["r1.born"].error_counts == {"missing_column": 2}
+
+
+def test_year_array(record):
+    field = record.schema.add_record("r2").add_field("year", datatype="year")
+    result = validate_array(field, pa.array([1999, 99, 2024]))
+    assert result.mask.to_pylist() == [True, False, True]
+    assert result.error_counts == {"datatype": 1}
+
+
+def test_enumeration_member_not_of_datatype():
+    small = Datatype(
+        "small",
+        extends=DT_INTEGER,
+        restriction=DatatypeRestriction(enumeration=[1, "x"]),
+    )
+    schema = TabularSchema(id="s2", datatypes=STANDARD_TYPES + (small,))
+    field = schema.add_record("r2").add_field("size", datatype="small")
+    result = validate_array(field, pa.array([1, 2]))
+    assert result.mask.to_pylist() == [True, False]
+    assert result.error_counts == {"enumeration": 1}
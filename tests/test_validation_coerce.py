@@ -0,0 +1,106 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import (
+    DT_BOOLEAN,
+    DT_DATE,
+    DT_DATETIME,
+    DT_INTEGER,
+    Datatype,
+    DatatypeRestriction,
+)
+from sfdata_schema.validation import FieldValidator
+from sfdata_schema.validation.coerce import coerce_batch, compile_format, get_coercer
+
+
+@pytest.mark.parametrize(
+    "format, python_type, value, expected",
+    [
+        ("%d/%m/%Y", date, "31/12/2020", date(2020, 12, 31)),
+        ("%Y%m%d", date, "20200229", date(2020, 2, 29)),
+        ("%H:%M", time, "09:30", time(9, 30)),
+        (
+            "%d/%m/%Y %H:%M:%S",
+            datetime,
+            "01/02/2020 10:30:05",
+            datetime(2020, 2, 1, 10, 30, 5),
+        ),
+        ("%d %b %Y", date, "01 Feb 2020", date(2020, 2, 1)),
+        # Not zero padded, so read by strptime rather than at fixed positions
+        ("%d/%m/%Y", date, "1/2/2020", date(2020, 2, 1)),
+        ("%H:%M", time, "9:30", time(9, 30)),
+    ],
+)
+def test_compile_format(format, python_type, value, expected):
+    assert compile_format(format, python_type)(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value", ["31/12/20", "31-12-2020", "3a/12/2020", "+1/12/2020", "30/02/2020"]
+)
+def test_compile_format_invalid(value):
+    with pytest.raises(ValueError):
+        compile_format("%d/%m/%Y", date)(value)
+
+
+def test_get_coercer_options():
+    uk_date = Datatype("uk_date", extends=DT_DATE, options={"format": "%d/%m/%Y"})
+    birth_date = Datatype("birth_date", extends=uk_date)
+    assert get_coercer(birth_date)("01/02/2020") == date(2020, 2, 1)
+    assert get_coercer(DT_DATE)("2020-02-01") == date(2020, 2, 1)
+    assert get_coercer(DT_DATETIME)("2020-02-01T10:00") == datetime(2020, 2, 1, 10)
+
+    yes_no = Datatype(
+        "yes_no",
+        extends=DT_BOOLEAN,
+        options={"true_values": ["Y"], "false_values": ["N"]},
+    )
+    coerce = get_coercer(yes_no)
+    assert coerce("y") is True and coerce("N") is False
+    with pytest.raises(ValueError):
+        coerce("true")
+
+
+def test_get_coercer_cache():
+    coerce = get_coercer(DT_DATE)
+    for _ in range(3):
+        coerce("2020-02-01")
+    assert coerce.cache_info().hits == 2
+    assert not hasattr(get_coercer(DT_DATE, cache_size=0), "cache_info")
+    assert not hasattr(get_coercer(DT_INTEGER), "cache_info")
+
+
+def test_coerce_batch():
+    values, errors = coerce_batch(
+        get_coercer(DT_INTEGER), ["1", "", None, "x", "1", " 2 "]
+    )
+    assert values == [1, None, None, None, 1, 2]
+    assert errors == [3]
+
+
+def test_field_validator_format():
+    uk_date = Datatype("uk_date", extends=DT_DATE, options={"format": "%d/%m/%Y"})
+    schema = TabularSchema(id="test", datatypes=[uk_date])
+    record = schema.add_record("pet")
+    field = record.add_field("born", datatype="uk_date")
+
+    validator = FieldValidator(field)
+    assert validator("01/02/2020") == (date(2020, 2, 1), ())
+    assert validator("2020-02-01")[1] == ("datatype",)
+
+
+def test_field_validator_format_bounds():
+    uk_date = Datatype(
+        "uk_date",
+        extends=DT_DATE,
+        options={"format": "%d/%m/%Y"},
+        restriction=DatatypeRestriction(min_inclusive="2000-01-01"),
+    )
+    schema = TabularSchema(id="test", datatypes=[uk_date])
+    field = schema.add_record("pet").add_field("born", datatype="uk_date")
+
+    validator = FieldValidator(field)
+    assert validator("01/02/2020")[1] == ()
+    assert validator("31/12/1999")[1] == ("min_inclusive",)
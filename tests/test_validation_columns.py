@@ -0,0 +1,120 @@
+import pytest
+
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.spec.datatypes import (
+    DT_INTEGER,
+    STANDARD_TYPES,
+    Datatype,
+    DatatypeRestriction,
+)
+from sfdata_schema.validation import FieldValidator
+from sfdata_schema.validation.columns import validate_column
+
+np = pytest.importorskip("numpy")
+
+
+def test_numeric_column(record):
+    field = record.get_field("score")
+    result = validate_column(field, np.array([0, 50, 101, -1, 100]))
+    assert result.mask.tolist() == [True, True, False, False, True]
+    assert result.error_counts == {"max_inclusive": 1, "min_inclusive": 1}
+    assert result.invalid_count == 2
+
+
+def test_numeric_strings(record):
+    field = record.get_field("score")
+    result = validate_column(field, ["10", "", "200", None])
+    assert result.mask.tolist() == [True, True, False, True]
+    assert result.null_count == 2
+    assert result.error_counts == {"max_inclusive": 1}
+
+
+def test_required_column(record):
+    result = validate_column(record.get_field("id"), [1, None, "x"])
+    assert result.mask.tolist() == [True, False, False]
+    assert result.error_counts == {"required": 1, "datatype": 1}
+
+
+def test_string_column(record):
+    field = record.get_field("code")
+    result = validate_column(field, np.array(["A", "AB", "c", "ABC", "A"]))
+    assert result.mask.tolist() == [True, True, False, False, True]
+    assert result.error_counts == {"pattern": 1, "max_length": 1}
+
+    field = record.get_field("colour")
+    result = validate_column(field, np.array(["red", "pink", "red"]))
+    assert result.mask.tolist() == [True, False, True]
+    assert result.error_counts == {"enumeration": 1}
+
+
+def test_date_column(record):
+    field = record.get_field("born")
+    result = validate_column(field, ["2001-01-01", "2001-13-01", "2001-01-01"])
+    assert result.mask.tolist() == [True, False, True]
+    assert result.error_counts == {"datatype": 1}
+
+
+def test_pandas_series(record):
+    pd = pytest.importorskip("pandas")
+    field = record.get_field("score")
+    result = validate_column(field, pd.Series([1, None, 300], dtype="Int64"))
+    assert result.mask.tolist() == [True, True, False]
+    assert result.null_count == 1
+
+
+def test_arrow_array(record):
+    pa = pytest.importorskip("pyarrow")
+    field = record.get_field("colour")
+    result = validate_column(field, pa.array(["red", None, "pink"]))
+    assert result.mask.tolist() == [True, True, False]
+    assert result.error_counts == {"enumeration": 1}
+
+
+def test_float_column_for_integer_field(record):
+    result = validate_column(record.get_field("id"), np.array([1.0, 2.5, 3.0]))
+    assert result.mask.tolist() == [True, False, True]
+    assert result.error_counts == {"datatype": 1}
+
+    result = validate_column(record.get_field("score"), np.array([1.0, 2.5, 300.0]))
+    assert result.error_counts == {"datatype": 1, "max_inclusive": 1}
+
+
+def test_string_lengths(record):
+    field = record.get_field("label")
+    values = np.array([f"L{i}" for i in range(1000)] + ["", "TOO LONG"])
+    result = validate_column(field, values)
+    assert result.null_count == 1
+    assert result.error_counts == {"min_length": 10, "max_length": 1}
+
+
+def test_datetime64_column(record):
+    pd = pytest.importorskip("pandas")
+    field = record.get_field("born")
+    series = pd.Series(
+        np.array(["2001-01-01", "NaT", "2001-01-02T10:30"], dtype="datetime64[ns]")
+    )
+    result = validate_column(field, series)
+    assert result.mask.tolist() == [True, True, False]
+    assert result.null_count == 1
+    assert result.error_counts == {"datatype": 1}
+
+
+def test_numeric_enumeration_member_not_of_datatype():
+    small = Datatype(
+        "small",
+        extends=DT_INTEGER,
+        restriction=DatatypeRestriction(enumeration=[1, "x"]),
+    )
+    schema = TabularSchema(id="s2", datatypes=STANDARD_TYPES + (small,))
+    field = schema.add_record("r2").add_field("size", datatype="small")
+    result = validate_column(field, np.array([1, 2]))
+    assert result.mask.tolist() == [True, False]
+    assert result.error_counts == {"enumeration": 1}
+    assert FieldValidator(field)("2")[1] == ("enumeration",)
+
+
+def test_year_column(record):
+    field = record.schema.add_record("r2").add_field("year", datatype="year")
+    result = validate_column(field, np.array([1999, 99, 2024]))
+    assert result.mask.tolist() == [True, False, True]
+    assert result.error_counts == {"datatype": 1}
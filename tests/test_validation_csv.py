@@ -0,0 +1,40 @@
+from io import BytesIO
+from pathlib import Path
+
+from sfdata_schema.validation import Violation
+from sfdata_schema.validation.csvfile import read_csv, validate_csv
+
+PERSON_CSV = b"""id,first_name,last_name,nickname
+1,Ada,Lovelace,
+,Alan,Turing,
+3,Grace
+"""
+
+
+def test_read_csv_stream(pet_schema):
+    record = pet_schema.get_record("person")
+    rows = list(read_csv(record, BytesIO(PERSON_CSV)))
+
+    assert [r.row for r in rows] == [1, 2, 3]
+    assert rows[0].values == {"id": "1", "first_name": "Ada", "last_name": "Lovelace"}
+    assert rows[0].violations == []
+    assert rows[1].violations == [Violation("person.id", "required", "", 2)]
+    assert rows[2].values["last_name"] is None
+
+
+def test_read_csv_path(pet_schema, tmpdir):
+    path = Path(tmpdir) / "person.csv"
+    path.write_bytes(PERSON_CSV)
+
+    record = pet_schema.get_record("person")
+    assert len(list(read_csv(record, path))) == 3
+    assert len(list(read_csv(record, str(path)))) == 3
+
+
+def test_validate_csv_missing_column(pet_schema):
+    record = pet_schema.get_record("pet")
+    violations = list(validate_csv(record, BytesIO(b"id,name\n1,Rex\n,Fido\n")))
+    assert violations == [
+        Violation("pet.owner_id", "missing_column", None, None),
+        Violation("pet.id", "required", "", 2),
+    ]
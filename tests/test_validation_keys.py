@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+
+from sfdata_schema.spec import TabularSchema
+from sfdata_schema.validation.keys import (
+    BloomKeyIndex,
+    DuplicateKey,
+    HashKeyIndex,
+    check_foreign_keys,
+    check_primary_key,
+    check_primary_keys,
+)
+
+
+@pytest.fixture
+def dataset(tmpdir):
+    tmpdir = Path(tmpdir)
+    rows = "".join(f"{i},First{i},Last{i}\n" for i in range(1, 101))
+    (tmpdir / "person.csv").write_text(f"id,first_name,last_name\n{rows}")
+    (tmpdir / "pet.csv").write_text("id,owner_id,name\n1,1,Rex\n2,200,Fido\n3,,Tom\n")
+    (tmpdir / "address.csv").write_text("owner_id,type,address\n1,home,x\n999,work,y\n")
+    return tmpdir
+
+
+@pytest.mark.parametrize("index", [HashKeyIndex(), BloomKeyIndex(1000, 0.01)])
+def test_key_index(index):
+    for i in range(1000):
+        index.add(i)
+    assert all(i in index for i in range(1000))
+    assert "1" in index
+    false_positives = sum(i in index for i in range(1000, 11000))
+    assert false_positives < 300
+
+
+@pytest.mark.parametrize("index", ["hash", "bloom"])
+def test_check_foreign_keys(pet_schema, dataset, index):
+    reports = check_foreign_keys(pet_schema, dataset, index=index, expected_keys=1000)
+    reports = {r.field: r for r in reports}
+    assert set(reports) == {"pet.owner_id", "address.owner_id"}
+
+    assert reports["pet.owner_id"].references == "person.id"
+    assert reports["pet.owner_id"].checked == 2
+    assert reports["pet.owner_id"].samples == [(2, "200")]
+
+    assert reports["address.owner_id"].orphans == 1
+    assert reports["address.owner_id"].samples == [(2, "999")]
+
+
+def test_check_foreign_keys_cycle(tmpdir):
+    tmpdir = Path(tmpdir)
+    schema = TabularSchema(id="cycle")
+    employee = schema.add_record("employee")
+    employee.add_field("id", primary_key=True)
+    employee.add_field("manager", foreign_keys=["employee.id"])
+    employee.add_field("team", foreign_keys=["team.id"])
+    team = schema.add_record("team")
+    team.add_field("id", primary_key=True)
+    team.add_field("lead", foreign_keys=["employee.id"])
+
+    (tmpdir / "employee.csv").write_text("id,manager,team\n1,,a\n2,1,b\n3,4,a\n")
+    (tmpdir / "team.csv").write_text("id,lead\na,1\nb,5\n")
+
+    reports = {r.field: r for r in check_foreign_keys(schema, tmpdir)}
+    assert reports["employee.manager"].samples == [(3, "4")]
+    assert reports["employee.team"].is_valid
+    assert reports["employee.team"].checked == 3
+    assert reports["team.lead"].samples == [(2, "5")]
+
+
+def test_check_foreign_keys_missing_columns(pet_schema, dataset):
+    (dataset / "person.csv").write_text("person_id,first_name\n1,Ada\n")
+    (dataset / "address.csv").write_text("type,address\nhome,x\n")
+
+    reports = {r.field: r for r in check_foreign_keys(pet_schema, dataset)}
+    assert reports["pet.owner_id"].missing_columns == ["person.id"]
+    assert reports["pet.owner_id"].orphans == 0
+    assert not reports["pet.owner_id"].is_valid
+    assert reports["address.owner_id"].missing_columns == [
+        "address.owner_id",
+        "person.id",
+    ]
+    assert reports["address.owner_id"].checked == 0
+
+
+@pytest.mark.parametrize("memory_budget", [256 * 1024 * 1024, 64 * 10])
+def test_check_primary_key(pet_schema, tmpdir, memory_budget):
+    path = Path(tmpdir) / "address.csv"
+    rows = "".join(f"{i},home,x\n" for i in range(1, 101))
+    path.write_text(f"owner_id,type,address\n{rows}5,work,y\n5,home,z\n,home,q\n")
+
+    report = check_primary_key(
+        pet_schema.get_record("address"),
+        path,
+        memory_budget=memory_budget,
+        tmp_dir=tmpdir,
+    )
+    assert report.fields == ("owner_id", "type")
+    assert report.rows == 103
+    assert report.incomplete == 1
+    assert report.duplicate_keys == 1
+    assert report.duplicates == 1
+    assert report.samples == [DuplicateKey(("5", "home"), (5, 102))]
+
+
+def test_check_primary_keys(pet_schema, dataset):
+    reports = check_primary_keys(pet_schema, dataset)
+    assert set(reports) == {"person", "pet", "address"}
+    assert all(r.is_valid for r in reports.values())
+
+
+def test_check_primary_key_missing_column(pet_schema, tmpdir):
+    path = Path(tmpdir) / "address.csv"
+    path.write_text("owner_id,address\n1,x\n1,y\n")
+
+    report = check_primary_key(pet_schema.get_record("address"), path)
+    assert report.missing_columns == ["address.type"]
+    assert report.incomplete == 0
+    assert not report.is_valid
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+
+from sfdata_schema.validation.parallel import find_record_files, validate_dataset
+
+
+@pytest.fixture
+def dataset(tmpdir):
+    tmpdir = Path(tmpdir)
+    rows = "".join(f"{i},First{i},Last{i}\n" for i in range(1, 501))
+    (tmpdir / "person.csv").write_text(f"id,first_name,last_name\n{rows},Missing,Id\n")
+    (tmpdir / "pet.csv").write_text("id,owner_id,name\n1,1,Rex\n,2,Fido\n")
+    (tmpdir / "address.csv").write_text("owner_id,address\n1,Home\n")
+    return tmpdir
+
+
+def test_find_record_files(pet_schema, dataset):
+    files = find_record_files(pet_schema, dataset)
+    assert set(files) == {"person", "pet", "address"}
+
+
+def test_validate_dataset(pet_schema, dataset):
+    reports = validate_dataset(pet_schema, dataset, max_workers=2)
+
+    assert reports["person"].rows == 501
+    assert reports["person"].violation_counts == {("person.id", "required"): 1}
+    assert reports["person"].samples[0].row == 501
+
+    assert reports["pet"].rows == 2
+    assert reports["pet"].samples[0].row == 2
+
+    assert reports["address"].violation_counts == {
+        ("address.type", "missing_column"): 1
+    }
+
+
+def test_validate_dataset_chunks(pet_schema, dataset):
+    reports = validate_dataset(
+        pet_schema, {"person": dataset / "person.csv"}, max_workers=2, chunk_size=1000
+    )
+    assert reports["person"].rows == 501
+    assert reports["person"].samples[0].row == 501
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+from sfdata_schema.validation.parquet import validate_parquet
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_validate_parquet(record, tmpdir):
+    path = str(tmpdir / "r1.parquet")
+    table = pa.table(
+        {
+            "id": [1, 2, 3, None, 5, 6],
+            "score": [10, 20, 30, 40, 50, 150],
+            "code": ["A", "B", "C", "D", "E", "FFF"],
+            "Colour": ["red"] * 6,
+            "born": [date(2000, 1, 1)] * 6,
+            "label": ["Label"] * 6,
+            "notes": ["x"] * 6,
+        }
+    )
+    pq.write_table(table, path, row_group_size=2)
+
+    report = validate_parquet(record, path)
+    assert report.rows == 6
+    assert report.row_groups == 3
+    assert report.error_counts["r1.id"] == {"required": 1}
+    assert report.error_counts["r1.score"] == {"max_inclusive": 1}
+    assert report.error_counts["r1.code"] == {"max_length": 1}
+    assert not report.missing_columns
+    assert not report.is_valid
+
+    # id, score and colour are answered from statistics except where a value is out of bounds. code and label have
+    # lexical checks so are always read, and born has no checks so is never read.
+    assert report.decoded_chunks == 7
+    assert report.pruned_chunks == 11
+
+
+def test_validate_parquet_missing_column(record, tmpdir):
+    path = str(tmpdir / "r1.parquet")
+    pq.write_table(pa.table({"id": [1, 2]}), path)
+
+    report = validate_parquet(record, path)
+    assert report.missing_columns == [
+        "r1.code",
+        "r1.colour",
+        "r1.score",
+        "r1.born",
+        "r1.label",
+    ]
+    assert report.pruned_chunks == 1
+
+
+def test_validate_parquet_year(record, tmpdir):
+    path = str(tmpdir / "r2.parquet")
+    pq.write_table(pa.table({"year": [1999, 99, 2024]}), path)
+
+    record = record.schema.add_record("r2")
+    record.add_field("year", datatype="year")
+    report = validate_parquet(record, path)
+    assert report.error_counts["r2.year"] == {"datatype": 1}
+    assert report.decoded_chunks == 1
@@ -0,0 +1,197 @@
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from sfdata_schema.parser import parse_schema
+from sfdata_schema.validation.csvfile import validate_csv
+from sfdata_schema.validation.keys import DuplicateKey
+from sfdata_schema.validation.sqlite import (
+    check_database,
+    check_dataset,
+    connect,
+    create_tables,
+    load_csv,
+)
+
+
+@pytest.fixture
+def dataset(tmpdir):
+    tmpdir = Path(tmpdir)
+    rows = "".join(f"{i},First{i},Last{i}\n" for i in range(1, 101))
+    (tmpdir / "person.csv").write_text(f"id,first_name,last_name\n{rows}1,Dup,Dup\n")
+    (tmpdir / "pet.csv").write_text("id,owner_id,name\n1,1,Rex\n2,200,Fido\n3,,Tom\n")
+    (tmpdir / "address.csv").write_text("owner_id,type,address\n1,home,x\n999,work,y\n")
+    return tmpdir
+
+
+def test_check_dataset(pet_schema, dataset):
+    report = check_dataset(pet_schema, dataset, batch_size=7)
+    assert not report.is_valid
+    assert report.rows == {"person": 101, "pet": 3, "address": 2}
+
+    person = report.primary_keys["person"]
+    assert person.rows == 101
+    assert person.duplicates == 1
+    assert person.samples == [DuplicateKey(("1",), (1, 101))]
+    assert report.primary_keys["pet"].is_valid
+
+    foreign_keys = {r.field: r for r in report.foreign_keys}
+    assert set(foreign_keys) == {"pet.owner_id", "address.owner_id"}
+    assert foreign_keys["pet.owner_id"].checked == 2
+    assert foreign_keys["pet.owner_id"].samples == [(2, "200")]
+    assert foreign_keys["address.owner_id"].orphans == 1
+
+
+def test_check_database_values(tmpdir):
+    schema = parse_schema(
+        {
+            "id": "pets",
+            "datatypes": {
+                "age": {"extends": "integer", "restriction": {"max_exclusive": 30}},
+                "species": {"restriction": {"enumeration": ["cat", "dog"]}},
+            },
+            "records": {
+                "pet": {
+                    "fields": {
+                        "id": {"datatype": "integer", "primary_key": True},
+                        "age": {"datatype": "age"},
+                        "species": {"datatype": "species"},
+                        "born": {"datatype": "date"},
+                        "indoor": {"datatype": "boolean"},
+                    }
+                }
+            },
+        }
+    )
+    path = Path(tmpdir) / "pet.csv"
+    path.write_text(
+        "id,age,species,born,indoor\n"
+        "1,3,cat,2020-01-01,true\n"
+        ",old,cow,2020-13-01,maybe\n"
+        "3, 31 ,dog,,0\n"
+    )
+
+    connection = connect()
+    create_tables(connection, schema)
+    assert load_csv(connection, schema.get_record("pet"), path) == 3
+    assert connection.execute("SELECT age, indoor FROM pet").fetchall() == [
+        (3, 1),
+        (b"old", "maybe"),
+        (31, 0),
+    ]
+
+    report = check_database(connection, schema)
+    assert report.rows == {"pet": 3}
+    assert report.error_counts == {
+        "pet.id": {"required": 1},
+        "pet.age": {"datatype": 1, "max_exclusive": 1},
+        "pet.species": {"enumeration": 1},
+        "pet.born": {"datatype": 1},
+        "pet.indoor": {"datatype": 1},
+    }
+    assert report.primary_keys["pet"].incomplete == 1
+
+
+def test_check_database_options(tmpdir):
+    schema = parse_schema(
+        {
+            "id": "pets",
+            "datatypes": {
+                "uk_date": {
+                    "extends": "date",
+                    "options": {"format": "%d/%m/%Y"},
+                    "restriction": {"min_inclusive": "2000-01-01"},
+                },
+                "yes_no": {
+                    "extends": "boolean",
+                    "options": {"true_values": ["Y"], "false_values": ["N"]},
+                },
+            },
+            "records": {
+                "pet": {
+                    "fields": {
+                        "born": {"datatype": "uk_date"},
+                        "indoor": {"datatype": "yes_no"},
+                    }
+                }
+            },
+        }
+    )
+    path = Path(tmpdir) / "pet.csv"
+    path.write_text("born,indoor\n01/02/2020,Y\n31/12/1999,n\n2020-02-01,true\n,\n")
+    record = schema.get_record("pet")
+
+    connection = connect()
+    create_tables(connection, schema)
+    load_csv(connection, record, path)
+    assert connection.execute("SELECT born, indoor FROM pet").fetchall() == [
+        ("2020-02-01", 1),
+        ("1999-12-31", 0),
+        (b"2020-02-01", b"true"),
+        (None, None),
+    ]
+
+    report = check_database(connection, schema)
+    expected = Counter((v.field, v.facet) for v in validate_csv(record, path))
+    assert {
+        (qname, facet): count
+        for qname, counts in report.error_counts.items()
+        for facet, count in counts.items()
+    } == expected
+    assert expected == {
+        ("pet.born", "min_inclusive"): 1,
+        ("pet.born", "datatype"): 1,
+        ("pet.indoor", "datatype"): 1,
+    }
+
+
+def test_check_database_integers(tmpdir):
+    schema = parse_schema(
+        {
+            "id": "pets",
+            "records": {
+                "pet": {
+                    "fields": {
+                        "legs": {"datatype": "integer"},
+                        "born": {"datatype": "year"},
+                    }
+                }
+            },
+        }
+    )
+    path = Path(tmpdir) / "pet.csv"
+    path.write_text("legs,born\n4,2020\n1.0,99\n1e3,+2020\n +5 ,-1999\n-2,2020.0\n")
+    record = schema.get_record("pet")
+
+    connection = connect()
+    create_tables(connection, schema)
+    load_csv(connection, record, path)
+    report = check_database(connection, schema)
+    assert report.error_counts == {
+        "pet.legs": {"datatype": 2},
+        "pet.born": {"datatype": 3},
+    }
+    assert report.error_counts == {
+        qname: Counter(v.facet for v in validate_csv(record, path) if v.field == qname)
+        for qname in report.error_counts
+    }
+
+
+def test_check_dataset_missing_columns(pet_schema, dataset):
+    (dataset / "person.csv").write_text("first_name,last_name\nAda,Lovelace\n")
+    (dataset / "pet.csv").write_text("id,name\n1,Rex\n2,Fido\n")
+
+    report = check_dataset(pet_schema, dataset)
+    assert set(report.missing_columns) == {"person.id", "pet.owner_id"}
+    assert not report.is_valid
+    assert report.error_counts["person.id"] == {}
+    assert report.primary_keys["person"].missing_columns == ["person.id"]
+    assert report.primary_keys["person"].incomplete == 0
+    foreign_keys = {r.field: r for r in report.foreign_keys}
+    assert foreign_keys["pet.owner_id"].missing_columns == [
+        "pet.owner_id",
+        "person.id",
+    ]
+    assert foreign_keys["address.owner_id"].missing_columns == ["person.id"]
+    assert foreign_keys["address.owner_id"].orphans == 0